@@ -0,0 +1,89 @@
+"""
+gzip/brotli compression of API responses
+
+Brotli is used when the optional ``brotli`` package is installed and the
+client accepts it, gzip otherwise. Only complete bodies of at least
+``minimum_size`` bytes are compressed: streamed responses (the NDJSON/SSE
+career path stream) pass through untouched, so every event still reaches the
+client as soon as it is produced.
+"""
+
+import gzip
+from typing import Callable, Dict, List, Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+def _gzip() -> Callable[[bytes], bytes]:
+    return lambda body: gzip.compress(body, compresslevel=6)
+
+def _brotli() -> Callable[[bytes], bytes]:
+    import brotli
+    # Quality 4 compresses about as fast as gzip -6 and noticeably smaller
+    return lambda body: brotli.compress(body, quality=4)
+
+ENCODINGS: Dict[str, Callable[[], Callable[[bytes], bytes]]] = {'br': _brotli, 'gzip': _gzip}
+
+counts = {'compressed': 0, 'bytes_in': 0, 'bytes_out': 0}
+
+def snapshot() -> Dict:
+    return {**counts, 'ratio': round(counts['bytes_out'] / counts['bytes_in'], 4) if counts['bytes_in'] else 0.0}
+
+def load_encoders(names: List[str]) -> Dict[str, Callable[[bytes], bytes]]:
+    """Encoders for ``names`` in order of preference, skipping unavailable ones"""
+    encoders = {}
+    for name in names:
+        try:
+            encoders[name] = ENCODINGS[name]()
+        except ImportError as e:
+            print(f"[WARN] Response compression {name} unavailable: {e}")
+    return encoders
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, encodings: List[str], minimum_size: int = 1024):
+        self.app = app
+        self.encoders = load_encoders(encodings)
+        self.minimum_size = minimum_size
+
+    def _choose(self, accept_encoding: str) -> Optional[str]:
+        accepted = {part.split(";")[0].strip().lower() for part in accept_encoding.split(",")}
+        return next((name for name in self.encoders if name in accepted), None)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        encoding = self._choose(Headers(scope=scope).get('accept-encoding', '')) if scope['type'] == 'http' else None
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start: Optional[Message] = None
+
+        async def send_compressed(message: Message):
+            nonlocal start
+            if message['type'] == 'http.response.start':
+                # Held back until the first body chunk shows whether the response is streamed
+                start = message
+                return
+            if message['type'] != 'http.response.body' or start is None:
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start['headers'])
+            body = message.get('body', b'')
+            if message.get('more_body') or len(body) < self.minimum_size or 'content-encoding' in headers:
+                await send(start)
+                start = None
+                await send(message)
+                return
+
+            compressed = self.encoders[encoding](body)
+            counts['compressed'] += 1
+            counts['bytes_in'] += len(body)
+            counts['bytes_out'] += len(compressed)
+            headers['Content-Encoding'] = encoding
+            headers['Content-Length'] = str(len(compressed))
+            headers.add_vary_header('Accept-Encoding')
+            await send(start)
+            start = None
+            await send({'type': 'http.response.body', 'body': compressed})
+
+        await self.app(scope, receive, send_compressed)
@@ -0,0 +1,189 @@
+"""
+Services for the API routers, provided as FastAPI dependencies
+
+Each service is created on first use and then shared by every route of the
+process. Modules that load the LLM SDK, the Neo4j driver or the embedding
+model are imported inside the providers, so a worker mounting only light
+routers (``API_ROUTERS=skills``) never loads them.
+"""
+
+import functools
+import threading
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional
+
+from app.config import settings
+from app.services.cache import RedisCache
+from app.services.cache_versions import CacheVersions
+from app.services.codecs import load_serializer
+
+if TYPE_CHECKING:
+    from app.core.jobs import JobRunner, JobStore
+    from app.core.path_finder import PathFinder
+    from app.services.enrichment_store import EnrichmentStore
+    from app.services.graph_db import CareerGraphDB
+    from app.services.llm_gateway import LLMGateway
+    from app.services.response_cache import ResponseCache
+    from app.services.resume_cache import ResumeParseCache
+    from app.services.vector_db import SkillVectorDB
+
+_services: Dict[str, Any] = {}
+# Reentrant: providers call the providers of the services they are built from
+_lock = threading.RLock()
+
+def shared(create: Callable[[], Any]) -> Callable[[], Any]:
+    """Provider that creates its service once per process, on first use"""
+    name = create.__name__
+
+    @functools.wraps(create)
+    def provide():
+        if name not in _services:
+            with _lock:
+                if name not in _services:
+                    _services[name] = create()
+        return _services[name]
+
+    return provide
+
+def override(provider: Callable[[], Any], service: Any):
+    """Use ``service`` instead of the one ``provider`` would create (stand-ins, tests)"""
+    _services[provider.__name__] = service
+
+def created(provider: Callable[[], Any]) -> Optional[Any]:
+    """The provider's service if this process has created it, without creating it"""
+    return _services.get(provider.__name__)
+
+@shared
+def get_cache() -> RedisCache:
+    return RedisCache(
+        redis_url=settings.REDIS_URL,
+        local_max_entries=settings.CACHE_LOCAL_MAX_ENTRIES,
+        local_ttl=settings.CACHE_LOCAL_TTL,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        connect_timeout=settings.REDIS_CONNECT_TIMEOUT,
+        serializer=load_serializer(settings.CACHE_CODEC, settings.CACHE_COMPRESSION, settings.CACHE_COMPRESS_MIN_BYTES)
+    )
+
+@shared
+def get_cache_versions() -> CacheVersions:
+    from app.services.vector_db import EMBEDDING_MODEL
+
+    # Cached results are keyed by the graph, embedding and prompt versions they were computed from
+    versions = CacheVersions(get_cache(), redis_url=settings.REDIS_URL)
+    versions.register('embeddings', EMBEDDING_MODEL)
+    return versions
+
+@shared
+def get_llm_gateway() -> "LLMGateway":
+    from app.services.llm_gateway import llm_gateway
+    return llm_gateway
+
+@shared
+def get_skill_db() -> "SkillVectorDB":
+    from app.services.vector_db import SkillVectorDB
+    return SkillVectorDB(pinecone_api_key=settings.PINECONE_API_KEY)
+
+@shared
+def get_career_graph() -> "CareerGraphDB":
+    from app.services.graph_db import CareerGraphDB
+
+    versions = get_cache_versions()
+    return CareerGraphDB(
+        uri=settings.NEO4J_URI,
+        user=settings.NEO4J_USER,
+        password=settings.NEO4J_PASSWORD,
+        llm=get_llm_gateway(),
+        # Writes run in worker threads, hence the blocking bump
+        on_write=lambda: versions.bump_blocking('graph')
+    )
+
+@shared
+def get_resume_cache() -> "ResumeParseCache":
+    from app.core.ai_parser import AIResumeParser, load_skill_extractor
+    from app.services.extraction import document_extractor
+    from app.services.resume_cache import ResumeParseCache
+
+    resume_parser = AIResumeParser(llm=get_llm_gateway(), skill_extractor=load_skill_extractor())
+    return ResumeParseCache(get_cache(), resume_parser, extract=document_extractor.extract,
+                            ttl=settings.RESUME_CACHE_TTL, versions=get_cache_versions())
+
+@shared
+def get_enrichment_store() -> Optional["EnrichmentStore"]:
+    if not settings.USE_PRECOMPUTED_ENRICHMENT:
+        return None
+    from app.core.enrichment import ENRICHMENT_PROMPT_VERSION
+    from app.services.enrichment_store import EnrichmentStore
+
+    return EnrichmentStore(
+        path=settings.ENRICHMENT_STORE_PATH,
+        prompt_version=ENRICHMENT_PROMPT_VERSION,
+        model=settings.GEMINI_MODEL
+    )
+
+@shared
+def get_path_finder() -> "PathFinder":
+    from app.core.path_finder import PathFinder
+
+    return PathFinder(
+        graph=get_career_graph(),
+        skill_db=get_skill_db(),
+        llm=get_llm_gateway(),
+        cache=get_cache(),
+        versions=get_cache_versions(),
+        enrichment_store=get_enrichment_store()
+    )
+
+@shared
+def get_response_cache() -> "ResponseCache":
+    from app.core.path_finder import SCORING_VERSION
+    from app.services.response_cache import ResponseCache
+
+    return ResponseCache(
+        get_cache(),
+        get_cache_versions(),
+        ttl=settings.CAREER_PATHS_CACHE_TTL,
+        negative_ttl=settings.CAREER_PATHS_NEGATIVE_CACHE_TTL,
+        version=f"{SCORING_VERSION}:{get_llm_gateway().model_id}"
+    )
+
+@shared
+def get_job_store() -> "JobStore":
+    from app.core.jobs import JobStore
+    return JobStore(get_cache(), ttl=settings.JOB_RESULT_TTL, stale_after=int(settings.JOB_HEARTBEAT_SECONDS * 3))
+
+@shared
+def get_job_runner() -> "JobRunner":
+    from app.core.jobs import JobRunner
+    return JobRunner(get_job_store(), concurrency=settings.JOB_WORKERS, max_pending=settings.JOB_MAX_PENDING,
+                     heartbeat_seconds=settings.JOB_HEARTBEAT_SECONDS)
+
+def snapshot() -> Dict:
+    """/metrics counters of the services this process has created"""
+    report = {}
+    if created(get_llm_gateway) is not None:
+        from app.core.prompt_budget import budget_snapshot
+        from app.services.llm_executor import llm_executor
+        from app.services.single_flight import llm_flight
+
+        report.update({
+            'single_flight': llm_flight.snapshot(),
+            'llm_executor': llm_executor.snapshot(),
+            'llm_gateway': created(get_llm_gateway).snapshot(),
+            'prompt_budgets': budget_snapshot()
+        })
+    for key, provider in [('cache', get_cache), ('cache_versions', get_cache_versions)]:
+        if created(provider) is not None:
+            report[key] = created(provider).snapshot()
+    if created(get_resume_cache) is not None:
+        from app.core.resume_sections import resume_preprocessor
+        from app.services.extraction import document_extractor
+
+        report.update({
+            'resume_preprocessing': resume_preprocessor.snapshot(),
+            'resume_cache': created(get_resume_cache).snapshot(),
+            'document_extraction': document_extractor.snapshot()
+        })
+    for key, provider in [('career_paths_response_cache', get_response_cache), ('jobs', get_job_runner)]:
+        if created(provider) is not None:
+            report[key] = created(provider).snapshot()
+    return report
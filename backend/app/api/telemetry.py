@@ -0,0 +1,52 @@
+"""
+Per-request telemetry shared by the API routers and reported on /metrics
+"""
+
+from typing import TYPE_CHECKING, Dict, Optional
+
+from fastapi import Response
+
+from app.services.cache import RoundTrips
+from app.services.metrics import LatencyRecorder
+
+if TYPE_CHECKING:
+    # Importing the gateway creates the LLM backend, which slim workers never need
+    from app.core.pipeline import Pipeline
+    from app.services.llm_gateway import TokenUsage
+
+# Time-to-first-byte is tracked separately from total time for the streaming endpoint
+stream_latency = {'ttfb': LatencyRecorder(), 'total': LatencyRecorder()}
+# LLM tokens spent per request, so prompt regressions show up on /metrics
+request_tokens = {
+    'resume_parse': LatencyRecorder(),
+    'career_paths': LatencyRecorder(),
+    'career_paths_stream': LatencyRecorder()
+}
+# Redis round trips per request, so a lookup that stopped being batched shows up too
+request_round_trips = {name: LatencyRecorder() for name in request_tokens}
+
+# How often each chain of stages determined /api/v1/career-paths latency
+critical_paths: Dict[str, int] = {}
+
+def record_critical_path(pipeline: "Pipeline") -> str:
+    chain = " > ".join(span.name for span in pipeline.critical_path())
+    critical_paths[chain] = critical_paths.get(chain, 0) + 1
+    return pipeline.describe_critical_path()
+
+def record_llm_usage(endpoint: str, usage: "TokenUsage", response: Optional[Response] = None):
+    request_tokens[endpoint].observe(usage.total_tokens)
+    if response is not None:
+        response.headers['X-LLM-Usage'] = usage.header()
+
+def record_cache_round_trips(endpoint: str, trips: RoundTrips, response: Optional[Response] = None):
+    request_round_trips[endpoint].observe(trips.count)
+    if response is not None:
+        response.headers['X-Cache-Round-Trips'] = str(trips.count)
+
+def snapshot() -> Dict:
+    return {
+        'llm_tokens_per_request': {name: rec.snapshot() for name, rec in request_tokens.items()},
+        'cache_round_trips_per_request': {name: rec.snapshot() for name, rec in request_round_trips.items()},
+        'career_paths_critical_paths': dict(critical_paths),
+        'career_paths_stream_seconds': {name: rec.snapshot() for name, rec in stream_latency.items()}
+    }
@@ -1,7 +1,198 @@
-from fastapi import APIRouter
+import asyncio
+import json
+import time
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+
+from app.api.deps import get_job_runner, get_job_store, get_path_finder, get_response_cache
+from app.api.telemetry import record_cache_round_trips, record_critical_path, record_llm_usage, stream_latency
+from app.api.v1.jobs import submit_job
+from app.core.enrichment import iter_enrichments, transition_key
+from app.core.jobs import JobRunner, JobStore
+from app.core.path_finder import PathFinder
+from app.core.pipeline import Pipeline
+from app.core.response_view import MAX_PAGE_SIZE, InvalidView, ResponseView
+from app.models.career import CareerPathRequest, CareerPathResponse
+from app.services.cache import track_request_round_trips
+from app.services.llm_gateway import track_request_usage
+from app.services.response_cache import ResponseCache
+from app.services.single_flight import make_key
 
 router = APIRouter()
 
-@router.get("/")
-async def get_career_paths():
-    pass
+@router.post("/career-paths", response_model=CareerPathResponse, response_model_exclude_unset=True)
+async def get_career_paths(request: CareerPathRequest, response: Response,
+                           fields: Optional[str] = None, expand: Optional[str] = None,
+                           limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE), cursor: Optional[str] = None,
+                           cache_control: Optional[str] = Header(None),
+                           path_finder: PathFinder = Depends(get_path_finder),
+                           response_cache: ResponseCache = Depends(get_response_cache)):
+    """Get personalized career paths - supports both same-industry and cross-industry transitions.
+
+    Identical requests (up to role spelling and skill order/case) are served
+    from the response cache; ``Cache-Control: no-cache`` recomputes the result.
+    ``fields``, ``expand``, ``limit`` and ``cursor`` select part of the ranked
+    paths (app/core/response_view.py); only the selected paths are enriched.
+    """
+    try:
+        view = ResponseView.parse(request, fields, expand, limit, cursor)
+    except InvalidView as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    pipeline = Pipeline()
+    usage = track_request_usage()
+    trips = track_request_round_trips()
+    try:
+        result, outcome = await response_cache.get_or_build(
+            request, lambda: path_finder.build(request, pipeline, view), cache_control, view.cache_variant()
+        )
+        response.headers['X-Response-Cache'] = outcome
+        return result
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        await pipeline.aclose()
+        response.headers['Server-Timing'] = pipeline.server_timing()
+        response.headers['X-Critical-Path'] = record_critical_path(pipeline)
+        record_llm_usage('career_paths', usage, response)
+        record_cache_round_trips('career_paths', trips, response)
+
+@router.post("/career-paths/stream")
+async def stream_career_paths(request: CareerPathRequest, http_request: Request,
+                              path_finder: PathFinder = Depends(get_path_finder)):
+    """Stream career paths as they are computed.
+
+    Events: ``paths`` (ranked graph paths with skill-match scores, no enrichment),
+    one ``enrichment`` per unique transition as Gemini finishes it, then ``complete``
+    with the full response including ``recommended_path``. Cross-industry requests
+    get one ``cross_industry_step`` per plan step as it is generated, then
+    ``complete`` with the formatted plan. Clients sending
+    ``Accept: text/event-stream`` get SSE framing, everyone else NDJSON.
+    """
+    use_sse = 'text/event-stream' in http_request.headers.get('accept', '')
+    return StreamingResponse(
+        _career_path_events(path_finder, request, use_sse),
+        media_type="text/event-stream" if use_sse else "application/x-ndjson",
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+async def _career_path_events(path_finder: PathFinder, request: CareerPathRequest, use_sse: bool):
+    started = time.perf_counter()
+    first_byte_at = None
+    usage = track_request_usage()
+    trips = track_request_round_trips()
+    pipeline = Pipeline()
+    search = None
+
+    def encode(event: str, data: Dict) -> str:
+        nonlocal first_byte_at
+        if first_byte_at is None:
+            first_byte_at = time.perf_counter()
+            stream_latency['ttfb'].observe(first_byte_at - started)
+        if use_sse:
+            return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        return json.dumps({'event': event, 'data': data}, default=str) + "\n"
+
+    def timing() -> Dict:
+        total = time.perf_counter() - started
+        stream_latency['total'].observe(total)
+        return {
+            'ttfb_ms': round((first_byte_at - started) * 1000, 1),
+            'total_ms': round(total * 1000, 1),
+            'critical_path': pipeline.describe_critical_path()
+        }
+
+    try:
+        # Cross-industry plan steps are forwarded while the plan is still being generated
+        plan_steps: asyncio.Queue = asyncio.Queue()
+        search = asyncio.ensure_future(path_finder.search(request, pipeline, plan_steps.put_nowait))
+        search.add_done_callback(lambda _: plan_steps.put_nowait(None))
+        while True:
+            step = await plan_steps.get()
+            if step is None:
+                break
+            yield encode('cross_industry_step', step)
+
+        paths, cross_industry_guidance = await search
+        if cross_industry_guidance:
+            yield encode('complete', {
+                **cross_industry_guidance,
+                'timing': timing(),
+                'llm_usage': usage.to_dict()
+            })
+            return
+
+        analyzed_paths, skill_gap_details = await path_finder.skill_analysis(request, pipeline)
+        yield encode('paths', {'paths': analyzed_paths, 'skill_gaps': skill_gap_details})
+
+        # Positions of every occurrence of each unique transition, so one event covers all of them
+        positions: Dict[Tuple, List[Dict]] = {}
+        for path_index, path in enumerate(analyzed_paths):
+            for step_index, trans in enumerate(path['transitions']):
+                positions.setdefault(transition_key(trans), []).append(
+                    {'path_index': path_index, 'step_index': step_index}
+                )
+
+        all_transitions = [trans for path in analyzed_paths for trans in path['transitions']]
+        async for key, gemini_data in iter_enrichments(
+            path_finder.llm,
+            all_transitions,
+            request.user_skills,
+            **path_finder.enrichment_options(request)
+        ):
+            for position in positions[key]:
+                analyzed_paths[position['path_index']]['transitions'][position['step_index']].update(gemini_data)
+            yield encode('enrichment', {
+                'from_role': key[0],
+                'to_role': key[1],
+                'positions': positions[key],
+                **gemini_data
+            })
+
+        yield encode('complete', {
+            'paths': analyzed_paths,
+            'recommended_path': analyzed_paths[0] if analyzed_paths else None,
+            'skill_gaps': skill_gap_details,
+            'timing': timing(),
+            'llm_usage': usage.to_dict()
+        })
+
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        yield encode('error', {'detail': str(e)})
+    finally:
+        if search is not None and not search.done():
+            search.cancel()
+        await pipeline.aclose()
+        record_llm_usage('career_paths_stream', usage)
+        record_cache_round_trips('career_paths_stream', trips)
+
+@router.post("/jobs/career-paths", status_code=202)
+async def submit_career_paths_job(request: CareerPathRequest, response: Response,
+                                  idempotency_key: Optional[str] = Header(None),
+                                  path_finder: PathFinder = Depends(get_path_finder),
+                                  job_runner: JobRunner = Depends(get_job_runner),
+                                  job_store: JobStore = Depends(get_job_store)):
+    """Generate career paths in the background; poll the returned job for the result"""
+
+    async def work():
+        pipeline = Pipeline()
+        usage = track_request_usage()
+        trips = track_request_round_trips()
+        try:
+            result = await path_finder.build(request, pipeline)
+            # Same shape as the synchronous endpoint's response
+            return CareerPathResponse(**result).dict()
+        finally:
+            await pipeline.aclose()
+            record_critical_path(pipeline)
+            record_llm_usage('career_paths', usage)
+            record_cache_round_trips('career_paths', trips)
+
+    fingerprint = make_key(json.dumps(request.dict(), sort_keys=True))
+    return await submit_job(response, job_runner, job_store, 'career_paths', fingerprint, idempotency_key, work)
@@ -0,0 +1,65 @@
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import JSONResponse
+
+from app.api.deps import get_job_store
+from app.core.jobs import IdempotencyConflict, JobQueueFull, JobRunner, JobStore, job_view
+
+router = APIRouter()
+
+async def submit_job(response: Response, job_runner: JobRunner, job_store: JobStore, kind: str, fingerprint: str,
+                     idempotency_key: Optional[str], work: Callable[[], Any],
+                     cleanup: Optional[Callable[[], None]] = None) -> Dict:
+    """Accept a job (or return the one already accepted for ``idempotency_key``)"""
+    try:
+        job_runner.reserve()
+    except JobQueueFull as e:
+        if cleanup is not None:
+            cleanup()
+        raise HTTPException(status_code=503, detail=str(e), headers={'Retry-After': "5"})
+    try:
+        record, created = await job_store.create(kind, fingerprint, idempotency_key)
+    except Exception as e:
+        job_runner.release()
+        if cleanup is not None:
+            cleanup()
+        if isinstance(e, IdempotencyConflict):
+            raise HTTPException(status_code=409, detail=str(e))
+        print(f"[ERROR] Job store unavailable: {e}")
+        raise HTTPException(status_code=503, detail="Job store unavailable")
+
+    if created:
+        job_runner.submit(record, work, cleanup)
+    else:
+        job_runner.release()
+        if cleanup is not None:
+            cleanup()
+    response.headers['Location'] = f"/api/v1/jobs/{record['id']}"
+    response.headers['Retry-After'] = "1"
+    return job_view(record)
+
+async def _get_job(job_store: JobStore, job_id: str) -> Dict:
+    try:
+        record = await job_store.get(job_id)
+    except Exception as e:
+        print(f"[ERROR] Job store unavailable: {e}")
+        raise HTTPException(status_code=503, detail="Job store unavailable")
+    if record is None:
+        raise HTTPException(status_code=404, detail="Unknown or expired job")
+    return record
+
+@router.get("/jobs/{job_id}")
+async def get_job(job_id: str, job_store: JobStore = Depends(get_job_store)):
+    """Status of a resume parse or career path job"""
+    return job_view(await _get_job(job_store, job_id))
+
+@router.get("/jobs/{job_id}/result")
+async def get_job_result(job_id: str, job_store: JobStore = Depends(get_job_store)):
+    """The job's result once it succeeded; 202 with its status while it is still queued or running"""
+    record = await _get_job(job_store, job_id)
+    if record['status'] == 'succeeded':
+        return record['result']
+    if record['status'] == 'failed':
+        raise HTTPException(status_code=record['error']['status_code'], detail=record['error']['detail'])
+    return JSONResponse(job_view(record), status_code=202, headers={'Retry-After': "1"})
@@ -1,7 +1,146 @@
-from fastapi import APIRouter
+import os
+import shutil
+from typing import Optional
+
+from fastapi import APIRouter, Depends, File, Header, HTTPException, Query, Response, UploadFile
+from fastapi.responses import FileResponse
+
+from app.api.deps import get_job_runner, get_job_store, get_resume_cache
+from app.api.telemetry import record_cache_round_trips, record_llm_usage
+from app.api.v1.jobs import submit_job
+from app.config import settings
+from app.core.bulk_ingest import BulkIngestJob, bulk_jobs, prune_bulk_jobs
+from app.core.jobs import JobRunner, JobStore
+from app.models.user import ParsedResume
+from app.services.cache import track_request_round_trips
+from app.services.extraction import ExtractionTimeout, UploadTooLarge, spool_upload
+from app.services.llm_gateway import track_request_usage
+from app.services.metrics import StageTimer
+from app.services.resume_cache import ResumeParseCache
 
 router = APIRouter()
 
-@router.post("/upload")
-async def upload_resume():
-    pass
+@router.post("/resume/parse", response_model=ParsedResume)
+async def parse_resume(response: Response, file: UploadFile = File(...),
+                       resume_cache: ResumeParseCache = Depends(get_resume_cache)):
+    """Parse uploaded resume"""
+    timer = StageTimer()
+    usage = track_request_usage()
+    trips = track_request_round_trips()
+    upload = None
+    try:
+        # Read file (size-capped, large uploads go to a temp file)
+        with timer.stage("read"):
+            upload = await spool_upload(file, settings.MAX_UPLOAD_BYTES, settings.UPLOAD_SPOOL_BYTES)
+
+        # Keyed by content, so renamed copies hit and same-named uploads never collide
+        parsed_data, outcome = await resume_cache.get_or_parse(upload, timer)
+        response.headers['X-Resume-Cache'] = outcome
+        return parsed_data
+
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except ExtractionTimeout as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        if upload is not None:
+            upload.cleanup()
+        response.headers['Server-Timing'] = timer.server_timing()
+        record_llm_usage('resume_parse', usage, response)
+        record_cache_round_trips('resume_parse', trips, response)
+
+@router.post("/resume/bulk", status_code=202)
+async def start_bulk_ingest(file: UploadFile = File(...),
+                            concurrency: int = Query(settings.BULK_INGEST_CONCURRENCY, ge=1,
+                                                     le=settings.BULK_INGEST_MAX_CONCURRENCY),
+                            resume_cache: ResumeParseCache = Depends(get_resume_cache)):
+    """Parse every resume in an uploaded zip or tar archive in the background.
+
+    The job id is derived from the archive's content, so uploading the same
+    archive again resumes the earlier job instead of starting over. Finished
+    jobs and their files are kept for ``BULK_INGEST_RETENTION_SECONDS``.
+    """
+    prune_bulk_jobs(settings.BULK_INGEST_RETENTION_SECONDS)
+    try:
+        upload = await spool_upload(file, settings.BULK_MAX_ARCHIVE_BYTES, settings.UPLOAD_SPOOL_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    job_id = upload.digest[:16]
+    job = bulk_jobs.get(job_id)
+    if job is not None and job.status in ("pending", "running"):
+        upload.cleanup()
+        return job.snapshot()
+
+    os.makedirs(settings.BULK_INGEST_DIR, exist_ok=True)
+    archive = os.path.join(settings.BULK_INGEST_DIR, f"{job_id}.archive")
+    try:
+        if upload.path is not None:
+            shutil.move(upload.path, archive)
+            upload.path = None
+        else:
+            with open(archive, 'wb') as f:
+                f.write(upload.data)
+    finally:
+        upload.cleanup()
+
+    job = BulkIngestJob(
+        source=archive,
+        output=os.path.join(settings.BULK_INGEST_DIR, f"{job_id}.jsonl"),
+        resume_cache=resume_cache,
+        concurrency=concurrency,
+        max_bytes=settings.MAX_UPLOAD_BYTES,
+        job_id=job_id
+    )
+    bulk_jobs[job_id] = job
+    job.start()
+    return job.snapshot()
+
+@router.get("/resume/bulk/{job_id}")
+async def get_bulk_ingest(job_id: str):
+    """Progress and per-stage throughput of a bulk ingestion job"""
+    prune_bulk_jobs(settings.BULK_INGEST_RETENTION_SECONDS)
+    job = bulk_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Unknown bulk ingestion job")
+    return job.snapshot()
+
+@router.get("/resume/bulk/{job_id}/results")
+async def get_bulk_ingest_results(job_id: str):
+    """Parsed records so far, one JSON object per line"""
+    prune_bulk_jobs(settings.BULK_INGEST_RETENTION_SECONDS)
+    job = bulk_jobs.get(job_id)
+    if job is None or not os.path.exists(job.output):
+        raise HTTPException(status_code=404, detail="Unknown bulk ingestion job")
+    return FileResponse(job.output, media_type="application/x-ndjson", filename=f"{job_id}.jsonl")
+
+@router.post("/jobs/resume-parse", status_code=202)
+async def submit_resume_parse_job(response: Response, file: UploadFile = File(...),
+                                  idempotency_key: Optional[str] = Header(None),
+                                  resume_cache: ResumeParseCache = Depends(get_resume_cache),
+                                  job_runner: JobRunner = Depends(get_job_runner),
+                                  job_store: JobStore = Depends(get_job_store)):
+    """Parse a resume in the background; poll the returned job for the result"""
+    try:
+        upload = await spool_upload(file, settings.MAX_UPLOAD_BYTES, settings.UPLOAD_SPOOL_BYTES)
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+    async def work():
+        usage = track_request_usage()
+        trips = track_request_round_trips()
+        try:
+            parsed_data, _ = await resume_cache.get_or_parse(upload)
+            return parsed_data
+        except ExtractionTimeout as e:
+            raise HTTPException(status_code=422, detail=str(e))
+        finally:
+            record_llm_usage('resume_parse', usage)
+            record_cache_round_trips('resume_parse', trips)
+
+    return await submit_job(response, job_runner, job_store, 'resume_parse', upload.digest, idempotency_key, work,
+                            cleanup=upload.cleanup)
@@ -1,7 +1,11 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+
+from app.api.deps import get_skill_db
 
 router = APIRouter()
 
-@router.get("/")
-async def get_skills():
-    pass
+@router.get("/skills/similar/{skill_name}")
+async def find_similar_skills(skill_name: str, limit: int = 5, skill_db=Depends(get_skill_db)):
+    """Find semantically similar skills"""
+    similar = skill_db.find_similar_skills(skill_name, top_k=limit)
+    return {'similar_skills': similar}
@@ -1,6 +1,9 @@
 import os
+from pydantic import field_validator
 from pydantic_settings import BaseSettings
 
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
 class Settings(BaseSettings):
     GOOGLE_API_KEY: str = os.getenv("GOOGLE_API_KEY", "")
     PINECONE_API_KEY: str = os.getenv("PINECONE_API_KEY", "")
@@ -8,6 +11,124 @@ class Settings(BaseSettings):
     NEO4J_USER: str = os.getenv("NEO4J_USER", "neo4j")
     NEO4J_PASSWORD: str = os.getenv("NEO4J_PASSWORD", "password")
     REDIS_URL: str = os.getenv("REDIS_URL", "redis://localhost:6379")
+    GEMINI_MODEL: str = os.getenv("GEMINI_MODEL", "gemini-2.0-flash")
+
+    # Routers this worker mounts (app/api/v1); e.g. "skills" for a slim worker that
+    # never loads the LLM or the graph driver, next to workers serving the heavy routes
+    API_ROUTERS: str = os.getenv("API_ROUTERS", "resume,career_paths,jobs,skills")
+
+    # Response compression: encodings in order of preference ("br" needs the brotli
+    # package; empty disables compression) for bodies of at least RESPONSE_COMPRESS_MIN_BYTES
+    RESPONSE_COMPRESSION: str = os.getenv("RESPONSE_COMPRESSION", "br,gzip")
+    RESPONSE_COMPRESS_MIN_BYTES: int = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+
+    # In-process tier in front of Redis (0 entries disables it); entries live at most
+    # CACHE_LOCAL_TTL seconds and are dropped early when another worker writes the key
+    CACHE_LOCAL_MAX_ENTRIES: int = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", "1024"))
+    CACHE_LOCAL_TTL: float = float(os.getenv("CACHE_LOCAL_TTL", "30"))
+    # How cached values are stored in Redis: codec ("json", "orjson", "msgpack"), compression
+    # ("none", "zlib", "zstd", "lz4") for payloads of at least CACHE_COMPRESS_MIN_BYTES
+    CACHE_CODEC: str = os.getenv("CACHE_CODEC", "orjson")
+    CACHE_COMPRESSION: str = os.getenv("CACHE_COMPRESSION", "zstd")
+    CACHE_COMPRESS_MIN_BYTES: int = int(os.getenv("CACHE_COMPRESS_MIN_BYTES", "1024"))
+    # Redis connection pool per worker and socket timeouts in seconds (a command that
+    # times out is treated like any other Redis error, i.e. as a cache miss)
+    REDIS_MAX_CONNECTIONS: int = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+    REDIS_SOCKET_TIMEOUT: float = float(os.getenv("REDIS_SOCKET_TIMEOUT", "2"))
+    REDIS_CONNECT_TIMEOUT: float = float(os.getenv("REDIS_CONNECT_TIMEOUT", "2"))
+
+    # LLM gateway: "gemini" or "fake" (canned responses for offline load tests)
+    LLM_BACKEND: str = os.getenv("LLM_BACKEND", "gemini")
+    LLM_TIMEOUT_SECONDS: float = float(os.getenv("LLM_TIMEOUT_SECONDS", "60"))
+    LLM_FAKE_LATENCY_MS: float = float(os.getenv("LLM_FAKE_LATENCY_MS", "0"))
+    LLM_FAKE_JITTER_MS: float = float(os.getenv("LLM_FAKE_JITTER_MS", "0"))
+    LLM_FAKE_RESPONSES_PATH: str = os.getenv("LLM_FAKE_RESPONSES_PATH", "")
+
+    # LLM execution limits (process-wide)
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", "8"))
+    LLM_RATE_LIMIT_PER_MINUTE: float = float(os.getenv("LLM_RATE_LIMIT_PER_MINUTE", "300"))
+    LLM_RATE_LIMIT_BURST: int = int(os.getenv("LLM_RATE_LIMIT_BURST", "10"))
+    LLM_MAX_RETRIES: int = int(os.getenv("LLM_MAX_RETRIES", "4"))
+    LLM_RETRY_BASE_DELAY: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "1.0"))
+    LLM_RETRY_MAX_DELAY: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "30.0"))
+    # Static prompt prefixes at least this long are stored with Gemini context caching; no
+    # current prefix reaches the default, so only implicit prefix caching applies today
+    LLM_CONTEXT_CACHE_MIN_TOKENS: int = int(os.getenv("LLM_CONTEXT_CACHE_MIN_TOKENS", "4096"))
+    LLM_CONTEXT_CACHE_TTL_SECONDS: int = int(os.getenv("LLM_CONTEXT_CACHE_TTL_SECONDS", "3600"))
+
+    # Prompt token budgets per call site; variable content is trimmed to fit
+    PROMPT_BUDGET_MATCH_ROLE: int = int(os.getenv("PROMPT_BUDGET_MATCH_ROLE", "1000"))
+    PROMPT_BUDGET_PARSE_RESUME: int = int(os.getenv("PROMPT_BUDGET_PARSE_RESUME", "8000"))
+    PROMPT_BUDGET_CROSS_INDUSTRY: int = int(os.getenv("PROMPT_BUDGET_CROSS_INDUSTRY", "3000"))
+
+    # Transition enrichment: "batched" packs unique transitions into few prompts, "per_step" sends one each
+    ENRICHMENT_MODE: str = os.getenv("ENRICHMENT_MODE", "batched")
+    ENRICHMENT_BATCH_TOKEN_BUDGET: int = int(os.getenv("ENRICHMENT_BATCH_TOKEN_BUDGET", "6000"))
+    # Precomputed enrichment written by scripts/pre_enrich_transitions.py
+    USE_PRECOMPUTED_ENRICHMENT: bool = os.getenv("USE_PRECOMPUTED_ENRICHMENT", "true").lower() == "true"
+    ENRICHMENT_STORE_PATH: str = os.getenv("ENRICHMENT_STORE_PATH", "data/enrichment.sqlite3")
+
+    # Uploads: hard size cap, and the size above which they are spooled to disk
+    MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+    UPLOAD_SPOOL_BYTES: int = int(os.getenv("UPLOAD_SPOOL_BYTES", str(1024 * 1024)))
+    # PDF/DOCX text extraction runs in a process pool (0 workers = in a thread)
+    EXTRACT_MAX_WORKERS: int = int(os.getenv("EXTRACT_MAX_WORKERS", "2"))
+    EXTRACT_MAX_PENDING: int = int(os.getenv("EXTRACT_MAX_PENDING", "16"))
+    EXTRACT_TIMEOUT_SECONDS: float = float(os.getenv("EXTRACT_TIMEOUT_SECONDS", "15"))
+    EXTRACT_MAX_PAGES: int = int(os.getenv("EXTRACT_MAX_PAGES", "20"))
+    EXTRACT_MAX_CHARS: int = int(os.getenv("EXTRACT_MAX_CHARS", "60000"))
+    # PDFs at least this large have their pages split across the extraction workers
+    EXTRACT_PARALLEL_MIN_BYTES: int = int(os.getenv("EXTRACT_PARALLEL_MIN_BYTES", str(256 * 1024)))
+
+    # Bulk ingestion (scripts/bulk_ingest.py and /api/v1/resume/bulk)
+    BULK_INGEST_DIR: str = os.getenv("BULK_INGEST_DIR", "data/bulk")
+    BULK_INGEST_CONCURRENCY: int = int(os.getenv("BULK_INGEST_CONCURRENCY", "4"))
+    # Upper bound for the per-job concurrency a client may ask for
+    BULK_INGEST_MAX_CONCURRENCY: int = int(os.getenv("BULK_INGEST_MAX_CONCURRENCY", "16"))
+    # Finished API jobs are forgotten, and their archive and results deleted, after this long
+    BULK_INGEST_RETENTION_SECONDS: int = int(os.getenv("BULK_INGEST_RETENTION_SECONDS", str(24 * 3600)))
+    BULK_MAX_ARCHIVE_BYTES: int = int(os.getenv("BULK_MAX_ARCHIVE_BYTES", str(500 * 1024 * 1024)))
+
+    # Job API (/api/v1/jobs): worker coroutines per process, queued + running jobs
+    # accepted before new ones get a 503, how long results are kept, and how
+    # often a process marks its jobs alive (a job is lost after 3 missed beats)
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", "4"))
+    JOB_MAX_PENDING: int = int(os.getenv("JOB_MAX_PENDING", "100"))
+    JOB_RESULT_TTL: int = int(os.getenv("JOB_RESULT_TTL", "3600"))
+    JOB_HEARTBEAT_SECONDS: float = float(os.getenv("JOB_HEARTBEAT_SECONDS", "10"))
+
+    # "local" extracts resume skills with the phrase matcher in ml/models/skill_extractor.py
+    # and asks the LLM only for the other fields; "llm" has the LLM parse everything.
+    # "llm" stays the default until benchmarks/skill_extraction.py measures the matcher on an
+    # independently labeled set; the bundled labels come from its own vocabulary
+    RESUME_SKILLS_MODE: str = os.getenv("RESUME_SKILLS_MODE", "llm")
+
+    # Split resumes into sections, drop boilerplate and repeated lines and cap each
+    # section before prompting (app/core/resume_sections.py); "false" sends the text as extracted
+    RESUME_PREPROCESS: bool = os.getenv("RESUME_PREPROCESS", "true").lower() == "true"
+
+    # Resume parses are keyed by content hash, so they can be kept for a long time
+    RESUME_CACHE_TTL: int = int(os.getenv("RESUME_CACHE_TTL", str(7 * 24 * 3600)))
+
+    # Personalized transition enrichment from the LLM, per model, prompt version and skill set
+    ENRICHMENT_CACHE_TTL: int = int(os.getenv("ENRICHMENT_CACHE_TTL", str(24 * 3600)))
+
+    # Cross-industry plans: cache TTL, how long a plan is served without a background
+    # refresh, and optional write-back into the graph as synthetic roles
+    CROSS_INDUSTRY_CACHE_TTL: int = int(os.getenv("CROSS_INDUSTRY_CACHE_TTL", str(7 * 24 * 3600)))
+    CROSS_INDUSTRY_CACHE_FRESH_SECONDS: int = int(os.getenv("CROSS_INDUSTRY_CACHE_FRESH_SECONDS", str(24 * 3600)))
+    CROSS_INDUSTRY_WRITE_BACK: bool = os.getenv("CROSS_INDUSTRY_WRITE_BACK", "false").lower() == "true"
+
+    # Whole /api/v1/career-paths responses; results without any path or recommendation
+    # (e.g. unmatched roles) are kept for the shorter negative TTL
+    CAREER_PATHS_CACHE_TTL: int = int(os.getenv("CAREER_PATHS_CACHE_TTL", str(6 * 3600)))
+    CAREER_PATHS_NEGATIVE_CACHE_TTL: int = int(os.getenv("CAREER_PATHS_NEGATIVE_CACHE_TTL", "300"))
+
+    @field_validator("ENRICHMENT_STORE_PATH", "BULK_INGEST_DIR")
+    @classmethod
+    def _resolve_data_path(cls, path: str) -> str:
+        """Relative data paths are taken from backend/, not the working directory"""
+        return os.path.join(BACKEND_DIR, path)
 
     class Config:
         env_file = ".env"
@@ -1,44 +1,125 @@
 """
-AI-powered resume parser using Google Gemini via the official client.
+AI-powered resume parser using Google Gemini via the shared LLM gateway.
 """
 
-import asyncio
+import re
+from typing import Optional
 
-import google.generativeai as genai
 from langchain.output_parsers import PydanticOutputParser
-from app.models.user import ParsedResume
+from app.config import settings
+from app.core.prompt_budget import compact, prompt_budgets
+from app.core.resume_sections import ResumePreprocessor, resume_preprocessor
+from app.models.user import ParsedResume, ResumeProfile
+from app.services.llm_gateway import LLMGateway, llm_gateway
+from app.services.single_flight import make_key
+from app.utils.json_stream import recover_json
 from app.utils.pdf_parser import extract_text
 
+# Bump when parsing changes in a way the prompt does not capture (e.g. post-processing)
+PARSER_VERSION = 1
+
+EMAIL_PATTERN = re.compile(r"[\w.+-]+@[\w-]+(?:\.[\w-]+)+")
+PHONE_PATTERN = re.compile(r"(?<![\w])(?:\+\d{1,3}[\s.-]?)?(?:\(\d{2,4}\)[\s.-]?|\d{2,4}[\s.-])\d{3,4}[\s.-]?\d{3,4}(?![\w])")
+
+def find_email(text: str) -> Optional[str]:
+    match = EMAIL_PATTERN.search(text)
+    return match.group(0) if match else None
+
+def find_phone(text: str) -> Optional[str]:
+    match = PHONE_PATTERN.search(text)
+    return match.group(0).strip() if match else None
+
+def load_skill_extractor():
+    """The local skill extractor when RESUME_SKILLS_MODE is "local" and spaCy is available, else None"""
+    if settings.RESUME_SKILLS_MODE != "local":
+        return None
+    try:
+        from ml.models.skill_extractor import get_skill_extractor
+        return get_skill_extractor()
+    except ImportError as e:
+        print(f"[WARN] Local skill extraction unavailable, the LLM will extract skills: {e}")
+        return None
+
 class AIResumeParser:
-    def __init__(self, google_api_key: str):
-        genai.configure(api_key=google_api_key)
-        self.model = genai.GenerativeModel("gemini-2.0-flash")
-        self.parser = PydanticOutputParser(pydantic_object=ParsedResume)
+    """Parses resumes with Gemini.
 
-    async def parse_resume(self, resume_text: str) -> ParsedResume:
-        """Parse resume text into a structured format using Gemini."""
+    With a ``skill_extractor`` (see ml/models/skill_extractor.py), skills and
+    contact details are extracted locally and Gemini is only asked for the
+    remaining fields (``ResumeProfile``), which shortens both the prompt and
+    the answer. If the extractor finds no skills, Gemini parses everything.
+
+    Before prompting, the text is split into sections and trimmed by
+    ``preprocessor`` (see app/core/resume_sections.py); skills and contact
+    details are still read from the full text.
+    """
 
-        format_instructions = self.parser.get_format_instructions()
-        prompt = (
+    def __init__(self, llm: LLMGateway, skill_extractor=None, preprocessor: Optional[ResumePreprocessor] = None):
+        self.llm = llm
+        self.skill_extractor = skill_extractor
+        if preprocessor is None and settings.RESUME_PREPROCESS:
+            preprocessor = resume_preprocessor
+        self.preprocessor = preprocessor
+        self.parser = PydanticOutputParser(pydantic_object=ParsedResume)
+        self.profile_parser = PydanticOutputParser(pydantic_object=ResumeProfile)
+        # Same for every resume, so it is sent as a reusable prefix
+        self.instructions = compact(
             "You are an expert resume parser. Extract structured information from resumes "
             "accurately. For skills, categorize them and estimate proficiency based on context "
             "(junior/senior role, years of experience mentioned).\n\n"
-            f"{format_instructions}\n\n"
-            "Resume text:\n\n"
-            f"{resume_text}"
-        )
+            f"{self.parser.get_format_instructions()}"
+        ) + "\n\nResume text:\n\n"
+        self.profile_instructions = compact(
+            "You are an expert resume parser. Extract structured information from resumes "
+            "accurately.\n\n"
+            f"{self.profile_parser.get_format_instructions()}"
+        ) + "\n\nResume text:\n\n"
+
+    @property
+    def cache_version(self) -> str:
+        """Changes whenever the same text could parse differently: parser, prompt, budget, model,
+        skill vocabulary or preprocessing"""
+        skills = self.skill_extractor.version if self.skill_extractor else "llm"
+        sections = self.preprocessor.version if self.preprocessor else "raw"
+        prompt = make_key(self.instructions, self.profile_instructions, prompt_budgets['parse_resume'].max_tokens,
+                          skills, sections)[:12]
+        return f"v{PARSER_VERSION}:{prompt}:{self.llm.model_id}"
+
+    async def parse_resume(self, resume_text: str) -> ParsedResume:
+        """Parse resume text into a structured format using Gemini."""
+
+        skills = self.skill_extractor.extract(resume_text) if self.skill_extractor else []
+        body = self.preprocessor.prepare(resume_text).text if self.preprocessor else resume_text
+        if skills:
+            profile = await self._parse_with_llm(body, self.profile_instructions, self.profile_parser, ResumeProfile)
+            return ParsedResume(
+                **profile.dict(),
+                email=find_email(resume_text),
+                phone=find_phone(resume_text),
+                skills=skills
+            )
+        return await self._parse_with_llm(body, self.instructions, self.parser, ParsedResume)
+
+    async def _parse_with_llm(self, resume_text: str, instructions: str, parser: PydanticOutputParser, model):
+        resume_text = prompt_budgets['parse_resume'].fit_text(instructions, resume_text)
 
-        response = await asyncio.to_thread(self.model.generate_content, prompt)
-        output_text = getattr(response, "text", None)
+        # Identical resumes uploaded concurrently share one Gemini call
+        output_text = await self.llm.generate(resume_text, site="parse_resume", prefix=instructions)
 
         if not output_text:
             raise ValueError("Gemini returned an empty response while parsing resume")
 
-        return self.parser.parse(output_text)
+        try:
+            return parser.parse(output_text)
+        except Exception:
+            # Salvage a truncated or slightly malformed answer before giving up
+            data, _ = recover_json(output_text)
+            if not isinstance(data, dict):
+                raise
+            return model(**data)
 
 # Usage Example
 async def parse_uploaded_resume(file_bytes: bytes, filename: str):
-    parser = AIResumeParser(google_api_key="your-key")
+    parser = AIResumeParser(llm=llm_gateway)
     
     # Extract text
     text = extract_text(file_bytes, filename)
@@ -0,0 +1,246 @@
+"""
+Bulk resume ingestion
+
+Reads every resume in a directory or archive (zip or tar), parses each one
+through the resume parse cache (text extraction in the process pool, then the
+LLM) with bounded concurrency, and appends one JSONL record per document as
+it finishes. Re-running a job with the same output file skips the documents
+it already parsed, so a crashed run picks up where it stopped.
+"""
+
+import asyncio
+import json
+import os
+import tarfile
+import time
+import uuid
+import zipfile
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+from app.services.extraction import SpooledUpload
+from app.services.metrics import LatencyRecorder, StageTimer
+from app.services.resume_cache import ResumeParseCache
+
+SUPPORTED_SUFFIXES = ('.pdf', '.docx', '.txt')
+STAGES = ('read', 'cache', 'extract', 'llm_parse', 'write')
+
+def _supported(name: str) -> bool:
+    base = os.path.basename(name)
+    return not base.startswith('.') and base.lower().endswith(SUPPORTED_SUFFIXES) and '__MACOSX' not in name
+
+def iter_documents(source: str, max_bytes: int) -> Iterator[Tuple[str, Optional[bytes]]]:
+    """``(name, bytes)`` for each resume in a directory, zip or tar; bytes is None if over ``max_bytes``"""
+    if os.path.isdir(source):
+        for root, dirs, files in os.walk(source):
+            dirs.sort()
+            for filename in sorted(files):
+                path = os.path.join(root, filename)
+                name = os.path.relpath(path, source)
+                if not _supported(name):
+                    continue
+                if os.path.getsize(path) > max_bytes:
+                    yield name, None
+                    continue
+                with open(path, 'rb') as f:
+                    yield name, f.read()
+    elif zipfile.is_zipfile(source):
+        with zipfile.ZipFile(source) as archive:
+            for info in archive.infolist():
+                if info.is_dir() or not _supported(info.filename):
+                    continue
+                if info.file_size > max_bytes:
+                    yield info.filename, None
+                    continue
+                yield info.filename, archive.read(info)
+    elif tarfile.is_tarfile(source):
+        with tarfile.open(source) as archive:
+            for member in archive:
+                if not member.isfile() or not _supported(member.name):
+                    continue
+                if member.size > max_bytes:
+                    yield member.name, None
+                    continue
+                yield member.name, archive.extractfile(member).read()
+    else:
+        raise ValueError(f"{source} is not a directory, zip or tar archive")
+
+def load_completed(output: str) -> Set[str]:
+    """Digests already parsed into ``output``; drops a half-written last line left by a crash"""
+    completed: Set[str] = set()
+    if not os.path.exists(output):
+        return completed
+    with open(output, 'rb+') as f:
+        data = f.read()
+        end = data.rfind(b'\n') + 1
+        if end < len(data):
+            print(f"[WARN] Dropping incomplete last record in {output}")
+            f.truncate(end)
+    for line in data[:end].splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if record.get('status') == 'ok':
+            completed.add(record['digest'])
+    return completed
+
+class BulkIngestJob:
+    """One ingestion run; ``snapshot()`` reports progress and per-stage throughput"""
+
+    def __init__(self, source: str, output: str, resume_cache: ResumeParseCache, concurrency: int = 4,
+                 max_bytes: int = 10 * 1024 * 1024, job_id: Optional[str] = None):
+        self.id = job_id or uuid.uuid4().hex[:12]
+        self.source = source
+        self.output = output
+        self.resume_cache = resume_cache
+        self.concurrency = max(1, concurrency)
+        self.max_bytes = max_bytes
+        self.status = "pending"
+        self.error: Optional[str] = None
+        self.counts = {'discovered': 0, 'already_done': 0, 'parsed': 0, 'failed': 0, 'skipped_too_large': 0}
+        self.cache_outcomes: Dict[str, int] = {}
+        self.stages = {stage: LatencyRecorder() for stage in STAGES}
+        self.stage_seconds = {stage: 0.0 for stage in STAGES}
+        self.enumerated = False
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self) -> asyncio.Task:
+        """Run in the background; the job keeps the only reference to its task"""
+        self.task = asyncio.create_task(self.run())
+        return self.task
+
+    async def run(self):
+        self.status = "running"
+        self.started = time.perf_counter()
+        try:
+            completed = await asyncio.to_thread(load_completed, self.output)
+            os.makedirs(os.path.dirname(self.output) or '.', exist_ok=True)
+            # Bounded so reading the source never runs far ahead of parsing
+            queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+            with open(self.output, 'a', encoding='utf-8') as out:
+                workers = [asyncio.create_task(self._worker(queue, out)) for _ in range(self.concurrency)]
+                try:
+                    await self._produce(queue, completed)
+                    for _ in workers:
+                        await queue.put(None)
+                    await asyncio.gather(*workers)
+                finally:
+                    for worker in workers:
+                        worker.cancel()
+            self.status = "completed"
+        except asyncio.CancelledError:
+            self.status = "cancelled"
+            raise
+        except Exception as e:
+            self.status = "failed"
+            self.error = str(e)
+            print(f"[ERROR] Bulk ingest {self.id} failed: {e}")
+        finally:
+            self.finished = time.perf_counter()
+
+    async def _produce(self, queue: asyncio.Queue, completed: Set[str]):
+        documents = iter_documents(self.source, self.max_bytes)
+        while True:
+            started = time.perf_counter()
+            item = await asyncio.to_thread(next, documents, None)
+            if item is None:
+                break
+            name, data = item
+            self.counts['discovered'] += 1
+            if data is None:
+                self.counts['skipped_too_large'] += 1
+                print(f"[WARN] Skipping {name}: larger than {self.max_bytes} bytes")
+                continue
+            upload = SpooledUpload.from_bytes(data, os.path.basename(name))
+            self._observe('read', time.perf_counter() - started)
+            if upload.digest in completed:
+                self.counts['already_done'] += 1
+                continue
+            # The same file twice in one source is parsed once
+            completed.add(upload.digest)
+            await queue.put((name, upload))
+        self.enumerated = True
+
+    async def _worker(self, queue: asyncio.Queue, out):
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            name, upload = item
+            timer = StageTimer()
+            try:
+                parsed, outcome = await self.resume_cache.get_or_parse(upload, timer)
+                record = {'source': name, 'digest': upload.digest, 'status': 'ok', 'cache': outcome,
+                          'resume': parsed}
+                self.cache_outcomes[outcome] = self.cache_outcomes.get(outcome, 0) + 1
+                self.counts['parsed'] += 1
+            except Exception as e:
+                print(f"[WARN] Failed to parse {name}: {e}")
+                record = {'source': name, 'digest': upload.digest, 'status': 'error', 'error': str(e)}
+                self.counts['failed'] += 1
+            with timer.stage('write'):
+                out.write(json.dumps(record) + "\n")
+                out.flush()
+            for stage, seconds in timer.stages.items():
+                self._observe(stage, seconds)
+
+    def _observe(self, stage: str, seconds: float):
+        self.stages[stage].observe(seconds)
+        self.stage_seconds[stage] += seconds
+
+    def snapshot(self) -> Dict:
+        elapsed = ((self.finished or time.perf_counter()) - self.started) if self.started else 0.0
+        processed = self.counts['parsed'] + self.counts['failed']
+        stages = {}
+        for stage, recorder in self.stages.items():
+            summary = recorder.snapshot()
+            busy = self.stage_seconds[stage]
+            # Documents one worker gets through per second of time spent in the stage
+            summary['docs_per_busy_second'] = round(summary['total'] / busy, 2) if busy else 0.0
+            stages[stage] = summary
+        return {
+            'id': self.id,
+            'status': self.status,
+            'error': self.error,
+            'source': self.source,
+            'output': self.output,
+            'concurrency': self.concurrency,
+            **self.counts,
+            'remaining': None if not self.enumerated else
+                self.counts['discovered'] - self.counts['already_done'] - self.counts['skipped_too_large'] - processed,
+            'cache_outcomes': dict(self.cache_outcomes),
+            'elapsed_seconds': round(elapsed, 3),
+            'docs_per_second': round(processed / elapsed, 2) if elapsed else 0.0,
+            'stages': stages
+        }
+
+    def progress(self) -> str:
+        """One-line progress for the CLI"""
+        snapshot = self.snapshot()
+        total = snapshot['discovered'] if self.enumerated else f"{snapshot['discovered']}+"
+        return (f"{snapshot['parsed'] + snapshot['failed'] + snapshot['already_done']}/{total} "
+                f"(parsed={snapshot['parsed']} failed={snapshot['failed']} "
+                f"already_done={snapshot['already_done']}) {snapshot['docs_per_second']} docs/s")
+
+# Jobs started through the API, by id
+bulk_jobs: Dict[str, BulkIngestJob] = {}
+
+def prune_bulk_jobs(retention_seconds: float) -> List[str]:
+    """Forget API jobs finished more than ``retention_seconds`` ago and delete their archive and results.
+
+    Only for ``bulk_jobs``: the API owns the files of those jobs, while a CLI
+    run reads the caller's own directory or archive.
+    """
+    now = time.perf_counter()
+    expired = [job_id for job_id, job in bulk_jobs.items()
+               if job.finished is not None and now - job.finished >= retention_seconds]
+    for job_id in expired:
+        job = bulk_jobs.pop(job_id)
+        for path in (job.source, job.output):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+    return expired
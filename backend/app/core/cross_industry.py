@@ -0,0 +1,303 @@
+"""
+Cross-industry transition plans from the LLM
+
+Used when graph search finds no path to the target role: the prompt, the
+streamed generation of a raw plan and its conversion into the career path
+response shape. Caching and write-back are handled by PathFinder.
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.core.prompt_budget import compact, prompt_budgets
+from app.services.llm_gateway import LLMGateway, StreamInterrupted
+from app.services.single_flight import make_key
+from app.utils.json_stream import JSONStreamParser
+
+# Different weighting for cross-industry transitions; part of path_finder.SCORING_VERSION
+CROSS_INDUSTRY_SCORE_WEIGHTS = {
+    'skill_match': 0.3,
+    'success_rate': 0.25,
+    'salary_potential': 0.25,
+    'timeline': 0.1,
+    'difficulty': 0.1
+}
+
+# Static part of the cross-industry prompt; the roles and skills of each request follow it
+CROSS_INDUSTRY_INSTRUCTIONS = compact("""You are an expert career counselor specializing in cross-industry career transitions.
+You will be given a current role, a target role and the user's skills (at the end of this prompt).
+
+IMPORTANT: Provide detailed information including realistic salary data, skill matching, AND comprehensive learning resources.
+
+Return your response as a JSON object with this exact structure:
+{
+  "is_feasible": true/false,
+  "feasibility_note": "explanation of why this transition is or isn't feasible",
+  "estimated_timeline_months": number,
+  "difficulty_rating": number (1-10),
+  
+  "salary_info": {
+    "current_role_avg_salary": number (annual USD),
+    "target_role_avg_salary": number (annual USD),
+    "initial_salary_drop": number (if any, negative for decrease),
+    "long_term_salary_potential": number (after 5 years in new field),
+    "salary_note": "explanation of salary trajectory"
+  },
+  
+  "skill_analysis": {
+    "transferable_skills": ["skill1", "skill2", ...],
+    "skill_match_percentage": number (0-100),
+    "skills_that_translate": [
+      {"from": "current skill", "to": "how it applies in new role"}
+    ],
+    "missing_critical_skills": ["skill1", "skill2", ...]
+  },
+  
+  "transition_steps": [
+    {
+      "step": 1,
+      "title": "Step title",
+      "description": "Detailed description",
+      "duration_months": number,
+      "estimated_salary": number (expected earnings during this step),
+      "skills_to_acquire": ["skill1", "skill2", ...],
+      "actions": ["action1", "action2", ...],
+      "estimated_cost": number (tuition, certifications, etc. in USD),
+      
+      "learning_resources": [
+        {
+          "skill": "specific skill name",
+          "resource_type": "youtube|course|documentation|certification|book|bootcamp",
+          "title": "Resource title",
+          "url": "https://actual-url.com OR search term if URL unknown",
+          "provider": "YouTube|Coursera|Udemy|edX|Official Docs|etc",
+          "duration": "2 hours|4 weeks|3 months|etc",
+          "cost": "Free|$49|$299|etc",
+          "difficulty": "Beginner|Intermediate|Advanced",
+          "why_recommended": "Brief explanation"
+        }
+      ],
+      
+      "certifications": [
+        {
+          "name": "Certification name",
+          "provider": "Issuing organization",
+          "estimated_cost": number,
+          "study_duration": "time needed to prepare",
+          "validity": "lifetime|2 years|etc",
+          "url": "https://certification-url.com OR search term",
+          "importance": "Required|Highly Recommended|Optional"
+        }
+      ],
+      
+      "practical_projects": [
+        {
+          "project_title": "What to build/do",
+          "description": "How it helps learning",
+          "estimated_time": "duration",
+          "resources": ["link1", "link2"]
+        }
+      ]
+    }
+  ],
+  
+  "challenges": ["challenge1", "challenge2", ...],
+  "success_tips": ["tip1", "tip2", ...],
+  "alternative_paths": ["alternative role 1", "alternative role 2", ...],
+  "realistic_success_rate": number (0-100, percentage likelihood of successful transition),
+  
+  "community_resources": [
+    {
+      "type": "Forum|Discord|Reddit|LinkedIn Group|Slack",
+      "name": "Community name",
+      "url": "URL or search term",
+      "description": "What you can get from this community"
+    }
+  ],
+  
+  "mentorship_opportunities": [
+    "Where to find mentors in the target field"
+  ]
+}
+
+CRITICAL REQUIREMENTS FOR LEARNING RESOURCES:
+1. Provide REAL, SPECIFIC resources (actual YouTube channels, course names, documentation sites)
+2. For popular transitions, include well-known resources (e.g., for programming: "freeCodeCamp", "The Odin Project")
+3. For aviation: FAA handbooks, specific YouTube channels like "Flight Insight", "MzeroA"
+4. For data science: "StatQuest", "3Blue1Brown", "Andrew Ng's Machine Learning Course"
+5. Include both FREE and PAID options
+6. Provide realistic time estimates for each resource
+7. Include official documentation URLs where applicable
+8. For certifications, mention actual certification names (AWS Certified, Google Cloud, FAA licenses)
+
+EXAMPLES OF GOOD RESOURCES:
+- YouTube: "Traversy Media - Full Stack Web Development", "freeCodeCamp Python Tutorial"
+- Courses: "CS50 Introduction to Computer Science (Harvard/edX)", "Google Data Analytics Certificate"
+- Docs: "MDN Web Docs", "Python Official Tutorial", "React Documentation"
+- Certifications: "AWS Solutions Architect", "CompTIA A+", "PMP Certification"
+
+Be realistic and honest. If the transition is extremely difficult or unlikely, say so and suggest more feasible alternatives.""") + "\n"
+
+# Cached plans are keyed by the prompt they were generated with
+CROSS_INDUSTRY_PROMPT_VERSION = make_key(CROSS_INDUSTRY_INSTRUCTIONS)[:8]
+
+async def generate_cross_industry_guidance(llm: LLMGateway, current_role: str, target_role: str, user_skills: List[str],
+                                          on_step: Optional[Callable[[Dict], None]] = None) -> Tuple[Dict, bool]:
+    """Ask Gemini for a raw cross-industry transition plan.
+
+    The answer is streamed; ``on_step`` gets each transition step as soon as it
+    is complete. Returns the plan and whether it arrived complete (a truncated
+    answer keeps every field up to the cut).
+    """
+    task = f"""
+TASK: Create a realistic step-by-step career transition plan from {current_role} to {target_role}.
+
+CURRENT SITUATION:
+- Current Role: {current_role}
+- Target Role: {target_role}
+- Current Skills: """
+    skills = prompt_budgets['cross_industry'].fit_items(
+        CROSS_INDUSTRY_INSTRUCTIONS, user_skills[:10], render=lambda i, skill: f"{skill}, ", overhead=task
+    )
+    prompt = task + (", ".join(skills) if skills else "Not specified")
+    
+    parser = JSONStreamParser([('transition_steps', '*')])
+    try:
+        async for chunk in llm.stream(prompt, site="cross_industry", prefix=CROSS_INDUSTRY_INSTRUCTIONS):
+            for _, step in parser.feed(chunk):
+                if on_step is not None and isinstance(step, dict):
+                    on_step(step)
+    except StreamInterrupted as e:
+        print(f"[WARN] {e}")
+    
+    guidance, complete = parser.result()
+    if not isinstance(guidance, dict):
+        raise ValueError("Gemini returned no usable cross-industry plan")
+    return guidance, complete
+
+def format_cross_industry_plan(guidance: Dict, current_role: str, target_role: str) -> Dict:
+    """Career path response for a raw plan: one synthetic path, or the alternatives if it is not feasible"""
+    if guidance.get('is_feasible'):
+        # Create synthetic path for UI
+        steps = guidance.get('transition_steps', [])
+        salary_info = guidance.get('salary_info', {})
+        skill_analysis = guidance.get('skill_analysis', {})
+        
+        current_salary = salary_info.get('current_role_avg_salary', 0)
+        target_salary = salary_info.get('target_role_avg_salary', 0)
+        
+        transitions = []
+        for i, step in enumerate(steps):
+            step_salary = step.get('estimated_salary', current_salary)
+            prev_salary = current_salary if i == 0 else steps[i-1].get('estimated_salary', current_salary)
+            
+            transitions.append({
+                'step': step.get('step', i + 1),
+                'from_role': current_role if i == 0 else steps[i-1].get('title', f"Step {i}"),
+                'to_role': step.get('title', f"Step {i+1}"),
+                'duration_months': step.get('duration_months', 12),
+                'difficulty': guidance.get('difficulty_rating', 7),
+                'success_rate': guidance.get('realistic_success_rate', 50) / 100,
+                'salary_from': int(prev_salary),
+                'salary_to': int(step_salary),
+                'salary_increase': int(step_salary - prev_salary),
+                'required_skills': step.get('skills_to_acquire', []),
+                'description': step.get('description', ''),
+                'actions': step.get('actions', []),
+                'estimated_cost': step.get('estimated_cost', 0),
+                'learning_resources': step.get('learning_resources', []),
+                'certifications': step.get('certifications', []),
+                'practical_projects': step.get('practical_projects', [])
+            })
+        
+        # Calculate overall salary growth (from current to target)
+        final_salary = target_salary or (steps[-1].get('estimated_salary', current_salary) if steps else current_salary)
+        salary_growth = int(final_salary - current_salary)
+        
+        # Get skill match percentage
+        skill_match = skill_analysis.get('skill_match_percentage', 0)
+        transferable_skills = skill_analysis.get('transferable_skills', [])
+        missing_skills = skill_analysis.get('missing_critical_skills', [])
+        
+        # Add all step-specific skills to missing skills
+        all_missing = list(set(missing_skills + [s for step in steps for s in step.get('skills_to_acquire', [])]))
+        
+        path = {
+            'roles': [current_role] + [s.get('title', f"Step {i+1}") for i, s in enumerate(steps)] + [target_role],
+            'timeline_months': guidance.get('estimated_timeline_months', sum(s.get('duration_months', 12) for s in steps)),
+            'difficulty': guidance.get('difficulty_rating', 7),
+            'salary_growth': salary_growth,
+            'skill_match': skill_match,
+            'missing_skills': all_missing,
+            'matched_skills': transferable_skills,
+            'transitions': transitions,
+            'is_cross_industry': True,
+            'feasibility_note': guidance.get('feasibility_note', ''),
+            'challenges': guidance.get('challenges', []),
+            'success_tips': guidance.get('success_tips', []),
+            'alternative_paths': guidance.get('alternative_paths', []),
+            'salary_info': {
+                'current_avg': int(current_salary),
+                'target_avg': int(final_salary),
+                'initial_drop': int(salary_info.get('initial_salary_drop', 0)),
+                'long_term_potential': int(salary_info.get('long_term_salary_potential', final_salary)),
+                'note': salary_info.get('salary_note', '')
+            },
+            'skill_translation': skill_analysis.get('skills_that_translate', []),
+            'realistic_success_rate': guidance.get('realistic_success_rate', 50),
+            'community_resources': guidance.get('community_resources', []),
+            'mentorship_opportunities': guidance.get('mentorship_opportunities', [])
+        }
+        
+        # Calculate path score
+        path['score'] = calculate_cross_industry_score(path)
+        
+        return {
+            'paths': [path],
+            'recommended_path': path,
+            'skill_gaps': [{
+                'roles': path['roles'],
+                'match_percentage': skill_match,
+                'matched_skills': transferable_skills,
+                'missing_skills': all_missing
+            }]
+        }
+    else:
+        # Not feasible - return guidance with alternatives
+        return {
+            'paths': [],
+            'recommended_path': {
+                'is_cross_industry': True,
+                'is_feasible': False,
+                'feasibility_note': guidance.get('feasibility_note', 'This transition is very challenging'),
+                'alternative_paths': guidance.get('alternative_paths', []),
+                'challenges': guidance.get('challenges', [])
+            },
+            'skill_gaps': []
+        }
+
+def calculate_cross_industry_score(path: Dict) -> float:
+    """Calculate score for cross-industry transitions"""
+    weights = CROSS_INDUSTRY_SCORE_WEIGHTS
+    
+    # Normalize values
+    skill_score = path.get('skill_match', 0) / 100
+    success_score = path.get('realistic_success_rate', 50) / 100
+    
+    # Salary potential (considering long-term, not just immediate)
+    salary_info = path.get('salary_info', {})
+    long_term_potential = salary_info.get('long_term_potential', salary_info.get('target_avg', 0))
+    current_salary = salary_info.get('current_avg', 1)
+    salary_score = min(max(long_term_potential / max(current_salary, 1), 0), 2) / 2  # Normalize to 0-1
+    
+    timeline_score = max(0, 1 - (path.get('timeline_months', 24) / 72))  # 6 years max
+    difficulty_score = max(0, 1 - (path.get('difficulty', 5) / 10))
+    
+    score = (
+        weights['skill_match'] * skill_score +
+        weights['success_rate'] * success_score +
+        weights['salary_potential'] * salary_score +
+        weights['timeline'] * timeline_score +
+        weights['difficulty'] * difficulty_score
+    )
+    
+    return round(score * 100, 2)  # Return as percentage
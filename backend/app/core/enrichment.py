@@ -0,0 +1,280 @@
+"""
+Gemini-powered enrichment of career transitions with learning resources,
+certifications and practical projects
+"""
+
+import asyncio
+import json
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.prompt_budget import estimate_tokens
+from app.services.cache import RedisCache
+from app.services.cache_versions import CacheVersions
+from app.services.enrichment_store import EnrichmentStore
+from app.services.graph_db import GENERATED_ROLE_PREFIX
+from app.services.llm_gateway import LLMGateway
+from app.services.single_flight import make_key
+from app.utils.json_stream import JSONStreamParser, recover_json
+
+# Bump whenever the step prompt changes so precomputed enrichment is regenerated
+ENRICHMENT_PROMPT_VERSION = "v1"
+
+ENRICHMENT_KEYS = ('learning_resources', 'certifications', 'practical_projects')
+
+# Rough size of one transition's JSON answer, used to pack batches under the budget
+OUTPUT_TOKENS_PER_TRANSITION = 700
+
+STEP_INSTRUCTIONS = """1. 3-5 specific learning resources (YouTube, courses, docs, books, bootcamps) for the most important skills in this step.
+2. 1-2 relevant certifications (with provider, cost, and URL or search term).
+3. 1-2 practical project ideas (with description and resource links).
+4. For each resource, include: skill, resource_type, title, url or search term, provider, duration, cost, difficulty, why_recommended.
+5. For each certification: name, provider, estimated_cost, study_duration, validity, url or search term, importance.
+6. For each project: project_title, description, estimated_time, resources (links)."""
+
+def normalize_enrichment(data: Optional[Dict]) -> Dict:
+    data = data if isinstance(data, dict) else {}
+    return {key: data.get(key, []) for key in ENRICHMENT_KEYS}
+
+def transition_key(step: Dict) -> Tuple:
+    """Transitions with the same roles and required skills get the same enrichment"""
+    return (step['from_role'], step['to_role'], tuple(step.get('required_skills', [])))
+
+def store_key(step: Dict) -> Tuple[str, str]:
+    """Key of a transition's precomputed enrichment.
+
+    Roles of generated plans share generic step titles across plans, so their
+    transitions are keyed by role id; every other transition by role title.
+    """
+    ids = (step.get('from_role_id'), step.get('to_role_id'))
+    if any(role_id and role_id.startswith(GENERATED_ROLE_PREFIX) for role_id in ids):
+        return ids
+    return (step['from_role'], step['to_role'])
+
+def _skills_text(user_skills: List[str]) -> str:
+    return ", ".join(user_skills[:10]) if user_skills else "Not specified"
+
+def build_step_prompt(step: Dict, from_role: str, to_role: str, user_skills: List[str]) -> str:
+    return f"""You are an expert career coach. For the transition from '{from_role}' to '{to_role}', provide:
+{STEP_INSTRUCTIONS}
+Context: User skills: {_skills_text(user_skills)}. Step required skills: {', '.join(step.get('required_skills', []))}.
+Return as JSON with keys: learning_resources, certifications, practical_projects."""
+
+def build_batch_prompt(steps: List[Dict], user_skills: List[str]) -> str:
+    transitions = [
+        {
+            'id': f"t{i}",
+            'from_role': step['from_role'],
+            'to_role': step['to_role'],
+            'required_skills': step.get('required_skills', [])
+        }
+        for i, step in enumerate(steps)
+    ]
+    return f"""You are an expert career coach. For EACH career transition listed below, provide:
+{STEP_INSTRUCTIONS}
+Context: User skills: {_skills_text(user_skills)}.
+
+TRANSITIONS:
+{json.dumps(transitions, indent=2)}
+
+Return ONE JSON object whose keys are the transition ids ("t0", "t1", ...). Each value must be an object
+with keys: learning_resources, certifications, practical_projects."""
+
+def pack_batches(steps: List[Dict], token_budget: int) -> List[List[Dict]]:
+    """Split steps into batches whose estimated prompt + answer size fits the budget"""
+    batches: List[List[Dict]] = []
+    current: List[Dict] = []
+    used = 0
+    for step in steps:
+        cost = estimate_tokens(json.dumps(step.get('required_skills', []))) + OUTPUT_TOKENS_PER_TRANSITION
+        if current and used + cost > token_budget:
+            batches.append(current)
+            current, used = [], 0
+        current.append(step)
+        used += cost
+    if current:
+        batches.append(current)
+    return batches
+
+def _batch_index(transition_id: Any, count: int) -> Optional[int]:
+    """'t3' -> 3 for ids that belong to a batch of ``count`` transitions"""
+    if isinstance(transition_id, str) and transition_id[:1] == "t" and transition_id[1:].isdigit():
+        index = int(transition_id[1:])
+        if index < count:
+            return index
+    return None
+
+def _is_enrichment(item: Any) -> bool:
+    return isinstance(item, dict) and any(isinstance(item.get(key), list) for key in ENRICHMENT_KEYS)
+
+def parse_batch_response(response_text: str, count: int) -> Dict[int, Dict]:
+    """Map batch positions to enrichment; entries that fail to parse are left out.
+
+    Truncated or damaged answers keep every transition up to the defect.
+    """
+    data, _ = recover_json(response_text)
+    if not isinstance(data, dict):
+        return {}
+
+    parsed = {}
+    for transition_id, item in data.items():
+        index = _batch_index(transition_id, count)
+        if index is not None and _is_enrichment(item):
+            parsed[index] = normalize_enrichment(item)
+    return parsed
+
+async def enrich_step_with_gemini(llm: LLMGateway, step: Dict, from_role: str, to_role: str,
+                                  user_skills: List[str]) -> Dict:
+    """Ask Gemini for resources, certifications and projects for one transition"""
+    prompt = build_step_prompt(step, from_role, to_role, user_skills)
+    response_text = await llm.generate(prompt, site="enrich_step")
+    # A truncated answer still yields the resources that were complete
+    data, _ = recover_json(response_text)
+    return normalize_enrichment(data)
+
+async def _stream_batch(llm: LLMGateway, steps: List[Dict],
+                        user_skills: List[str]) -> AsyncIterator[Tuple[int, Dict]]:
+    """Yield ``(position, enrichment)`` for a batch as each transition's answer completes"""
+    if len(steps) == 1:
+        step = steps[0]
+        yield 0, await enrich_step_with_gemini(llm, step, step['from_role'], step['to_role'], user_skills)
+        return
+
+    parser = JSONStreamParser([('*',)])
+    done: Dict[int, Dict] = {}
+    try:
+        async for chunk in llm.stream(build_batch_prompt(steps, user_skills), site="enrich_batch"):
+            for (transition_id,), item in parser.feed(chunk):
+                index = _batch_index(transition_id, len(steps))
+                if index is not None and index not in done and _is_enrichment(item):
+                    done[index] = normalize_enrichment(item)
+                    yield index, done[index]
+    except Exception as e:
+        print(f"[WARN] Batched enrichment failed, falling back to per-step calls: {e}")
+
+    # Transitions cut off mid-answer keep whatever arrived complete
+    data, _ = parser.result()
+    if isinstance(data, dict):
+        for transition_id, item in data.items():
+            index = _batch_index(transition_id, len(steps))
+            if index is not None and index not in done and _is_enrichment(item):
+                done[index] = normalize_enrichment(item)
+                yield index, done[index]
+
+    missing = [i for i in range(len(steps)) if i not in done]
+    if missing:
+        print(f"[DEBUG] Batch enrichment parsed {len(done)}/{len(steps)} transitions, retrying {len(missing)} individually")
+
+        async def retry(i: int):
+            return i, await enrich_step_with_gemini(llm, steps[i], steps[i]['from_role'], steps[i]['to_role'], user_skills)
+
+        for next_done in asyncio.as_completed([retry(i) for i in missing]):
+            yield await next_done
+
+def has_enrichment(data: Dict) -> bool:
+    return any(data.get(key) for key in ENRICHMENT_KEYS)
+
+def enrichment_cache_key(llm: LLMGateway, step: Dict, user_skills: List[str], namespace: str = "") -> str:
+    """Cache key for live enrichment: the prompt depends on the transition and the user's skills"""
+    digest = make_key(*transition_key(step), _skills_text(user_skills))
+    return f"enrichment:{namespace}:{ENRICHMENT_PROMPT_VERSION}:{llm.model_id}:{digest}"
+
+async def iter_enrichments(llm: LLMGateway, transitions: List[Dict], user_skills: List[str],
+                           mode: str = "batched", token_budget: int = 6000,
+                           store: Optional[EnrichmentStore] = None, cache: Optional[RedisCache] = None,
+                           cache_ttl: int = 24 * 3600,
+                           versions: Optional[CacheVersions] = None) -> AsyncIterator[Tuple[Tuple, Dict]]:
+    """Yield ``(transition_key, enrichment)`` for each unique transition as soon as it is ready.
+
+    Transitions found in ``store`` are answered from precomputed enrichment
+    first, then from ``cache`` (one MGET for all of them); only the rest go to
+    Gemini. In ``batched`` mode those are packed into as few prompts as the
+    token budget allows; ``per_step`` sends one prompt per transition. Live
+    answers are written back to ``cache`` in one pipeline once all have
+    arrived, except empty ones; Redis errors are treated as misses. With
+    ``versions``, cached answers are dropped when the prompts namespace is
+    bumped.
+    """
+    unique: Dict[Tuple, Dict] = {}
+    for step in transitions:
+        unique.setdefault(transition_key(step), step)
+    unique_steps = list(unique.values())
+
+    if store is not None:
+        # SQLite read, off the event loop
+        precomputed = await asyncio.to_thread(store.get_many, [store_key(step) for step in unique_steps])
+        live_steps = []
+        for step in unique_steps:
+            data = precomputed.get(store_key(step))
+            if data is None:
+                live_steps.append(step)
+            else:
+                yield transition_key(step), normalize_enrichment(data)
+        unique_steps = live_steps
+
+    if cache is not None and unique_steps:
+        namespace = await versions.tag('prompts') if versions is not None else ""
+        keys = {
+            transition_key(step): enrichment_cache_key(llm, step, user_skills, namespace)
+            for step in unique_steps
+        }
+        try:
+            cached = await cache.get_many(keys.values())
+        except Exception as e:
+            print(f"[WARN] Enrichment cache read failed: {e}")
+            cached = {}
+        live_steps = []
+        for step in unique_steps:
+            data = cached.get(keys[transition_key(step)])
+            if data is None:
+                live_steps.append(step)
+            else:
+                yield transition_key(step), normalize_enrichment(data)
+        unique_steps = live_steps
+
+    if mode == "batched":
+        groups = pack_batches(unique_steps, token_budget)
+    else:
+        groups = [[step] for step in unique_steps]
+
+    # Batches stream concurrently; their results are merged in arrival order
+    results: asyncio.Queue = asyncio.Queue()
+
+    async def _run(group: List[Dict]):
+        try:
+            async for index, result in _stream_batch(llm, group, user_skills):
+                results.put_nowait((transition_key(group[index]), result))
+        except Exception as e:
+            results.put_nowait(e)
+
+    tasks = [asyncio.ensure_future(_run(group)) for group in groups]
+    live: Dict[str, Dict] = {}
+    try:
+        for _ in range(len(unique_steps)):
+            item = await results.get()
+            if isinstance(item, Exception):
+                raise item
+            # Empty answers (malformed or truncated JSON) are not cached, so the next request asks again
+            if cache is not None and has_enrichment(item[1]):
+                live[keys[item[0]]] = item[1]
+            yield item
+        if live:
+            try:
+                await cache.set_many(live, expire=cache_ttl)
+            except Exception as e:
+                print(f"[WARN] Enrichment cache write failed: {e}")
+    finally:
+        # The consumer may stop early (e.g. a streaming client disconnects)
+        for task in tasks:
+            task.cancel()
+
+async def enrich_transitions(llm: LLMGateway, transitions: List[Dict], user_skills: List[str],
+                             mode: str = "batched", token_budget: int = 6000,
+                             store: Optional[EnrichmentStore] = None, cache: Optional[RedisCache] = None,
+                             cache_ttl: int = 24 * 3600, versions: Optional[CacheVersions] = None) -> List[Dict]:
+    """Enrich every transition, calling Gemini at most once per unique transition"""
+    by_key = {
+        key: result
+        async for key, result in iter_enrichments(llm, transitions, user_skills, mode, token_budget, store,
+                                                  cache, cache_ttl, versions)
+    }
+    return [by_key[transition_key(step)] for step in transitions]
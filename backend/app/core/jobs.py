@@ -0,0 +1,237 @@
+"""
+Asynchronous jobs for slow API calls
+
+Resume parsing and career-path generation can take tens of seconds of LLM
+time. The job endpoints answer immediately with a job id; the work runs in
+this process on a small pool of worker coroutines (so at most ``concurrency``
+jobs spend LLM time at once) and its status and result live in Redis, so any
+API replica can answer a poll.
+
+A job is executed by the process that accepted it. While it is queued or
+running, that process refreshes a short-lived "alive" key; a job whose alive
+key has expired was lost with its process and is reported as failed.
+"""
+
+import asyncio
+import hashlib
+import time
+import uuid
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.services.cache import RedisCache
+from app.services.metrics import LatencyRecorder
+
+TERMINAL = ('succeeded', 'failed')
+
+# How long a duplicate request waits for the job of a just-claimed idempotency key to be written
+CLAIM_WAIT_SECONDS = 0.5
+
+class JobQueueFull(Exception):
+    """More jobs are queued or running than the pool accepts"""
+
+class IdempotencyConflict(ValueError):
+    """An idempotency key was reused for a different request"""
+
+class JobStore:
+    """Job records in Redis, kept for ``ttl`` seconds after their last update.
+
+    Records change under other workers' feet, so they bypass the cache's
+    in-process tier.
+    """
+
+    def __init__(self, cache: RedisCache, ttl: int, stale_after: int):
+        self.cache = cache
+        self.ttl = ttl
+        self.stale_after = stale_after
+
+    def key(self, job_id: str) -> str:
+        return f"job:{job_id}"
+
+    def alive_key(self, job_id: str) -> str:
+        return f"job:{job_id}:alive"
+
+    def idempotency_key(self, kind: str, idempotency_key: str) -> str:
+        return f"job-idempotency:{kind}:{hashlib.sha256(idempotency_key.encode('utf-8')).hexdigest()}"
+
+    async def create(self, kind: str, fingerprint: str, idempotency_key: Optional[str] = None) -> Tuple[Dict, bool]:
+        """A new queued job, or the existing one for ``idempotency_key``; True if created"""
+        now = time.time()
+        record = {
+            'id': uuid.uuid4().hex,
+            'kind': kind,
+            'status': 'queued',
+            'fingerprint': fingerprint,
+            'created_at': now,
+            'started_at': None,
+            'finished_at': None,
+            'result': None,
+            'error': None
+        }
+        if idempotency_key:
+            # Claimed before anything is written, so a duplicate request leaves no job behind
+            key = self.idempotency_key(kind, idempotency_key)
+            if not await self.cache.add(key, record['id'], expire=self.ttl):
+                existing = await self._claimed_job(key)
+                if existing is not None:
+                    if existing['fingerprint'] != fingerprint:
+                        raise IdempotencyConflict("Idempotency-Key was already used for a different request")
+                    return existing, False
+                # The earlier job expired before its key did
+                await self.cache.set(key, record['id'], expire=self.ttl, local=False)
+
+        # Alive before the record exists, so a poll never finds the new job without a heartbeat
+        await self.heartbeat([record['id']])
+        await self.save(record)
+        return record, True
+
+    async def _claimed_job(self, key: str) -> Optional[Dict]:
+        """The job an idempotency key points to, once its claimer has written it; None if it expired"""
+        deadline = time.monotonic() + CLAIM_WAIT_SECONDS
+        while True:
+            existing = await self.get(await self.cache.get(key, local=False) or "")
+            if existing is not None or time.monotonic() >= deadline:
+                return existing
+            await asyncio.sleep(0.02)
+
+    async def save(self, record: Dict):
+        await self.cache.set(self.key(record['id']), record, expire=self.ttl, local=False)
+
+    async def heartbeat(self, job_ids: List[str]):
+        await self.cache.set_many({self.alive_key(job_id): 1 for job_id in job_ids},
+                                  expire=self.stale_after, local=False)
+
+    async def get(self, job_id: str) -> Optional[Dict]:
+        if not job_id:
+            return None
+        found = await self.cache.get_many([self.key(job_id), self.alive_key(job_id)], local=False)
+        record = found.get(self.key(job_id))
+        if record is None or record['status'] in TERMINAL:
+            return record
+        if self.alive_key(job_id) not in found:
+            record.update(status='failed', finished_at=time.time(),
+                          error={'status_code': 500, 'detail': "Job was lost when its worker stopped; submit it again"})
+            await self.save(record)
+        return record
+
+def job_view(record: Dict) -> Dict:
+    """What the API shows for a job; the result is served separately"""
+    return {
+        'id': record['id'],
+        'kind': record['kind'],
+        'status': record['status'],
+        'created_at': record['created_at'],
+        'started_at': record['started_at'],
+        'finished_at': record['finished_at'],
+        'error': record['error'],
+        'result_url': f"/api/v1/jobs/{record['id']}/result"
+    }
+
+class JobRunner:
+    """Runs accepted jobs on ``concurrency`` worker coroutines.
+
+    ``reserve()`` takes a slot before the job record is created, so a full
+    pool rejects a request before anything is written; ``submit()`` hands
+    over the work, ``release()`` returns an unused slot.
+    """
+
+    def __init__(self, store: JobStore, concurrency: int, max_pending: int, heartbeat_seconds: float):
+        self.store = store
+        self.concurrency = max(1, concurrency)
+        self.max_pending = max(self.concurrency, max_pending)
+        self.heartbeat_seconds = heartbeat_seconds
+        self.pending = 0
+        self.running = 0
+        self.counts = {'submitted': 0, 'succeeded': 0, 'failed': 0, 'rejected': 0}
+        self.queue_wait = LatencyRecorder()
+        self.run_seconds = LatencyRecorder()
+        self._active: Dict[str, str] = {}
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._loop is loop:
+            return
+        # Workers belong to one event loop (tests and scripts start several)
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._tasks = [loop.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._tasks.append(loop.create_task(self._heartbeat()))
+
+    def reserve(self):
+        if self.pending >= self.max_pending:
+            self.counts['rejected'] += 1
+            raise JobQueueFull(f"{self.pending} jobs are already queued or running")
+        self.pending += 1
+
+    def release(self):
+        self.pending -= 1
+
+    def submit(self, record: Dict, work: Callable[[], Awaitable[Any]], cleanup: Optional[Callable[[], None]] = None):
+        """Queue ``work`` for ``record`` (a slot must have been reserved)"""
+        self._ensure_started()
+        self.counts['submitted'] += 1
+        self._active[record['id']] = record['status']
+        self._queue.put_nowait((record, work, cleanup, time.perf_counter()))
+
+    async def _worker(self):
+        while True:
+            record, work, cleanup, queued_at = await self._queue.get()
+            try:
+                await self._run(record, work, queued_at)
+            finally:
+                self._active.pop(record['id'], None)
+                self.pending -= 1
+                if cleanup is not None:
+                    cleanup()
+
+    async def _run(self, record: Dict, work: Callable[[], Awaitable[Any]], queued_at: float):
+        started = time.perf_counter()
+        self.queue_wait.observe(started - queued_at)
+        self.running += 1
+        record.update(status='running', started_at=time.time())
+        self._active[record['id']] = 'running'
+        await self._save(record)
+        try:
+            result = await work()
+            record.update(status='succeeded', result=result)
+            self.counts['succeeded'] += 1
+        except Exception as e:
+            # HTTPException-style errors keep their status code for the result endpoint
+            record.update(status='failed', error={
+                'status_code': getattr(e, 'status_code', 500),
+                'detail': getattr(e, 'detail', None) or str(e)
+            })
+            self.counts['failed'] += 1
+            print(f"[WARN] Job {record['id']} ({record['kind']}) failed: {e}")
+        finally:
+            self.running -= 1
+            self.run_seconds.observe(time.perf_counter() - started)
+        record['finished_at'] = time.time()
+        await self._save(record)
+
+    async def _save(self, record: Dict):
+        try:
+            await self.store.save(record)
+        except Exception as e:
+            print(f"[WARN] Could not save job {record['id']}: {e}")
+
+    async def _heartbeat(self):
+        while True:
+            await asyncio.sleep(self.heartbeat_seconds)
+            try:
+                await self.store.heartbeat(list(self._active))
+            except Exception as e:
+                print(f"[WARN] Job heartbeat failed: {e}")
+
+    def snapshot(self) -> Dict:
+        return {
+            'concurrency': self.concurrency,
+            'max_pending': self.max_pending,
+            'pending': self.pending,
+            'running': self.running,
+            **self.counts,
+            'queue_wait_seconds': self.queue_wait.snapshot(),
+            'run_seconds': self.run_seconds.snapshot()
+        }
@@ -1,2 +1,366 @@
+"""
+Career path search, analysis and ranking
+
+PathFinder holds the services a career path request needs (graph, skill
+vectors, LLM, cache) and is shared by the synchronous, streaming and job
+endpoints of app/api/v1/career_paths.py.
+"""
+
+import asyncio
+import json
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.config import settings
+from app.core.cross_industry import (
+    CROSS_INDUSTRY_PROMPT_VERSION, CROSS_INDUSTRY_SCORE_WEIGHTS, format_cross_industry_plan,
+    generate_cross_industry_guidance
+)
+from app.core.enrichment import enrich_transitions, has_enrichment, normalize_enrichment
+from app.core.pipeline import Pipeline
+from app.core.response_view import ResponseView
+from app.models.career import CareerPathRequest
+from app.services.cache import RedisCache
+from app.services.cache_versions import CacheVersions
+from app.services.enrichment_store import EnrichmentStore
+from app.services.graph_db import GENERATED_ROLE_PREFIX, CareerGraphDB, CareerPath, RoleMatch
+from app.services.llm_gateway import LLMGateway
+from app.services.response_cache import skip_response_cache
+from app.services.single_flight import make_key
+from app.services.vector_db import SkillVectorDB
+from app.utils.canonical import canonical_role, skill_bucket
+
+# Path ranking; cached career path responses are keyed by SCORING_VERSION
+PATH_SCORE_WEIGHTS = {
+    'skill_match': 0.4,
+    'salary_growth': 0.3,
+    'timeline': 0.2,
+    'difficulty': 0.1
+}
+SCORING_VERSION = make_key(json.dumps([PATH_SCORE_WEIGHTS, CROSS_INDUSTRY_SCORE_WEIGHTS], sort_keys=True))[:8]
+
+def calculate_path_score(path: Dict) -> float:
+    """Calculate overall path score"""
+    weights = PATH_SCORE_WEIGHTS
+
+    # Normalize values
+    skill_score = path['skill_match'] / 100
+    salary_score = min(path['salary_growth'] / 50000, 1.0)
+    timeline_score = 1 - (path['timeline_months'] / 60)
+    difficulty_score = 1 - (path['difficulty'] / 10)
+
+    return (
+        weights['skill_match'] * skill_score +
+        weights['salary_growth'] * salary_score +
+        weights['timeline'] * timeline_score +
+        weights['difficulty'] * difficulty_score
+    )
+
 class PathFinder:
-    pass
+    """Career paths for a request - supports both same-industry and cross-industry transitions"""
+
+    def __init__(self, graph: CareerGraphDB, skill_db: SkillVectorDB, llm: LLMGateway, cache: RedisCache,
+                 versions: CacheVersions, enrichment_store: Optional[EnrichmentStore] = None):
+        self.graph = graph
+        self.skill_db = skill_db
+        self.llm = llm
+        self.cache = cache
+        self.versions = versions
+        self.enrichment_store = enrichment_store
+
+    async def build(self, request: CareerPathRequest, pipeline: Pipeline, view: Optional[ResponseView] = None) -> Dict:
+        """Career paths for ``request``, shared by the synchronous endpoint and the job API.
+
+        Only the paths ``view`` returns are enriched, so paths outside the
+        requested page or fields never cost an LLM call.
+        """
+        view = view or ResponseView()
+        print(f"[DEBUG] Received request: current_role='{request.current_role}', target_role='{request.target_role}', user_skills={request.user_skills[:5] if request.user_skills else []}")
+
+        paths, cross_industry_guidance = await self.search(request, pipeline)
+        if cross_industry_guidance:
+            return view.project(cross_industry_guidance, request)
+
+        analyzed_paths, skill_gap_details = await self.skill_analysis(request, pipeline)
+
+        # Enrich every unique transition across the returned paths with Gemini-powered resources
+        returned = view.returned(analyzed_paths) if view.enrich else []
+        all_transitions = [trans for path in returned for trans in path['transitions']]
+        enrichments = await pipeline.run(
+            "enrichment",
+            lambda _: enrich_transitions(self.llm, all_transitions, request.user_skills,
+                                         **self.enrichment_options(request)),
+            "skill_analysis"
+        )
+        for trans, gemini_data in zip(all_transitions, enrichments):
+            trans.update(gemini_data)
+
+        return view.project({
+            'paths': analyzed_paths,
+            'recommended_path': analyzed_paths[0] if analyzed_paths else None,
+            'skill_gaps': skill_gap_details
+        }, request)
+
+    def enrichment_options(self, request: CareerPathRequest) -> Dict[str, Any]:
+        """Keyword arguments of enrich_transitions/iter_enrichments for ``request``"""
+        return {
+            'mode': settings.ENRICHMENT_MODE,
+            'token_budget': settings.ENRICHMENT_BATCH_TOKEN_BUDGET,
+            # Precomputed enrichment unless the caller asked for skill-tailored resources
+            'store': None if request.personalize else self.enrichment_store,
+            'cache': self.cache,
+            'cache_ttl': settings.ENRICHMENT_CACHE_TTL,
+            'versions': self.versions
+        }
+
+    async def search(self, request: CareerPathRequest, pipeline: Pipeline,
+                     on_cross_industry_step: Optional[Callable[[Dict], None]] = None
+                     ) -> Tuple[List[CareerPath], Optional[Dict]]:
+        """Role resolution, graph search and the cross-industry fallback as concurrent stages.
+
+        Both roles are resolved at the same time and the user's skills are encoded
+        alongside (stage ``encode_skills``, used later by skill analysis). When the
+        target title has no exact match in the graph it is likely to be from
+        another industry, so the cross-industry plan is started speculatively while
+        the LLM resolves the title (stage ``cross_industry_plan``), and cancelled if
+        the graph search finds paths. Otherwise stage ``cross_industry`` waits for
+        the plan after the graph search, so the critical path runs through both.
+        Returns the graph paths, or the cross-industry result when there are none.
+        ``on_cross_industry_step`` receives plan steps as they stream in, but only
+        once the graph search has confirmed the plan is needed.
+        """
+        early_steps: List[Dict] = []
+        confirmed = False
+
+        def step_arrived(step: Dict):
+            if confirmed:
+                on_cross_industry_step(step)
+            else:
+                early_steps.append(step)
+
+        async def write_back_roles() -> Optional[Tuple[str, str]]:
+            # The plan may be ready before the roles are resolved
+            current = await pipeline.tasks["resolve_current"]
+            target = await pipeline.tasks["resolve_target"]
+            if not current.confident:
+                return None
+            if target.confident:
+                return current.title, target.title
+            # A target the LLM could not place is a new role; an LLM guess may be wrong
+            return (current.title, request.target_role.strip()) if target.title is None else None
+
+        def start_cross_industry():
+            return pipeline.start("cross_industry_plan", lambda: self.cross_industry_path(
+                current_role=request.current_role,
+                target_role=request.target_role,
+                user_skills=request.user_skills,
+                on_step=step_arrived if on_cross_industry_step else None,
+                write_back_roles=write_back_roles
+            ))
+
+        async def resolve_target() -> Optional[RoleMatch]:
+            if not request.target_role:
+                return None
+            match = await asyncio.to_thread(self.graph.match_role_locally, request.target_role)
+            if not match.confident:
+                start_cross_industry()
+                match = await asyncio.to_thread(self.graph.match_role_with_llm, request.target_role)
+            return match
+
+        async def search(current: RoleMatch, target: Optional[RoleMatch]) -> List[CareerPath]:
+            if target is not None and not target.title:
+                print(f"[WARN] Could not match target role '{request.target_role}' to any database role")
+                return []
+            # Unmatched current roles are tried verbatim
+            return await asyncio.to_thread(
+                self.graph.find_paths_between,
+                current.title or request.current_role,
+                target.title if target else None
+            )
+
+        pipeline.start("encode_skills", lambda: asyncio.to_thread(self.skill_db.encode_skills, request.user_skills)
+                       if request.user_skills else asyncio.sleep(0))
+        pipeline.start("resolve_current", lambda: asyncio.to_thread(self.graph.match_role, request.current_role))
+        pipeline.start("resolve_target", resolve_target)
+        paths = await pipeline.run("graph_search", search, "resolve_current", "resolve_target")
+        print(f"[DEBUG] Found {len(paths)} paths from graph")
+
+        if paths or not request.target_role:
+            pipeline.cancel("cross_industry_plan")
+            return paths, None
+
+        # If no paths found and target role specified, check for cross-industry transition
+        print(f"[DEBUG] No paths found in database - checking for cross-industry transition")
+        if not pipeline.has("cross_industry_plan"):
+            start_cross_industry()
+        if on_cross_industry_step:
+            confirmed = True
+            for step in early_steps:
+                on_cross_industry_step(step)
+        return paths, await pipeline.run("cross_industry", lambda _: pipeline.tasks["cross_industry_plan"],
+                                         "graph_search")
+
+    async def skill_analysis(self, request: CareerPathRequest, pipeline: Pipeline) -> Tuple[List[Dict], List[Dict]]:
+        """``analyze`` as the pipeline stage after graph search and skill encoding"""
+        return await pipeline.run(
+            "skill_analysis",
+            lambda graph_paths, user_embeddings: asyncio.to_thread(
+                self.analyze, graph_paths, request.user_skills, user_embeddings
+            ),
+            "graph_search", "encode_skills"
+        )
+
+    def analyze(self, paths: List[CareerPath], user_skills: List[str],
+                user_embeddings: Any = None) -> Tuple[List[Dict], List[Dict]]:
+        """Skill-gap analysis and ranking for graph paths (everything except LLM enrichment)"""
+        analyzed_paths = []
+        skill_gap_details = []
+        for path in paths:
+            skill_gap = self.skill_db.match_user_skills_to_role(
+                user_skills=user_skills,
+                role_required_skills=path.required_skills,
+                user_embeddings=user_embeddings
+            )
+
+            transitions = []
+            for trans in path.transitions:
+                step_skill_gap = self.skill_db.match_user_skills_to_role(
+                    user_skills=user_skills,
+                    role_required_skills=trans['required_skills'],
+                    user_embeddings=user_embeddings
+                )
+                transitions.append({
+                    **trans,
+                    'skills_to_learn': step_skill_gap['missing_skills'],
+                    'skills_match': step_skill_gap['matched_skills']
+                })
+
+            analyzed_paths.append({
+                'roles': path.roles,
+                'timeline_months': path.total_months,
+                'difficulty': path.avg_difficulty,
+                'salary_growth': path.salary_growth,
+                'skill_match': skill_gap['match_percentage'],
+                'missing_skills': skill_gap['missing_skills'],
+                'matched_skills': skill_gap['matched_skills'],
+                'transitions': transitions
+            })
+
+            skill_gap_details.append({
+                'roles': path.roles,
+                'match_percentage': skill_gap['match_percentage'],
+                'matched_skills': skill_gap['matched_skills'],
+                'missing_skills': skill_gap['missing_skills']
+            })
+
+        # Rank paths by overall score (the score does not depend on enrichment)
+        for path in analyzed_paths:
+            path['score'] = calculate_path_score(path)
+
+        analyzed_paths.sort(key=lambda x: x['score'], reverse=True)
+
+        return analyzed_paths, skill_gap_details
+
+    async def cross_industry_path(self, current_role: str, target_role: str, user_skills: List[str],
+                                  on_step: Optional[Callable[[Dict], None]] = None,
+                                  write_back_roles: Optional[Callable[[], Awaitable[Optional[Tuple[str, str]]]]] = None
+                                  ) -> Optional[Dict]:
+        """Generate AI-powered guidance for cross-industry career transitions.
+
+        With ``CROSS_INDUSTRY_WRITE_BACK``, a new feasible plan is written to the
+        graph under the graph titles ``write_back_roles`` returns; it returns
+        None when the request's roles are not trustworthy graph endpoints.
+        """
+        try:
+            # Plans are reused for the same canonical roles and skill bucket
+            cache_key = (
+                f"cross_industry:{await self.versions.tag('prompts')}:{CROSS_INDUSTRY_PROMPT_VERSION}:"
+                f"{self.llm.model_id}:{canonical_role(current_role)}:{canonical_role(target_role)}:"
+                f"{skill_bucket(user_skills)}"
+            )
+
+            async def refresh_plan() -> Optional[Dict]:
+                plan, plan_complete = await generate_cross_industry_guidance(
+                    self.llm, current_role, target_role, user_skills
+                )
+                return plan if plan_complete else None
+
+            # Plans older than CROSS_INDUSTRY_CACHE_FRESH_SECONDS are still served
+            # while one background request regenerates them
+            guidance, state = await self._cache_get_or_revalidate(
+                cache_key, refresh_plan,
+                fresh_for=settings.CROSS_INDUSTRY_CACHE_FRESH_SECONDS, expire=settings.CROSS_INDUSTRY_CACHE_TTL
+            )
+            if guidance is None:
+                guidance, complete = await generate_cross_industry_guidance(
+                    self.llm, current_role, target_role, user_skills, on_step
+                )
+                if complete:
+                    await self._cache_set(cache_key, guidance, expire=settings.CROSS_INDUSTRY_CACHE_TTL,
+                                          fresh_for=settings.CROSS_INDUSTRY_CACHE_FRESH_SECONDS)
+                    if guidance.get('is_feasible') and settings.CROSS_INDUSTRY_WRITE_BACK and write_back_roles:
+                        roles = await write_back_roles()
+                        if roles is None:
+                            print(f"[DEBUG] Not writing back plan for '{current_role}' -> '{target_role}': "
+                                  f"roles not matched exactly")
+                        else:
+                            await self.write_back_cross_industry_plan(*roles, guidance)
+                else:
+                    # Served as-is but not cached or written back, so the next request asks again
+                    print(f"[WARN] Cross-industry plan for {cache_key} was truncated, using the partial plan")
+                    skip_response_cache("truncated cross-industry plan")
+            else:
+                print(f"[DEBUG] Cross-industry plan cache hit ({state}): {cache_key}")
+
+            print(f"[DEBUG] Generated cross-industry guidance: feasible={guidance.get('is_feasible')}, skill_match={guidance.get('skill_analysis', {}).get('skill_match_percentage', 0)}%")
+            return format_cross_industry_plan(guidance, current_role, target_role)
+
+        except Exception as e:
+            print(f"[ERROR] Cross-industry guidance generation failed: {e}")
+            skip_response_cache("cross-industry guidance failed")
+            import traceback
+            traceback.print_exc()
+            return None
+
+    async def write_back_cross_industry_plan(self, current_role: str, target_role: str, guidance: Dict):
+        """Store a feasible generated plan in the graph so later requests are answered by graph search"""
+        steps = guidance.get('transition_steps', [])
+        try:
+            role_ids = await asyncio.to_thread(
+                self.graph.add_generated_path,
+                current_role=current_role,
+                target_role=target_role,
+                steps=steps,
+                provenance=f"llm:cross_industry:{settings.GEMINI_MODEL}",
+                difficulty=guidance.get('difficulty_rating', 7),
+                success_rate=guidance.get('realistic_success_rate', 50) / 100
+            )
+        except Exception as e:
+            print(f"[WARN] Could not write generated plan back to the graph: {e}")
+            return
+
+        # The plan already carries per-step resources; keep them as precomputed enrichment,
+        # keyed by role id because step titles are shared with other plans (see store_key).
+        # An edge between two pre-existing roles is keyed by title and left to pre-enrichment.
+        if self.enrichment_store is not None:
+            for i, step in enumerate(steps[:len(role_ids) - 1]):
+                pair = (role_ids[i], role_ids[i + 1])
+                enrichment = normalize_enrichment(step)
+                if has_enrichment(enrichment) and any(role_id.startswith(GENERATED_ROLE_PREFIX) for role_id in pair):
+                    await asyncio.to_thread(self.enrichment_store.put, *pair, enrichment)
+        print(f"[INFO] Wrote generated plan back to graph: {' -> '.join(role_ids)}")
+
+    async def _cache_set(self, key: str, value: Any, expire: int, fresh_for: Optional[int] = None):
+        """Cache write that treats an unreachable Redis as a no-op"""
+        try:
+            await self.cache.set(key, value, expire=expire, fresh_for=fresh_for)
+        except Exception as e:
+            print(f"[WARN] Cache write failed for {key}: {e}")
+
+    async def _cache_get_or_revalidate(self, key: str, refresh: Callable[[], Any], fresh_for: int,
+                                       expire: int) -> Tuple[Optional[Any], str]:
+        """Stale-while-revalidate read that treats an unreachable Redis as a miss"""
+        try:
+            return await self.cache.get_or_revalidate(key, refresh, fresh_for=fresh_for, expire=expire)
+        except Exception as e:
+            print(f"[WARN] Cache read failed for {key}: {e}")
+            return None, 'miss'
@@ -0,0 +1,98 @@
+"""
+Per-request dependency graph of async stages with critical-path reporting
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+@dataclass
+class StageSpan:
+    name: str
+    deps: Tuple[str, ...]
+    started: float
+    finished: Optional[float] = None
+    status: str = "running"  # 'done', 'failed' or 'cancelled'
+
+    @property
+    def seconds(self) -> float:
+        return (self.finished or time.perf_counter()) - self.started
+
+class Pipeline:
+    """Starts each stage as soon as the stages it depends on have finished.
+
+    ``fn`` receives the results of ``deps`` in order. Stages that are still
+    running when the request is done (e.g. speculative work that turned out
+    to be unnecessary) are cancelled by ``aclose``.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.tasks: Dict[str, asyncio.Task] = {}
+        self.spans: Dict[str, StageSpan] = {}
+
+    def start(self, name: str, fn: Callable[..., Awaitable[Any]], *deps: str) -> asyncio.Task:
+        async def run():
+            inputs = [await self.tasks[dep] for dep in deps]
+            span = StageSpan(name, deps, time.perf_counter())
+            self.spans[name] = span
+            try:
+                result = await fn(*inputs)
+            except asyncio.CancelledError:
+                span.status = "cancelled"
+                raise
+            except Exception:
+                span.status = "failed"
+                raise
+            finally:
+                span.finished = time.perf_counter()
+            span.status = "done"
+            return result
+
+        task = asyncio.create_task(run())
+        self.tasks[name] = task
+        return task
+
+    async def run(self, name: str, fn: Callable[..., Awaitable[Any]], *deps: str) -> Any:
+        """Start a stage and wait for its result"""
+        return await self.start(name, fn, *deps)
+
+    def has(self, name: str) -> bool:
+        return name in self.tasks
+
+    def cancel(self, name: str):
+        task = self.tasks.get(name)
+        if task is not None and not task.done():
+            print(f"[DEBUG] Cancelling unused stage '{name}'")
+            task.cancel()
+
+    async def aclose(self):
+        pending = [task for task in self.tasks.values() if not task.done()]
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def critical_path(self) -> List[StageSpan]:
+        """Chain of completed stages, each waiting on the dependency that finished last"""
+        done = [span for span in self.spans.values() if span.status == "done"]
+        if not done:
+            return []
+        span = max(done, key=lambda s: s.finished)
+        path = [span]
+        while span.deps:
+            span = max((self.spans[dep] for dep in span.deps), key=lambda s: s.finished)
+            path.append(span)
+        return path[::-1]
+
+    def describe_critical_path(self) -> str:
+        """Value for the ``X-Critical-Path`` response header"""
+        return " > ".join(f"{span.name}({span.seconds * 1000:.0f}ms)" for span in self.critical_path())
+
+    def server_timing(self) -> str:
+        """Value for the ``Server-Timing`` response header; overlapping stages are all listed"""
+        total = time.perf_counter() - self.started
+        entries = [f"{span.name};dur={span.seconds * 1000:.1f}" for span in self.spans.values()
+                   if span.status == "done"]
+        return ", ".join(entries + [f"total;dur={total * 1000:.1f}"])
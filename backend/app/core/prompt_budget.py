@@ -0,0 +1,99 @@
+"""
+Per-call-site prompt budgets and prompt compaction
+
+Prompts are built as a static instruction prefix followed by the per-request
+body. The prefix is identical across calls (so the provider can reuse it, see
+GeminiBackend) and only the body is trimmed to fit the site's budget.
+"""
+
+import re
+import threading
+from typing import Callable, Dict, List
+
+from app.config import settings
+
+TRUNCATION_MARKER = "\n[...truncated]"
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English prose)"""
+    return len(text) // 4 + 1
+
+def compact(text: str) -> str:
+    """Collapse runs of spaces/tabs and blank lines; indentation and line breaks are kept"""
+    lines = [re.sub(r"(?<=\S)[ \t]+", " ", line.rstrip()) for line in text.splitlines()]
+    compacted: List[str] = []
+    for line in lines:
+        if not line and (not compacted or not compacted[-1]):
+            continue
+        compacted.append(line)
+    return "\n".join(compacted).strip()
+
+class PromptBudget:
+    """Token budget for the prompts of one call site, with counters for /metrics"""
+
+    def __init__(self, site: str, max_tokens: int):
+        self.site = site
+        self.max_tokens = max_tokens
+        self.calls = 0
+        self.trimmed = 0
+        self.trimmed_tokens = 0
+        self._lock = threading.Lock()
+
+    def _record(self, dropped_tokens: int):
+        with self._lock:
+            self.calls += 1
+            if dropped_tokens > 0:
+                self.trimmed += 1
+                self.trimmed_tokens += dropped_tokens
+        if dropped_tokens > 0:
+            print(f"[WARN] {self.site} prompt over budget ({self.max_tokens} tokens), "
+                  f"trimmed ~{dropped_tokens} tokens")
+
+    def available(self, prefix: str, overhead: str = "") -> int:
+        """Tokens left for variable content after the prefix and fixed body text"""
+        return max(self.max_tokens - estimate_tokens(prefix) - estimate_tokens(overhead), 0)
+
+    def fit_text(self, prefix: str, text: str) -> str:
+        """``text`` compacted and cut at a line boundary so prefix + text fit the budget"""
+        text = compact(text)
+        limit = self.available(prefix, TRUNCATION_MARKER) * 4
+        if len(text) <= limit:
+            self._record(0)
+            return text
+        cut = text.rfind("\n", 0, limit)
+        kept = text[:cut if cut > limit // 2 else limit]
+        self._record(estimate_tokens(text) - estimate_tokens(kept))
+        return kept + TRUNCATION_MARKER
+
+    def fit_items(self, prefix: str, items: List[str], render: Callable[[int, str], str],
+                  overhead: str = "") -> List[str]:
+        """Leading ``items`` (best first) whose rendered lines fit next to the prefix"""
+        remaining = self.available(prefix, overhead)
+        kept: List[str] = []
+        for i, item in enumerate(items):
+            cost = estimate_tokens(render(i, item))
+            if cost > remaining:
+                break
+            kept.append(item)
+            remaining -= cost
+        dropped = items[len(kept):]
+        self._record(sum(estimate_tokens(render(len(kept) + i, item)) for i, item in enumerate(dropped)))
+        return kept
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'max_tokens': self.max_tokens,
+                'calls': self.calls,
+                'trimmed': self.trimmed,
+                'trimmed_tokens': self.trimmed_tokens
+            }
+
+prompt_budgets = {
+    'match_role': PromptBudget('match_role', settings.PROMPT_BUDGET_MATCH_ROLE),
+    'parse_resume': PromptBudget('parse_resume', settings.PROMPT_BUDGET_PARSE_RESUME),
+    'cross_industry': PromptBudget('cross_industry', settings.PROMPT_BUDGET_CROSS_INDUSTRY),
+}
+
+def budget_snapshot() -> Dict:
+    return {site: budget.snapshot() for site, budget in prompt_budgets.items()}
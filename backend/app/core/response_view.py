@@ -0,0 +1,134 @@
+"""
+Field projection and cursor pagination for career path responses
+
+``fields`` picks the top-level fields to return (``paths``,
+``recommended_path``, ``skill_gaps``), ``expand`` the heavy parts of each
+path: ``transitions`` (per-step details) and ``enrichment`` (learning
+resources, certifications and projects; implies ``transitions``). Leaving
+either out returns everything, as before they existed.
+
+Paths are ranked before enrichment, so the page is known first and only the
+paths that are returned get enriched. ``recommended_path`` (the top-ranked
+path) is part of the first page only. Cursors are opaque: the offset of the
+next page, the page size and a digest of the canonical request, so a cursor
+only continues the listing it came from.
+"""
+
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from app.core.enrichment import ENRICHMENT_KEYS
+from app.models.career import CareerPathRequest
+from app.services.response_cache import request_digest
+
+RESPONSE_FIELDS = ('paths', 'recommended_path', 'skill_gaps')
+EXPANSIONS = ('transitions', 'enrichment')
+MAX_PAGE_SIZE = 50
+
+class InvalidView(ValueError):
+    pass
+
+def _names(value: str, allowed: Tuple[str, ...], kind: str) -> Tuple[str, ...]:
+    names = {name.strip() for name in value.split(",") if name.strip()}
+    unknown = names - set(allowed)
+    if unknown:
+        raise InvalidView(f"Unknown {kind} {', '.join(sorted(unknown))}; expected any of {', '.join(allowed)}")
+    return tuple(name for name in allowed if name in names)
+
+@dataclass
+class ResponseView:
+    fields: Tuple[str, ...] = RESPONSE_FIELDS
+    expand: Tuple[str, ...] = EXPANSIONS
+    offset: int = 0
+    limit: Optional[int] = None
+
+    @classmethod
+    def parse(cls, request: CareerPathRequest, fields: Optional[str] = None, expand: Optional[str] = None,
+              limit: Optional[int] = None, cursor: Optional[str] = None) -> "ResponseView":
+        """View from query parameters; raises InvalidView for unknown names or a foreign cursor"""
+        view = cls()
+        if fields is not None:
+            view.fields = _names(fields, RESPONSE_FIELDS, "field")
+        if expand is not None:
+            view.expand = _names(expand, EXPANSIONS, "expansion")
+            if 'enrichment' in view.expand:
+                view.expand = EXPANSIONS
+        if cursor:
+            position = _decode_cursor(cursor)
+            if position.get('r') != request_digest(request)[:16]:
+                raise InvalidView("Cursor belongs to a different request")
+            view.offset, view.limit = position['o'], position.get('l')
+        if limit is not None:
+            view.limit = limit
+        if view.limit is not None and not 1 <= view.limit <= MAX_PAGE_SIZE:
+            raise InvalidView(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+        return view
+
+    @property
+    def enrich(self) -> bool:
+        return 'enrichment' in self.expand
+
+    def cache_variant(self) -> Optional[Dict]:
+        """Part of the response cache key; None for the full response"""
+        if self == ResponseView():
+            return None
+        return {'fields': list(self.fields), 'expand': list(self.expand), 'offset': self.offset, 'limit': self.limit}
+
+    def page(self, paths: List[Dict]) -> List[Dict]:
+        end = None if self.limit is None else self.offset + self.limit
+        return paths[self.offset:end]
+
+    def returned(self, paths: List[Dict]) -> List[Dict]:
+        """Ranked paths whose details end up in the response"""
+        chosen = self.page(paths) if 'paths' in self.fields else []
+        on_page = any(path is paths[0] for path in chosen) if paths else True
+        if self.offset == 0 and 'recommended_path' in self.fields and not on_page:
+            chosen = [paths[0]] + chosen
+        return chosen
+
+    def project(self, result: Dict, request: CareerPathRequest) -> Dict:
+        """Cut ``result`` (every ranked path) down to this view"""
+        paths = result.get('paths', [])
+        page = self.page(paths)
+        projected = {}
+        if 'paths' in self.fields:
+            projected['paths'] = [self._path(path) for path in page]
+        if 'recommended_path' in self.fields and self.offset == 0:
+            recommended = result.get('recommended_path')
+            projected['recommended_path'] = self._path(recommended) if recommended else None
+        if 'skill_gaps' in self.fields:
+            roles = {tuple(path['roles']) for path in page}
+            projected['skill_gaps'] = [gap for gap in result.get('skill_gaps', []) if tuple(gap['roles']) in roles]
+        end = self.offset + len(page)
+        projected['total_paths'] = len(paths)
+        projected['next_cursor'] = self._cursor(request, end) if end < len(paths) else None
+        return projected
+
+    def _path(self, path: Dict) -> Dict:
+        if 'transitions' not in self.expand:
+            return {key: value for key, value in path.items() if key != 'transitions'}
+        if not self.enrich and 'transitions' in path:
+            return {**path, 'transitions': [
+                {key: value for key, value in trans.items() if key not in ENRICHMENT_KEYS}
+                for trans in path['transitions']
+            ]}
+        return path
+
+    def _cursor(self, request: CareerPathRequest, offset: int) -> str:
+        position = json.dumps({'o': offset, 'l': self.limit, 'r': request_digest(request)[:16]}, separators=(',', ':'))
+        return base64.urlsafe_b64encode(position.encode()).rstrip(b"=").decode()
+
+def _decode_cursor(cursor: str) -> Dict:
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if type(position.get('o')) is not int or position['o'] < 0:
+            raise ValueError("bad offset")
+        limit = position.get('l')
+        if limit is not None and (type(limit) is not int or not 1 <= limit <= MAX_PAGE_SIZE):
+            raise ValueError("bad limit")
+        return position
+    except (ValueError, TypeError, AttributeError, binascii.Error):
+        raise InvalidView("Invalid cursor")
@@ -0,0 +1,235 @@
+"""
+Section-aware resume preprocessing
+
+Extracted resume text carries a lot the parser does not need: page headers and
+footers repeated on every page, the contact block copied into each page,
+"References available upon request", hobbies. ``ResumePreprocessor`` splits the
+text into sections by their headings, drops boilerplate and repeated lines,
+normalizes whitespace and caps each section at its own token budget, so a long
+resume is trimmed evenly instead of losing everything after the point where
+``PromptBudget.fit_text`` would cut it. Input/output token counts are kept for
+/metrics so the reduction can be checked against parse quality.
+"""
+
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from app.core.prompt_budget import TRUNCATION_MARKER, compact, estimate_tokens
+
+# Bump when the preprocessing output changes; part of the resume parse cache key
+PREPROCESS_VERSION = 1
+
+# Tokens per section. Text before the first heading is the 'header' (name,
+# contact details, often an untitled summary).
+SECTION_BUDGETS = {
+    'header': 250,
+    'summary': 300,
+    'experience': 2500,
+    'skills': 400,
+    'education': 400,
+    'certifications': 250,
+    'projects': 600,
+    'other': 300,
+}
+
+SECTION_HEADINGS = {
+    'summary': ("summary", "professional summary", "profile", "professional profile", "about", "about me",
+                "objective", "career objective", "career summary", "executive summary"),
+    'experience': ("experience", "work experience", "professional experience", "relevant experience",
+                   "employment", "employment history", "work history", "career history", "professional background"),
+    'skills': ("skills", "technical skills", "key skills", "core skills", "core competencies", "competencies",
+               "technologies", "tech stack", "tools", "tools & technologies", "skills & tools", "expertise",
+               "areas of expertise"),
+    'education': ("education", "academic background", "academic qualifications", "qualifications",
+                  "education & training", "training"),
+    'certifications': ("certifications", "certificates", "certification", "licenses", "licenses & certifications",
+                       "certifications & licenses", "courses"),
+    'projects': ("projects", "personal projects", "selected projects", "key projects", "side projects"),
+    'other': ("awards", "honors", "achievements", "publications", "languages", "volunteering",
+              "volunteer experience", "leadership", "activities"),
+    # Nothing in ParsedResume comes from these
+    None: ("references", "referees", "hobbies", "interests", "hobbies & interests", "personal interests"),
+}
+HEADING_TO_SECTION = {heading: section for section, headings in SECTION_HEADINGS.items() for heading in headings}
+HEADING_MAX_CHARS = 40
+
+BOILERPLATE_PATTERN = re.compile(
+    r"^(?:page \d+(?: of \d+)?|\d+ ?/ ?\d+|- ?\d+ ?-|curriculum vitae|cv|resume|résumé|"
+    r"references (?:are )?available (?:up)?on request|confidential)$",
+    re.IGNORECASE
+)
+PAGE_NUMBER_PATTERN = re.compile(r"\s*[|·•-]?\s*page \d+(?: of \d+)?\s*$", re.IGNORECASE)
+CONTACT_PATTERN = re.compile(r"@|https?://|www\.|linkedin\.com|github\.com|\+?\d[\d\s().-]{7,}\d")
+BULLET_PATTERN = re.compile(r"^[\s•·▪◦●\-*–]+")
+# Shorter lines ("Software Engineer", "2019 - Present") legitimately repeat
+DEDUPE_MIN_CHARS = 24
+
+@dataclass
+class PreparedResume:
+    text: str
+    input_tokens: int
+    output_tokens: int
+    # Section name -> tokens kept, in the order the sections appear
+    sections: Dict[str, int] = field(default_factory=dict)
+    trimmed_tokens: Dict[str, int] = field(default_factory=dict)
+    duplicate_lines: int = 0
+    boilerplate_lines: int = 0
+
+def _normalized(line: str) -> str:
+    return " ".join(BULLET_PATTERN.sub("", line).lower().split())
+
+def heading_section(line: str) -> Tuple[bool, Optional[str], str]:
+    """``(is_heading, section, rest)`` for a line; "Skills: Python, SQL" is a heading with content"""
+    stripped = line.strip()
+    if not stripped or len(stripped) > 200:
+        return False, None, ""
+    name, rest = stripped, ""
+    if ":" in stripped:
+        name, rest = stripped.split(":", 1)
+    if len(name) > HEADING_MAX_CHARS:
+        return False, None, ""
+    key = " ".join(name.lower().replace(" and ", " & ").strip(" \t#*=-_:|").split())
+    if key not in HEADING_TO_SECTION:
+        return False, None, ""
+    return True, HEADING_TO_SECTION[key], rest.strip()
+
+def _cap(lines: List[str], max_tokens: int) -> Tuple[List[str], int]:
+    """Leading lines within ``max_tokens`` (most recent roles come first) and the tokens dropped"""
+    limit = max_tokens * 4
+    kept, used = [], 0
+    for i, line in enumerate(lines):
+        if used + len(line) + 1 > limit:
+            dropped = estimate_tokens("\n".join(lines[i:]))
+            return kept + [TRUNCATION_MARKER.strip()], dropped
+        kept.append(line)
+        used += len(line) + 1
+    return kept, 0
+
+class ResumePreprocessor:
+    """Turns extracted resume text into a shorter, sectioned prompt body"""
+
+    def __init__(self, budgets: Optional[Dict[str, int]] = None):
+        self.budgets = dict(SECTION_BUDGETS, **(budgets or {}))
+        self.documents = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.duplicate_lines = 0
+        self.boilerplate_lines = 0
+        self.trimmed_tokens: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def prepare(self, text: str) -> PreparedResume:
+        lines, duplicates, boilerplate = self._clean_lines(text)
+        sections, headed = self._split(lines)
+
+        if not headed:
+            # No recognizable headings: keep the cleaned text whole and let the
+            # overall prompt budget decide
+            body = "\n".join(lines)
+            prepared = PreparedResume(body, estimate_tokens(text), estimate_tokens(body),
+                                      sections={'header': estimate_tokens(body)})
+        else:
+            parts, kept, trimmed = [], {}, {}
+            for section, section_lines in sections.items():
+                if section is None:
+                    if section_lines:
+                        trimmed['ignored'] = estimate_tokens("\n".join(section_lines))
+                    continue
+                if not section_lines:
+                    continue
+                capped, dropped = _cap(section_lines, self.budgets.get(section, self.budgets['other']))
+                if dropped:
+                    trimmed[section] = dropped
+                block = "\n".join(capped)
+                parts.append(block)
+                kept[section] = estimate_tokens(block)
+            body = "\n\n".join(parts)
+            prepared = PreparedResume(body, estimate_tokens(text), estimate_tokens(body), sections=kept,
+                                      trimmed_tokens=trimmed)
+        prepared.duplicate_lines = duplicates
+        prepared.boilerplate_lines = boilerplate
+        self._record(prepared)
+        return prepared
+
+    @staticmethod
+    def _clean_lines(text: str) -> Tuple[List[str], int, int]:
+        """Compacted lines without boilerplate and repeated page furniture"""
+        seen = set()
+        lines: List[str] = []
+        duplicates = boilerplate = 0
+        for line in compact(text).splitlines():
+            line = PAGE_NUMBER_PATTERN.sub("", line) if len(line) > 12 else line
+            key = _normalized(line)
+            if key and BOILERPLATE_PATTERN.match(key):
+                boilerplate += 1
+                continue
+            if key and (len(key) >= DEDUPE_MIN_CHARS or CONTACT_PATTERN.search(key)):
+                if key in seen:
+                    duplicates += 1
+                    continue
+                seen.add(key)
+            if not line and (not lines or not lines[-1]):
+                continue
+            lines.append(line)
+        return lines, duplicates, boilerplate
+
+    @staticmethod
+    def _split(lines: List[str]) -> Tuple[Dict[Optional[str], List[str]], bool]:
+        """Lines grouped by section in order of first appearance; repeated headings are merged"""
+        sections: Dict[Optional[str], List[str]] = {'header': []}
+        current: Optional[str] = 'header'
+        headed = False
+        for line in lines:
+            is_heading, section, rest = heading_section(line)
+            if is_heading and rest:
+                # "Tools: Jira, Git" inside a role belongs to the role; elsewhere
+                # the line goes to its section without ending the current one
+                if current not in ('experience', 'projects'):
+                    headed = True
+                    sections.setdefault(section, []).append(line)
+                    continue
+            elif is_heading:
+                headed = True
+                current = section
+                if current in sections:
+                    continue
+                # The resume's own heading is kept, so a short resume never grows
+                sections[current] = []
+            if line or sections[current]:
+                sections[current].append(line)
+        for section_lines in sections.values():
+            while section_lines and not section_lines[-1]:
+                section_lines.pop()
+        return sections, headed
+
+    def _record(self, prepared: PreparedResume):
+        with self._lock:
+            self.documents += 1
+            self.input_tokens += prepared.input_tokens
+            self.output_tokens += prepared.output_tokens
+            self.duplicate_lines += prepared.duplicate_lines
+            self.boilerplate_lines += prepared.boilerplate_lines
+            for section, tokens in prepared.trimmed_tokens.items():
+                self.trimmed_tokens[section] = self.trimmed_tokens.get(section, 0) + tokens
+
+    @property
+    def version(self) -> str:
+        budgets = ",".join(f"{section}={tokens}" for section, tokens in sorted(self.budgets.items()))
+        return f"{PREPROCESS_VERSION}:{budgets}"
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            return {
+                'documents': self.documents,
+                'input_tokens': self.input_tokens,
+                'output_tokens': self.output_tokens,
+                'reduction': round(1 - self.output_tokens / self.input_tokens, 4) if self.input_tokens else 0.0,
+                'duplicate_lines': self.duplicate_lines,
+                'boilerplate_lines': self.boilerplate_lines,
+                'trimmed_tokens': dict(self.trimmed_tokens),
+                'section_budgets': dict(self.budgets)
+            }
+
+resume_preprocessor = ResumePreprocessor()
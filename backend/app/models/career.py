@@ -5,8 +5,14 @@ class CareerPathRequest(BaseModel):
     current_role: str
     target_role: Optional[str] = None
     user_skills: List[str]
+    # Tailor enrichment to user_skills with live LLM calls instead of precomputed resources
+    personalize: bool = False
 
 class CareerPathResponse(BaseModel):
-    paths: List[Dict]
+    # Fields left out by ``fields`` are omitted rather than returned empty
+    paths: List[Dict] = []
     recommended_path: Optional[Dict] = None
-    skill_gaps: List[Dict]
+    skill_gaps: List[Dict] = []
+    # Ranked paths across all pages, and the cursor of the next page if there is one
+    total_paths: Optional[int] = None
+    next_cursor: Optional[str] = None
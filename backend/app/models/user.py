@@ -21,3 +21,14 @@ class ParsedResume(BaseModel):
     certifications: List[str]
     industry: Optional[str] = "Technology"  # Default to Technology if not detected
     summary: str
+
+class ResumeProfile(BaseModel):
+    """The parts of a resume only the LLM can read; skills and contact details are extracted locally"""
+    full_name: str
+    current_role: str
+    years_total_experience: int
+    experience: List[ExtractedExperience]
+    education: List[str]
+    certifications: List[str]
+    industry: Optional[str] = "Technology"  # Default to Technology if not detected
+    summary: str
@@ -1,30 +1,348 @@
 """
 Redis caching for API responses
+
+``RedisCache`` keeps a small in-process LRU of decoded values in front of
+Redis, so hot keys are served without a network round trip or
+``json.loads``. Local entries live for at most ``local_ttl`` seconds and are
+dropped early when any worker writes or deletes the key (Redis pub/sub on
+``invalidation_channel``). Values returned from the local tier are shared:
+treat them as read-only.
+
+Values are stored through a ``ValueSerializer`` (codec plus optional
+compression, see app/services/codecs.py); entries written as plain JSON by
+earlier versions still decode.
+
+``get_many`` / ``set_many`` / ``delete_many`` cost one round trip (MGET or a
+pipeline) however many keys they touch. Round trips made on behalf of a
+request are counted with ``track_request_round_trips``.
+
+Values written with ``fresh_for`` carry a soft TTL. After it passes, the
+value is still served (until the hard ``expire``) while one background
+refresh per key runs, see ``get_or_revalidate``.
 """
 
 import redis.asyncio as redis
-import json
-from typing import Any, Optional
+import asyncio
+import time
+import uuid
+from collections import OrderedDict
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+from app.services.codecs import ValueSerializer
+from app.services.metrics import LatencyRecorder
+
+# Marks a stored value that carries a soft TTL
+FRESH_UNTIL = '__fresh_until__'
+# Seconds before a failed invalidation subscription is retried
+RESUBSCRIBE_SECONDS = 5.0
+
+class RoundTrips:
+    """Redis round trips made while handling one request"""
+
+    def __init__(self):
+        self.count = 0
+
+_request_round_trips: ContextVar[Optional[RoundTrips]] = ContextVar('redis_request_round_trips', default=None)
+
+def track_request_round_trips() -> RoundTrips:
+    """Start counting Redis round trips made from the current context"""
+    trips = RoundTrips()
+    _request_round_trips.set(trips)
+    return trips
+
+class LocalCache:
+    """Bounded LRU of ``key -> (value, expires_at)``"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Any, float]]" = OrderedDict()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[Any]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.monotonic():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: str, value: Any, ttl: float):
+        if self.max_entries <= 0 or ttl <= 0:
+            return
+        self._entries[key] = (value, time.monotonic() + ttl)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str):
+        self._entries.pop(key, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
 
 class RedisCache:
-    def __init__(self, redis_url: str):
-        self.redis = redis.from_url(redis_url, decode_responses=True)
-    
-    async def get(self, key: str) -> Optional[Any]:
-        """Get cached value"""
-        value = await self.redis.get(key)
-        if value:
-            return json.loads(value)
-        return None
-    
-    async def set(self, key: str, value: Any, expire: int = 3600):
-        """Cache value with expiration"""
-        await self.redis.setex(
-            key,
-            expire,
-            json.dumps(value)
+    def __init__(self, redis_url: str, local_max_entries: int = 0, local_ttl: float = 0,
+                 invalidation_channel: str = "cache-invalidate", refresh_lock_ttl: int = 60,
+                 serializer: Optional[ValueSerializer] = None, max_connections: Optional[int] = None,
+                 socket_timeout: Optional[float] = None, connect_timeout: Optional[float] = None):
+        # Values are binary; keys and pub/sub messages are decoded where needed
+        self.redis = redis.from_url(
+            redis_url,
+            max_connections=max_connections,
+            socket_timeout=socket_timeout,
+            socket_connect_timeout=connect_timeout
         )
-    
+        self.serializer = serializer or ValueSerializer()
+        self.local = LocalCache(local_max_entries)
+        self.local_ttl = local_ttl
+        self.invalidation_channel = invalidation_channel
+        self.refresh_lock_ttl = refresh_lock_ttl
+        # Lets a worker ignore its own invalidation messages
+        self.instance_id = uuid.uuid4().hex[:12]
+        self.counts = {
+            'lookups': 0, 'local_hits': 0, 'redis_hits': 0, 'misses': 0,
+            'stale_served': 0, 'refreshes': 0, 'refresh_failures': 0, 'invalidations_received': 0,
+            'decode_failures': 0, 'writes': 0, 'payload_bytes': 0, 'stored_bytes': 0, 'round_trips': 0
+        }
+        self.refresh_seconds = LatencyRecorder()
+        self._refreshing: Dict[str, asyncio.Task] = {}
+        self._listener: Optional[asyncio.Task] = None
+        self._listener_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._listener_failed_at = 0.0
+
+    @property
+    def local_enabled(self) -> bool:
+        return self.local.max_entries > 0 and self.local_ttl > 0
+
+    async def get(self, key: str, local: bool = True) -> Optional[Any]:
+        """Get cached value"""
+        value = await self._get_stored(key, local)
+        if isinstance(value, dict) and FRESH_UNTIL in value:
+            return value['value']
+        return value
+
+    async def set(self, key: str, value: Any, expire: int = 3600, fresh_for: Optional[int] = None,
+                  local: bool = True):
+        """Cache value with expiration; ``fresh_for`` makes it stale (but still served) after that many seconds"""
+        await self.set_many({key: value}, expire=expire, fresh_for=fresh_for, local=local)
+
     async def delete(self, key: str):
         """Delete cached value"""
-        await self.redis.delete(key)
+        await self.delete_many([key])
+
+    async def add(self, key: str, value: Any, expire: int = 3600) -> bool:
+        """Cache value only if the key is not set yet; True if this call set it"""
+        self._round_trip()
+        return bool(await self.redis.set(key, self._encode(value), ex=expire, nx=True))
+
+    async def incr(self, key: str, amount: int = 1) -> int:
+        """Add to an integer counter (created at 0) and return its new value; ``amount=0`` only reads it"""
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.incrby(key, amount)
+        if amount:
+            self._invalidate([key], pipe)
+        self._round_trip()
+        return (await pipe.execute())[0]
+
+    async def get_many(self, keys: Iterable[str], local: bool = True) -> Dict[str, Any]:
+        """Cached values by key (missing keys are left out), with one MGET for whatever is not held locally"""
+        found = {}
+        for key, value in (await self._get_stored_many(list(dict.fromkeys(keys)), local)).items():
+            found[key] = value['value'] if isinstance(value, dict) and FRESH_UNTIL in value else value
+        return found
+
+    async def set_many(self, values: Dict[str, Any], expire: int = 3600, fresh_for: Optional[int] = None,
+                       local: bool = True):
+        """Cache several values with the same expiration in one pipelined round trip"""
+        if not values:
+            return
+        if fresh_for is not None:
+            fresh_until = time.time() + fresh_for
+            values = {key: {FRESH_UNTIL: fresh_until, 'value': value} for key, value in values.items()}
+        pipe = self.redis.pipeline(transaction=False)
+        for key, value in values.items():
+            pipe.setex(key, expire, self._encode(value))
+        self._invalidate(list(values), pipe)
+        self._round_trip()
+        await pipe.execute()
+        if local and self.local_enabled:
+            self._ensure_listener()
+            for key, value in values.items():
+                self.local.set(key, value, min(self.local_ttl, expire))
+
+    async def delete_many(self, keys: Iterable[str]):
+        """Delete several keys in one round trip"""
+        keys = list(keys)
+        if not keys:
+            return
+        pipe = self.redis.pipeline(transaction=False)
+        pipe.delete(*keys)
+        self._invalidate(keys, pipe)
+        self._round_trip()
+        await pipe.execute()
+
+    async def get_or_revalidate(self, key: str, refresh: Callable[[], Awaitable[Optional[Any]]],
+                                fresh_for: int, expire: int) -> Tuple[Optional[Any], str]:
+        """``(value, state)`` with state 'fresh', 'stale' or 'miss'.
+
+        A stale value is returned immediately and ``refresh`` runs in the
+        background: once per key in this process, and only in the worker that
+        takes the key's refresh lock. Its result (unless None) is stored with
+        the same ``fresh_for``/``expire``. On a miss nothing is started; the
+        caller computes the value and stores it with ``set(..., fresh_for=...)``.
+        """
+        stored = await self._get_stored(key, local=True)
+        if stored is None:
+            return None, 'miss'
+        if not isinstance(stored, dict) or FRESH_UNTIL not in stored:
+            return stored, 'fresh'
+        if stored[FRESH_UNTIL] > time.time():
+            return stored['value'], 'fresh'
+        self.counts['stale_served'] += 1
+        if key not in self._refreshing:
+            self._refreshing[key] = asyncio.create_task(self._refresh(key, refresh, fresh_for, expire))
+        return stored['value'], 'stale'
+
+    async def _refresh(self, key: str, refresh: Callable[[], Awaitable[Optional[Any]]], fresh_for: int, expire: int):
+        lock = f"{key}:refreshing"
+        started = time.perf_counter()
+        try:
+            if not await self.add(lock, self.instance_id, expire=self.refresh_lock_ttl):
+                return
+            try:
+                value = await refresh()
+                if value is not None:
+                    await self.set(key, value, expire=expire, fresh_for=fresh_for)
+                self.counts['refreshes'] += 1
+                self.refresh_seconds.observe(time.perf_counter() - started)
+            finally:
+                self._round_trip()
+                await self.redis.delete(lock)
+        except Exception as e:
+            self.counts['refresh_failures'] += 1
+            print(f"[WARN] Background refresh of {key} failed: {e}")
+        finally:
+            self._refreshing.pop(key, None)
+
+    async def _get_stored(self, key: str, local: bool) -> Optional[Any]:
+        return (await self._get_stored_many([key], local)).get(key)
+
+    async def _get_stored_many(self, keys: List[str], local: bool) -> Dict[str, Any]:
+        self.counts['lookups'] += len(keys)
+        found: Dict[str, Any] = {}
+        remote = keys
+        if local and self.local_enabled:
+            self._ensure_listener()
+            remote = []
+            for key in keys:
+                value = self.local.get(key)
+                if value is None:
+                    remote.append(key)
+                else:
+                    found[key] = value
+            self.counts['local_hits'] += len(found)
+        if not remote:
+            return found
+
+        self._round_trip()
+        raws = [await self.redis.get(remote[0])] if len(remote) == 1 else await self.redis.mget(remote)
+        for key, raw in zip(remote, raws):
+            if not raw:
+                self.counts['misses'] += 1
+                continue
+            try:
+                value = self.serializer.loads(raw)
+            except Exception as e:
+                # e.g. written with a codec whose library this worker lacks
+                self.counts['decode_failures'] += 1
+                self.counts['misses'] += 1
+                print(f"[WARN] Could not decode cached {key}: {e}")
+                continue
+            self.counts['redis_hits'] += 1
+            found[key] = value
+            if local and self.local_enabled:
+                self.local.set(key, value, self.local_ttl)
+        return found
+
+    def _round_trip(self):
+        self.counts['round_trips'] += 1
+        trips = _request_round_trips.get()
+        if trips is not None:
+            trips.count += 1
+
+    def _encode(self, value: Any) -> bytes:
+        stored, size = self.serializer.dumps_with_size(value)
+        self.counts['writes'] += 1
+        self.counts['payload_bytes'] += size
+        self.counts['stored_bytes'] += len(stored)
+        return stored
+
+    def _invalidate(self, keys: List[str], pipe):
+        """Drop the keys here and queue a message on ``pipe`` telling the other workers to drop them too"""
+        for key in keys:
+            self.local.delete(key)
+        if self.local_enabled:
+            pipe.publish(self.invalidation_channel, "\n".join([self.instance_id] + keys))
+
+    def _ensure_listener(self):
+        loop = asyncio.get_running_loop()
+        if self._listener is not None and not self._listener.done() and self._listener_loop is loop:
+            return
+        if time.monotonic() - self._listener_failed_at < RESUBSCRIBE_SECONDS:
+            return
+        # Entries cached while nobody listened may have missed invalidations
+        self.local.clear()
+        self._listener_loop = loop
+        self._listener = loop.create_task(self._listen())
+
+    async def _listen(self):
+        pubsub = self.redis.pubsub()
+        try:
+            await pubsub.subscribe(self.invalidation_channel)
+            async for message in pubsub.listen():
+                if message.get('type') != 'message':
+                    continue
+                data = message['data']
+                if isinstance(data, bytes):
+                    data = data.decode("utf-8")
+                sender, *keys = data.split("\n")
+                if sender != self.instance_id:
+                    for key in keys:
+                        self.local.delete(key)
+                    self.counts['invalidations_received'] += len(keys)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._listener_failed_at = time.monotonic()
+            self.local.clear()
+            print(f"[WARN] Cache invalidation listener stopped: {e}")
+        finally:
+            try:
+                await pubsub.aclose()
+            except Exception:
+                pass
+
+    def snapshot(self) -> Dict:
+        counts = dict(self.counts)
+        lookups = counts['lookups']
+        remote_lookups = lookups - counts['local_hits']
+        return {
+            **counts,
+            'local_entries': len(self.local),
+            'local_max_entries': self.local.max_entries,
+            'local_evictions': self.local.evictions,
+            'local_hit_rate': round(counts['local_hits'] / lookups, 4) if lookups else 0.0,
+            'redis_hit_rate': round(counts['redis_hits'] / remote_lookups, 4) if remote_lookups else 0.0,
+            'hit_rate': round((counts['local_hits'] + counts['redis_hits']) / lookups, 4) if lookups else 0.0,
+            'serializer': self.serializer.name,
+            'compression_ratio': round(counts['stored_bytes'] / counts['payload_bytes'], 4)
+                if counts['payload_bytes'] else 0.0,
+            'refresh_seconds': self.refresh_seconds.snapshot()
+        }
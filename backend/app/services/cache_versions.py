@@ -0,0 +1,97 @@
+"""
+Versioned cache namespaces
+
+Cache keys embed the versions of what their values were computed from: the
+career graph, the skill embedding model and the prompts. Each namespace has a
+counter in Redis (``cache-version:{namespace}``); bumping it is one INCR, after
+which every worker builds different keys and the old entries age out by TTL,
+instead of a flush that sends every request to Neo4j and Gemini at once.
+
+Counters are read through the cache's local tier, so most requests do not
+pay a round trip for them, and a bump invalidates the other workers' copies
+like any other write. Code-defined versions (e.g. the embedding model name)
+are registered as static parts of a namespace, so deploying a change needs no
+bump at all.
+"""
+
+import uuid
+from typing import Dict, List, Optional
+
+import redis
+
+from app.services.cache import RedisCache
+
+NAMESPACES = ('graph', 'embeddings', 'prompts')
+
+def version_key(namespace: str) -> str:
+    return f"cache-version:{namespace}"
+
+def bump_version_blocking(client: redis.Redis, namespace: str, channel: str = "cache-invalidate") -> int:
+    """Bump a namespace from synchronous code (scripts, worker threads); returns the new version"""
+    key = version_key(namespace)
+    pipe = client.pipeline(transaction=False)
+    pipe.incr(key)
+    # Same message format as RedisCache, from a sender no worker ignores
+    pipe.publish(channel, f"{uuid.uuid4().hex[:12]}\n{key}")
+    return pipe.execute()[0]
+
+class CacheVersions:
+    """Current namespace versions and the key tags built from them"""
+
+    def __init__(self, cache: RedisCache, redis_url: Optional[str] = None):
+        self.cache = cache
+        # For bumps from threads, e.g. CareerGraphDB writes made via asyncio.to_thread
+        self.sync_redis = redis.Redis.from_url(redis_url) if redis_url else None
+        self.static: Dict[str, str] = {}
+        self.last: Dict[str, int] = {}
+        self.counts = {'bumps': 0, 'read_failures': 0}
+
+    def register(self, namespace: str, static: str):
+        """Make a code-defined version (model name, prompt hash) part of the namespace"""
+        self.static[namespace] = f"{self.static[namespace]}+{static}" if namespace in self.static else static
+
+    async def current(self, namespaces: List[str]) -> Dict[str, int]:
+        """Counter of each namespace; the last known values if Redis is unreachable"""
+        try:
+            found = await self.cache.get_many([version_key(namespace) for namespace in namespaces])
+            versions = {}
+            for namespace in namespaces:
+                version = found.get(version_key(namespace))
+                if version is None:
+                    # Creates the counter at 0 so later reads are served by the local tier
+                    version = await self.cache.incr(version_key(namespace), 0)
+                versions[namespace] = int(version)
+            self.last.update(versions)
+            return versions
+        except Exception as e:
+            self.counts['read_failures'] += 1
+            print(f"[WARN] Cache versions unavailable, using last known: {e}")
+            return {namespace: self.last.get(namespace, 0) for namespace in namespaces}
+
+    async def tag(self, *namespaces: str) -> str:
+        """Key fragment that changes whenever any of ``namespaces`` is bumped, e.g. ``g3.p1``"""
+        versions = await self.current(list(namespaces))
+        parts = []
+        for namespace in namespaces:
+            static = self.static.get(namespace)
+            parts.append(f"{namespace[0]}{versions[namespace]}" + (f"-{static}" if static else ""))
+        return ".".join(parts)
+
+    async def bump(self, namespace: str) -> int:
+        """Invalidate everything cached under ``namespace``; returns the new version"""
+        version = await self.cache.incr(version_key(namespace))
+        self.counts['bumps'] += 1
+        print(f"[INFO] Cache namespace {namespace} is now at version {version}")
+        return version
+
+    def bump_blocking(self, namespace: str) -> int:
+        """``bump`` for synchronous code; needs ``redis_url``"""
+        if self.sync_redis is None:
+            raise RuntimeError("CacheVersions was created without a redis_url")
+        version = bump_version_blocking(self.sync_redis, namespace, self.cache.invalidation_channel)
+        self.counts['bumps'] += 1
+        print(f"[INFO] Cache namespace {namespace} is now at version {version}")
+        return version
+
+    def snapshot(self) -> Dict:
+        return {**self.counts, 'versions': dict(self.last), 'static': dict(self.static)}
@@ -0,0 +1,143 @@
+"""
+Serialization for cached values
+
+``ValueSerializer`` turns a value into the bytes ``RedisCache`` stores: one
+header byte naming the codec and compression, then the payload.
+
+    header = 0b1CCCCZZZ   C = codec id, Z = compression id
+
+Entries written before the header existed are plain JSON text, whose first
+byte is ASCII (high bit clear), so they still decode. Any serializer reads
+every format whose library is installed, which lets workers be switched to a
+new codec or compression one at a time.
+"""
+
+import json
+import zlib
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple, Union
+
+FRAMED = 0x80
+
+@dataclass(frozen=True)
+class Codec:
+    name: str
+    id: int
+    dumps: Callable[[Any], bytes]
+    loads: Callable[[bytes], Any]
+
+@dataclass(frozen=True)
+class Compression:
+    name: str
+    id: int
+    compress: Callable[[bytes], bytes]
+    decompress: Callable[[bytes], bytes]
+
+def _json() -> Codec:
+    return Codec('json', 0, lambda value: json.dumps(value).encode("utf-8"), json.loads)
+
+def _orjson() -> Codec:
+    import orjson
+    # Non-string keys are turned into strings, as json.dumps does
+    return Codec('orjson', 1, lambda value: orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS), orjson.loads)
+
+def _msgpack() -> Codec:
+    import msgpack
+    return Codec('msgpack', 2, lambda value: msgpack.packb(value, use_bin_type=True),
+                 lambda payload: msgpack.unpackb(payload, raw=False, strict_map_key=False))
+
+def _zlib() -> Compression:
+    return Compression('zlib', 1, lambda payload: zlib.compress(payload, 1), zlib.decompress)
+
+def _zstd() -> Compression:
+    import zstandard
+    compressor, decompressor = zstandard.ZstdCompressor(level=3), zstandard.ZstdDecompressor()
+    return Compression('zstd', 2, compressor.compress, decompressor.decompress)
+
+def _lz4() -> Compression:
+    import lz4.frame
+    return Compression('lz4', 3, lz4.frame.compress, lz4.frame.decompress)
+
+CODECS: Dict[str, Callable[[], Codec]] = {'json': _json, 'orjson': _orjson, 'msgpack': _msgpack}
+COMPRESSIONS: Dict[str, Callable[[], Compression]] = {'zlib': _zlib, 'zstd': _zstd, 'lz4': _lz4}
+CODEC_IDS = {'json': 0, 'orjson': 1, 'msgpack': 2}
+COMPRESSION_IDS = {'none': 0, 'zlib': 1, 'zstd': 2, 'lz4': 3}
+
+class ValueSerializer:
+    """Encodes with one codec (compressing payloads of ``compress_min_bytes`` or more), decodes any"""
+
+    def __init__(self, codec: str = 'json', compression: Optional[str] = None, compress_min_bytes: int = 1024):
+        self.codec = CODECS[codec]()
+        self.compression = COMPRESSIONS[compression]() if compression and compression != 'none' else None
+        self.compress_min_bytes = compress_min_bytes
+        self._codecs = {self.codec.id: self.codec}
+        self._compressions = {self.compression.id: self.compression} if self.compression else {}
+
+    @property
+    def name(self) -> str:
+        return f"{self.codec.name}+{self.compression.name if self.compression else 'none'}"
+
+    def dumps(self, value: Any) -> bytes:
+        return self.dumps_with_size(value)[0]
+
+    def dumps_with_size(self, value: Any) -> Tuple[bytes, int]:
+        """Stored bytes and the size of the payload before compression"""
+        payload = self.codec.dumps(value)
+        size = len(payload)
+        compression_id = 0
+        if self.compression is not None and size >= self.compress_min_bytes:
+            compressed = self.compression.compress(payload)
+            # Incompressible payloads are stored as they are
+            if len(compressed) < size:
+                payload, compression_id = compressed, self.compression.id
+        return bytes([FRAMED | self.codec.id << 3 | compression_id]) + payload, size
+
+    def loads(self, stored: Union[bytes, str]) -> Any:
+        if isinstance(stored, str) or not stored or not stored[0] & FRAMED:
+            return json.loads(stored)
+        header, payload = stored[0], stored[1:]
+        compression_id = header & 0b111
+        if compression_id:
+            payload = self._compression(compression_id).decompress(payload)
+        return self._codec(header >> 3 & 0b1111).loads(payload)
+
+    def _codec(self, codec_id: int) -> Codec:
+        codec = self._codecs.get(codec_id)
+        if codec is None:
+            name = next((name for name, i in CODEC_IDS.items() if i == codec_id), None)
+            if name is None:
+                raise ValueError(f"Unknown cache codec id {codec_id}")
+            if name == 'orjson':
+                # Same bytes as JSON, so the standard library can read them too
+                try:
+                    codec = _orjson()
+                except ImportError:
+                    codec = Codec('orjson', 1, _json().dumps, json.loads)
+            else:
+                codec = CODECS[name]()
+            self._codecs[codec_id] = codec
+        return codec
+
+    def _compression(self, compression_id: int) -> Compression:
+        compression = self._compressions.get(compression_id)
+        if compression is None:
+            name = next((name for name, i in COMPRESSION_IDS.items() if i == compression_id), None)
+            if name is None or name == 'none':
+                raise ValueError(f"Unknown cache compression id {compression_id}")
+            compression = self._compressions[compression_id] = COMPRESSIONS[name]()
+        return compression
+
+def load_serializer(codec: str, compression: str, compress_min_bytes: int) -> ValueSerializer:
+    """The configured serializer, falling back to json / zlib when a library is not installed"""
+    try:
+        CODECS[codec]()
+    except ImportError as e:
+        print(f"[WARN] Cache codec {codec} unavailable, using json: {e}")
+        codec = 'json'
+    if compression and compression != 'none':
+        try:
+            COMPRESSIONS[compression]()
+        except ImportError as e:
+            print(f"[WARN] Cache compression {compression} unavailable, using zlib: {e}")
+            compression = 'zlib'
+    return ValueSerializer(codec, compression, compress_min_bytes)
@@ -0,0 +1,82 @@
+"""
+Local store of precomputed transition enrichment, versioned by prompt and model
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+class EnrichmentStore:
+    """SQLite table of ``(from_role, to_role) -> enrichment`` rows.
+
+    Rows are keyed by prompt version and model as well, so bumping either one
+    makes the old rows invisible without deleting them, and the pre-enrichment
+    job simply fills the new version in.
+    """
+
+    def __init__(self, path: str, prompt_version: str, model: str):
+        self.path = path
+        self.prompt_version = prompt_version
+        self.model = model
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS transition_enrichment (
+                    from_role TEXT NOT NULL,
+                    to_role TEXT NOT NULL,
+                    prompt_version TEXT NOT NULL,
+                    model TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (from_role, to_role, prompt_version, model)
+                )
+            """)
+
+    def get(self, from_role: str, to_role: str) -> Optional[Dict]:
+        return self.get_many([(from_role, to_role)]).get((from_role, to_role))
+
+    def get_many(self, pairs: Iterable[Tuple[str, str]]) -> Dict[Tuple[str, str], Dict]:
+        """Precomputed enrichment for every pair that has a row in the current version"""
+        wanted = set(pairs)
+        if not wanted:
+            return {}
+        from_roles = sorted({from_role for from_role, _ in wanted})
+        placeholders = ",".join("?" for _ in from_roles)
+        with self._lock:
+            rows = self._conn.execute(f"""
+                SELECT from_role, to_role, data FROM transition_enrichment
+                WHERE prompt_version = ? AND model = ? AND from_role IN ({placeholders})
+            """, [self.prompt_version, self.model, *from_roles]).fetchall()
+        return {
+            (from_role, to_role): json.loads(data)
+            for from_role, to_role, data in rows
+            if (from_role, to_role) in wanted
+        }
+
+    def put(self, from_role: str, to_role: str, data: Dict):
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT OR REPLACE INTO transition_enrichment
+                    (from_role, to_role, prompt_version, model, data, created_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (from_role, to_role, self.prompt_version, self.model, json.dumps(data), time.time()))
+
+    def completed_pairs(self) -> List[Tuple[str, str]]:
+        """Pairs already enriched for the current version (used to resume the batch job)"""
+        with self._lock:
+            rows = self._conn.execute("""
+                SELECT from_role, to_role FROM transition_enrichment
+                WHERE prompt_version = ? AND model = ?
+            """, (self.prompt_version, self.model)).fetchall()
+        return [(from_role, to_role) for from_role, to_role in rows]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
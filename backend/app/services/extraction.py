@@ -0,0 +1,264 @@
+"""
+Upload spooling and document text extraction off the event loop
+
+PyPDF2 and python-docx are pure Python and CPU-bound: a large PDF holds the
+GIL for hundreds of milliseconds, so running them in a thread would still
+stall the event loop. Extraction runs in a small process pool instead, with
+a cap on queued documents, a per-document timeout and a page limit. Uploads
+are read in chunks with a size cap and spooled to disk past a threshold, so
+workers get a file path rather than a pickled copy of a large upload.
+"""
+
+import asyncio
+import hashlib
+import multiprocessing
+import os
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from app.config import settings
+from app.utils.pdf_parser import (
+    SNIFF_BYTES, count_pdf_pages, extract_pdf_pages, extract_text, first_gap, join_pages, needs_worker,
+    sniff_format
+)
+
+CHUNK_SIZE = 64 * 1024
+
+class UploadTooLarge(ValueError):
+    pass
+
+class ExtractionTimeout(TimeoutError):
+    pass
+
+@dataclass
+class SpooledUpload:
+    """An upload read with a size cap; kept in memory below the spool threshold, on disk above it"""
+    filename: str
+    size: int
+    digest: str  # SHA-256 of the bytes
+    head: bytes  # first bytes, for format sniffing
+    data: Optional[bytes] = None
+    path: Optional[str] = None
+    # Holders of the spooled file; it is deleted when the last one calls cleanup()
+    refs: int = 1
+
+    @classmethod
+    def from_bytes(cls, data: bytes, filename: str) -> "SpooledUpload":
+        return cls(filename, len(data), hashlib.sha256(data).hexdigest(), data[:SNIFF_BYTES], data=data)
+
+    def read_bytes(self) -> bytes:
+        if self.data is not None:
+            return self.data
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def retain(self) -> "SpooledUpload":
+        """Keep the spooled file until a matching ``cleanup()``, e.g. for work that outlives the request"""
+        self.refs += 1
+        return self
+
+    def cleanup(self):
+        self.refs -= 1
+        if self.refs <= 0 and self.path is not None:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+async def spool_upload(file, max_bytes: int, spool_threshold: int) -> SpooledUpload:
+    """Read an ``UploadFile`` in chunks, hashing as it goes; raises ``UploadTooLarge`` past ``max_bytes``"""
+    digest = hashlib.sha256()
+    head = b""
+    buffer = bytearray()
+    spool = None
+    size = 0
+    try:
+        while True:
+            chunk = await file.read(CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise UploadTooLarge(f"Upload exceeds the {max_bytes // (1024 * 1024)} MB limit")
+            digest.update(chunk)
+            if len(head) < SNIFF_BYTES:
+                head += chunk[:SNIFF_BYTES - len(head)]
+            if spool is None and len(buffer) + len(chunk) > spool_threshold:
+                spool = tempfile.NamedTemporaryFile(prefix="upload-", delete=False)
+                spool.write(buffer)
+                buffer = bytearray()
+            if spool is not None:
+                spool.write(chunk)
+            else:
+                buffer += chunk
+    except BaseException:
+        if spool is not None:
+            spool.close()
+            os.unlink(spool.name)
+        raise
+
+    if spool is None:
+        return SpooledUpload(file.filename, size, digest.hexdigest(), head, data=bytes(buffer))
+    spool.close()
+    return SpooledUpload(file.filename, size, digest.hexdigest(), head, path=spool.name)
+
+def _read(data: Optional[bytes], path: Optional[str]) -> bytes:
+    if path is None:
+        return data
+    with open(path, 'rb') as f:
+        return f.read()
+
+def _extract_in_worker(data: Optional[bytes], path: Optional[str], filename: str, max_pages: int,
+                       max_chars: int) -> str:
+    return extract_text(_read(data, path), filename, max_pages, max_chars)
+
+def _extract_pages_in_worker(data: Optional[bytes], path: Optional[str], max_pages: int, max_chars: int,
+                             part: int, parts: int) -> Tuple[int, Dict[int, str]]:
+    """(page count, page number -> text) for one stride of a PDF"""
+    data = _read(data, path)
+    return count_pdf_pages(data, max_pages), extract_pdf_pages(data, max_pages, max_chars, part, parts)
+
+class DocumentExtractor:
+    """Bounded process pool for text extraction.
+
+    At most ``max_pending`` documents are submitted at once; further callers
+    wait without blocking the loop. A document that exceeds ``timeout`` has
+    its worker killed and the pool is replaced. PDFs of at least
+    ``parallel_min_bytes`` have their pages split across up to ``max_workers``
+    workers. ``max_workers=0`` extracts in a thread instead (for environments
+    that cannot start processes).
+    """
+
+    def __init__(self, max_workers: int, max_pending: int, timeout: float, max_pages: int,
+                 max_chars: int = 0, parallel_min_bytes: int = 256 * 1024,
+                 worker: Callable[..., Any] = _extract_in_worker):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.max_pages = max_pages
+        self.max_chars = max_chars
+        self.parallel_min_bytes = parallel_min_bytes
+        self.worker = worker
+        self.max_pending = max_pending
+        self._pending: Optional[asyncio.Semaphore] = None
+        self._pending_loop = None
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+        self.stats = {'extracted': 0, 'parallel': 0, 'inline': 0, 'timeouts': 0, 'failures': 0, 'pool_restarts': 0}
+
+    def _pending_slots(self) -> asyncio.Semaphore:
+        # Semaphores belong to one event loop; tests and scripts may run several
+        loop = asyncio.get_running_loop()
+        if self._pending_loop is not loop:
+            self._pending = asyncio.Semaphore(self.max_pending)
+            self._pending_loop = loop
+        return self._pending
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._pool is None:
+                # spawn: forking a process that runs executor threads can deadlock the child
+                self._pool = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                 mp_context=multiprocessing.get_context("spawn"))
+            return self._pool
+
+    def _reset_pool(self, pool: ProcessPoolExecutor):
+        """Kill a pool whose worker is stuck; the next extraction starts a fresh one"""
+        with self._lock:
+            if self._pool is not pool:
+                return
+            self._pool = None
+        self.stats['pool_restarts'] += 1
+        # ProcessPoolExecutor cannot cancel a running task, so terminate its workers
+        for process in list((getattr(pool, '_processes', None) or {}).values()):
+            process.terminate()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+    async def extract(self, upload: SpooledUpload) -> str:
+        if not needs_worker(upload.head, upload.filename):
+            self.stats['inline'] += 1
+            return extract_text(upload.read_bytes(), upload.filename, max_chars=self.max_chars)
+
+        async with self._pending_slots():
+            try:
+                for attempt in range(2):
+                    try:
+                        text = await self._run(upload)
+                        break
+                    except BrokenProcessPool:
+                        # Another document's timeout tore the pool down under this one
+                        if attempt:
+                            raise
+            except ExtractionTimeout:
+                self.stats['timeouts'] += 1
+                raise
+            except Exception:
+                self.stats['failures'] += 1
+                raise
+        self.stats['extracted'] += 1
+        return text
+
+    def _parts(self, upload: SpooledUpload) -> int:
+        if (self.max_workers > 1 and upload.size >= self.parallel_min_bytes
+                and sniff_format(upload.head, upload.filename) == 'pdf'):
+            return min(self.max_workers, self.max_pages)
+        return 1
+
+    async def _run(self, upload: SpooledUpload) -> str:
+        pool = self._get_pool() if self.max_workers > 0 else None
+        try:
+            return await asyncio.wait_for(self._extract(upload, pool), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            print(f"[WARN] Extraction of {upload.filename} ({upload.size} bytes) timed out after {self.timeout}s")
+            if pool is not None:
+                self._reset_pool(pool)
+            raise ExtractionTimeout(f"Could not extract text from {upload.filename} in {self.timeout:.0f}s")
+
+    async def _extract(self, upload: SpooledUpload, pool: Optional[ProcessPoolExecutor]) -> str:
+        args = (upload.data, upload.path, upload.filename, self.max_pages, self.max_chars)
+        if pool is None:
+            return await asyncio.to_thread(self.worker, *args)
+        loop = asyncio.get_running_loop()
+        parts = self._parts(upload)
+        if parts == 1:
+            return await loop.run_in_executor(pool, self.worker, *args)
+
+        # Each stride gets an equal share of the character limit, so together
+        # they do about the work of one sequential pass
+        self.stats['parallel'] += 1
+        source = (upload.data, upload.path, self.max_pages)
+        share = -(-self.max_chars // parts) if self.max_chars else 0
+        results = await asyncio.gather(*[
+            loop.run_in_executor(pool, _extract_pages_in_worker, *source, share, part, parts)
+            for part in range(parts)
+        ])
+        page_count = results[0][0]
+        pages = {number: text for _, stride in results for number, text in stride.items()}
+        gap = first_gap(pages, page_count, self.max_chars)
+        if gap is not None:
+            # Text was unevenly spread and a stride stopped too early; finish in one pass
+            _, rest = await loop.run_in_executor(pool, _extract_pages_in_worker, *source, self.max_chars, gap, 1)
+            pages.update(rest)
+        return join_pages(pages, self.max_chars)
+
+    def shutdown(self):
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def snapshot(self) -> Dict:
+        return {**self.stats, 'max_workers': self.max_workers, 'timeout_seconds': self.timeout}
+
+document_extractor = DocumentExtractor(
+    max_workers=settings.EXTRACT_MAX_WORKERS,
+    max_pending=settings.EXTRACT_MAX_PENDING,
+    timeout=settings.EXTRACT_TIMEOUT_SECONDS,
+    max_pages=settings.EXTRACT_MAX_PAGES,
+    max_chars=settings.EXTRACT_MAX_CHARS,
+    parallel_min_bytes=settings.EXTRACT_PARALLEL_MIN_BYTES
+)
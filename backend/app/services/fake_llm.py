@@ -0,0 +1,210 @@
+"""
+Deterministic stand-in for the LLM provider, used for offline load tests
+"""
+
+import json
+import random
+import re
+import time
+from typing import Callable, Dict, Optional
+
+from app.config import settings
+from app.services.llm_gateway import LLMResult
+
+STEP_ENRICHMENT = {
+    'learning_resources': [
+        {
+            'skill': 'Core skills',
+            'resource_type': 'course',
+            'title': 'Fundamentals for the next role',
+            'url': 'https://example.com/course',
+            'provider': 'Coursera',
+            'duration': '4 weeks',
+            'cost': 'Free',
+            'difficulty': 'Intermediate',
+            'why_recommended': 'Covers the most important skills for this step'
+        }
+    ],
+    'certifications': [
+        {
+            'name': 'Professional Certificate',
+            'provider': 'Example Institute',
+            'estimated_cost': 200,
+            'study_duration': '6 weeks',
+            'validity': '2 years',
+            'url': 'professional certificate',
+            'importance': 'Optional'
+        }
+    ],
+    'practical_projects': [
+        {
+            'project_title': 'Portfolio project',
+            'description': 'Build something that uses the new skills end to end',
+            'estimated_time': '3 weeks',
+            'resources': ['https://example.com/guide']
+        }
+    ]
+}
+
+CROSS_INDUSTRY_PLAN = {
+    'is_feasible': True,
+    'feasibility_note': 'Feasible with focused upskilling',
+    'estimated_timeline_months': 18,
+    'difficulty_rating': 7,
+    'salary_info': {
+        'current_role_avg_salary': 60000,
+        'target_role_avg_salary': 90000,
+        'initial_salary_drop': 0,
+        'long_term_salary_potential': 120000,
+        'salary_note': 'Salary grows after the first role in the new field'
+    },
+    'skill_analysis': {
+        'transferable_skills': ['Communication'],
+        'skill_match_percentage': 40,
+        'skills_that_translate': [{'from': 'Communication', 'to': 'Stakeholder management'}],
+        'missing_critical_skills': ['Domain knowledge']
+    },
+    'transition_steps': [
+        {
+            'step': 1,
+            'title': 'Foundations',
+            'description': 'Learn the fundamentals of the target field',
+            'duration_months': 6,
+            'estimated_salary': 60000,
+            'skills_to_acquire': ['Domain knowledge'],
+            'actions': ['Complete an introductory course'],
+            'estimated_cost': 500,
+            **STEP_ENRICHMENT
+        },
+        {
+            'step': 2,
+            'title': 'Entry role',
+            'description': 'Land an entry-level role in the target field',
+            'duration_months': 12,
+            'estimated_salary': 75000,
+            'skills_to_acquire': ['Applied practice'],
+            'actions': ['Apply to entry-level positions'],
+            'estimated_cost': 0,
+            **STEP_ENRICHMENT
+        }
+    ],
+    'challenges': ['Building credibility in a new field'],
+    'success_tips': ['Network with practitioners'],
+    'alternative_paths': [],
+    'realistic_success_rate': 60,
+    'community_resources': [],
+    'mentorship_opportunities': []
+}
+
+STREAM_CHUNK_CHARS = 64
+
+PARSED_RESUME = {
+    'full_name': 'Jane Doe',
+    'email': 'jane@example.com',
+    'phone': None,
+    'current_role': 'Software Engineer',
+    'years_total_experience': 4,
+    'skills': [
+        {'name': 'Python', 'category': 'technical', 'proficiency': 4, 'years_experience': 4},
+        {'name': 'SQL', 'category': 'technical', 'proficiency': 3, 'years_experience': 3}
+    ],
+    'experience': [
+        {
+            'company': 'Example Corp',
+            'role': 'Software Engineer',
+            'duration_months': 48,
+            'description': 'Built backend services',
+            'skills_used': ['Python', 'SQL']
+        }
+    ],
+    'education': ['B.Sc. Computer Science'],
+    'certifications': [],
+    'industry': 'Technology',
+    'summary': 'Backend engineer with four years of experience'
+}
+
+def _estimate_tokens(text: str) -> int:
+    return len(text) // 4 + 1
+
+def _match_role(prompt: str) -> str:
+    """Pick the numbered candidate sharing most words with the user input"""
+    candidates = re.findall(r"^\d+\. (.+)$", prompt, flags=re.MULTILINE)
+    user_input = re.search(r'USER INPUT: "(.+)"', prompt) or re.search(r'Match "(.+?)"', prompt)
+    if not candidates:
+        return "NONE"
+    words = set((user_input.group(1) if user_input else "").lower().split())
+    return max(candidates, key=lambda role: len(words & set(role.lower().split())))
+
+def _enrich_batch(prompt: str) -> str:
+    ids = re.findall(r'"id": "(t\d+)"', prompt)
+    return json.dumps({transition_id: STEP_ENRICHMENT for transition_id in ids})
+
+class FakeBackend:
+    """Answers every call site with canned, schema-valid output after a configurable delay.
+
+    ``responses`` maps a call site to the exact text to return and overrides the
+    built-in defaults. Latency jitter is drawn from a seeded RNG so runs are
+    reproducible.
+    """
+
+    name = "fake"
+
+    def __init__(self, latency_ms: float = 0.0, jitter_ms: float = 0.0,
+                 responses: Optional[Dict[str, str]] = None, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.responses = responses or {}
+        self._random = random.Random(seed)
+
+    @classmethod
+    def from_settings(cls) -> "FakeBackend":
+        responses = None
+        if settings.LLM_FAKE_RESPONSES_PATH:
+            with open(settings.LLM_FAKE_RESPONSES_PATH) as f:
+                responses = json.load(f)
+        return cls(
+            latency_ms=settings.LLM_FAKE_LATENCY_MS,
+            jitter_ms=settings.LLM_FAKE_JITTER_MS,
+            responses=responses
+        )
+
+    def _response_for(self, prompt: str, site: str) -> str:
+        if site in self.responses:
+            return self.responses[site]
+        if site == "enrich_batch":
+            return _enrich_batch(prompt)
+        if site == "match_role":
+            return _match_role(prompt)
+        if site == "cross_industry":
+            return json.dumps(CROSS_INDUSTRY_PLAN)
+        if site == "parse_resume":
+            return json.dumps(PARSED_RESUME)
+        return json.dumps(STEP_ENRICHMENT)
+
+    def _delay_seconds(self) -> float:
+        return (self.latency_ms + (self._random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)) / 1000
+
+    def generate(self, prompt: str, site: str, prefix: str = "") -> LLMResult:
+        prompt = prefix + prompt
+        delay = self._delay_seconds()
+        if delay:
+            time.sleep(delay)
+        text = self._response_for(prompt, site)
+        return LLMResult(text=text, prompt_tokens=_estimate_tokens(prompt), output_tokens=_estimate_tokens(text))
+
+    def stream(self, prompt: str, site: str, on_chunk: Callable[[str], bool], prefix: str = "") -> LLMResult:
+        """Same text as ``generate`` in STREAM_CHUNK_CHARS pieces; the first arrives after a
+        fifth of the latency and the rest are spread over the remainder"""
+        prompt = prefix + prompt
+        text = self._response_for(prompt, site)
+        chunks = [text[i:i + STREAM_CHUNK_CHARS] for i in range(0, len(text), STREAM_CHUNK_CHARS)] or [""]
+        delay = self._delay_seconds()
+        sent = []
+        for i, chunk in enumerate(chunks):
+            if delay:
+                time.sleep(delay * 0.2 if i == 0 else delay * 0.8 / max(len(chunks) - 1, 1))
+            sent.append(chunk)
+            if not on_chunk(chunk):
+                break
+        sent_text = "".join(sent)
+        return LLMResult(text=sent_text, prompt_tokens=_estimate_tokens(prompt), output_tokens=_estimate_tokens(sent_text))
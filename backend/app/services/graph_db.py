@@ -2,11 +2,43 @@
 Career path finding using Neo4j graph database
 """
 
-import google.generativeai as genai
+import hashlib
+
 from neo4j import GraphDatabase
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional
 from dataclasses import dataclass, field
 
+from app.core.prompt_budget import compact, prompt_budgets
+from app.services.llm_gateway import LLMGateway
+
+# Static part of the role-matching prompt; the candidate list and user input follow it
+MATCH_ROLE_INSTRUCTIONS = compact("""You are a career matching expert. Match the user's job title to the closest role from the numbered CANDIDATE ROLES list below.
+
+MATCHING RULES:
+- Match job title variations (SWE=Software Engineer, Dev=Developer, Eng=Engineer)
+- Match seniority levels (Intern, Junior, Mid-Senior, Senior, Lead, Staff, Principal, Manager+)
+- Match specializations (Frontend, Backend, Full Stack, Mobile, Data, ML, DevOps, Cloud, Security)
+- Handle abbreviations (PM=Product Manager, QA=Quality Assurance, BA=Business Analyst)
+- Default vague inputs to mid-level (e.g., "devops" → "DevOps Engineer")
+- Student roles map to appropriate entry positions
+
+OUTPUT FORMAT: Return ONLY the exact role name from the numbered list. If no match exists, return "NONE"
+
+Examples:
+"SWE intern" → "Software Developer Intern"
+"senior backend dev" → "Senior Backend Developer"
+"data analyst" → "Data Analyst"
+"ML" → "Machine Learning Engineer"
+""") + "\n\n"
+
+# Ids of roles created for LLM-generated plans; their titles are generic step names shared across plans
+GENERATED_ROLE_PREFIX = "gen-"
+
+def generated_role_id(current_role: str, target_role: str, index: int) -> str:
+    """Id of hop ``index`` of the generated plan from ``current_role`` to ``target_role``"""
+    plan_id = hashlib.sha256(f"{current_role}|{target_role}".lower().encode("utf-8")).hexdigest()[:12]
+    return f"{GENERATED_ROLE_PREFIX}{plan_id}-{index}"
+
 @dataclass
 class CareerPath:
     roles: List[str]
@@ -16,13 +48,36 @@ class CareerPath:
     required_skills: List[str]
     transitions: List[Dict] = field(default_factory=list)  # Detailed step-by-step transition info
 
+@dataclass
+class RoleMatch:
+    query: str
+    title: Optional[str]
+    method: str  # 'exact', 'normalized', 'llm' or 'none'
+
+    @property
+    def confident(self) -> bool:
+        """Matched without the LLM, so the title is certainly in the graph"""
+        return self.method in ('exact', 'normalized')
+
 class CareerGraphDB:
-    def __init__(self, uri: str, user: str, password: str, google_api_key: Optional[str] = None):
+    def __init__(self, uri: str, user: str, password: str, llm: Optional[LLMGateway] = None,
+                 on_write: Optional[Callable[[], None]] = None):
         self.driver = GraphDatabase.driver(uri, auth=(user, password))
-        self.google_api_key = google_api_key
+        self.llm = llm
+        # Called after every write, e.g. to bump the graph's cache version
+        self.on_write = on_write
     
     def close(self):
         self.driver.close()
+
+    def _written(self):
+        if self.on_write is None:
+            return
+        try:
+            self.on_write()
+        except Exception as e:
+            # Results cached before this write are served until they expire
+            print(f"[WARN] Graph write hook failed: {e}")
     
     def create_career_graph_schema(self):
         """Initialize career graph schema"""
@@ -50,6 +105,7 @@ class CareerGraphDB:
                     r.growth_rate = $growth_rate,
                     r.demand_score = $demand_score
             """, **role_data)
+        self._written()
     
     def add_transition(self, from_role_id: str, to_role_id: str, 
                       transition_data: Dict):
@@ -64,46 +120,120 @@ class CareerGraphDB:
                     t.success_rate = $success_rate,
                     t.common_path = $common_path
             """, from_id=from_role_id, to_id=to_role_id, **transition_data)
+        self._written()
     
     def add_skill_requirement(self, role_id: str, skill_id: str, 
                             proficiency: int, importance: str, skill_name: Optional[str] = None):
         """Link role to required skill"""
         with self.driver.session() as session:
-            session.run("""
-                MATCH (r:Role {id: $role_id})
-                MERGE (s:Skill {id: $skill_id})
-                ON CREATE SET s.name = $skill_name
-                MERGE (r)-[req:REQUIRES_SKILL]->(s)
-                SET req.proficiency = $proficiency,
-                    req.importance = $importance
-            """, role_id=role_id, skill_id=skill_id, 
-                proficiency=proficiency, importance=importance, skill_name=skill_name or skill_id)
+            self._merge_skill_requirement(session, role_id, skill_id, proficiency, importance, skill_name)
+        self._written()
+
+    @staticmethod
+    def _merge_skill_requirement(session, role_id: str, skill_id: str, proficiency: int, importance: str,
+                                 skill_name: Optional[str] = None):
+        session.run("""
+            MATCH (r:Role {id: $role_id})
+            MERGE (s:Skill {id: $skill_id})
+            ON CREATE SET s.name = $skill_name
+            MERGE (r)-[req:REQUIRES_SKILL]->(s)
+            SET req.proficiency = $proficiency,
+                req.importance = $importance
+        """, role_id=role_id, skill_id=skill_id,
+            proficiency=proficiency, importance=importance, skill_name=skill_name or skill_id)
     
+    def add_generated_path(self, current_role: str, target_role: str, steps: List[Dict],
+                           provenance: str, difficulty: float, success_rate: float):
+        """Write an LLM-generated transition plan back as synthetic roles and edges.
+
+        Endpoint roles are matched by title so later graph searches between the
+        same roles find the plan. Intermediate steps get ids derived from the
+        endpoints, so generic step titles from different plans never merge.
+        Everything created here is tagged ``synthetic`` with its ``provenance``.
+        Returns the ids of the roles along the plan, endpoints included.
+        """
+        hops = [(current_role, None)] + [(step.get('title', f"Step {i + 1}"), step) for i, step in enumerate(steps)]
+        if steps and hops[-1][0].lower() == target_role.lower():
+            hops[-1] = (target_role, hops[-1][1])
+        else:
+            hops.append((target_role, None))
+
+        with self.driver.session() as session:
+            role_ids = []
+            for i, (title, step) in enumerate(hops):
+                if i == 0 or i == len(hops) - 1:
+                    record = session.run("""
+                        MERGE (r:Role {title: $title})
+                        ON CREATE SET r.id = $id,
+                                      r.synthetic = true,
+                                      r.provenance = $provenance,
+                                      r.avg_salary = $avg_salary
+                        RETURN r.id as id
+                    """, title=title, id=generated_role_id(current_role, target_role, i), provenance=provenance,
+                        avg_salary=int((step or {}).get('estimated_salary', 0))).single()
+                else:
+                    record = session.run("""
+                        MERGE (r:Role {id: $id})
+                        SET r.title = $title,
+                            r.synthetic = true,
+                            r.provenance = $provenance,
+                            r.avg_salary = $avg_salary
+                        RETURN r.id as id
+                    """, title=title, id=generated_role_id(current_role, target_role, i), provenance=provenance,
+                        avg_salary=int(step.get('estimated_salary', 0))).single()
+                role_ids.append(record['id'])
+
+                for skill_name in (step or {}).get('skills_to_acquire', []):
+                    # In this session, so the whole plan is one write for the graph's cache version
+                    self._merge_skill_requirement(session, role_ids[-1], skill_name.lower().replace(' ', '-'), 3,
+                                                  'high', skill_name=skill_name)
+
+            for i in range(len(role_ids) - 1):
+                step = hops[i + 1][1] or {}
+                session.run("""
+                    MATCH (from:Role {id: $from_id})
+                    MATCH (to:Role {id: $to_id})
+                    MERGE (from)-[t:TRANSITIONS_TO]->(to)
+                    SET t.avg_months = $avg_months,
+                        t.difficulty = $difficulty,
+                        t.success_rate = $success_rate,
+                        t.common_path = false,
+                        t.synthetic = true,
+                        t.provenance = $provenance,
+                        t.generated_at = datetime()
+                """, from_id=role_ids[i], to_id=role_ids[i + 1], avg_months=step.get('duration_months', 12),
+                    difficulty=difficulty, success_rate=success_rate, provenance=provenance)
+
+        self._written()
+        return role_ids
+
     def find_career_paths(self, current_role: str, target_role: Optional[str] = None,
                          max_hops: int = 4) -> List[CareerPath]:
         """Find possible career paths with AI-powered role matching"""
         
         # AI-powered role matching for current role
-        matched_current = self._match_role_with_ai(current_role)
-        if not matched_current:
+        matched_current = self.match_role(current_role)
+        if not matched_current.title:
             print(f"[WARN] Could not match current role '{current_role}' to any database role")
-            # Try direct match as fallback
-            matched_current = current_role
-        else:
-            print(f"[INFO] Matched current role: '{current_role}' -> '{matched_current}'")
-            current_role = matched_current
         
         # AI-powered role matching for target role
+        matched_target = None
         if target_role:
-            matched_target = self._match_role_with_ai(target_role)
-            if not matched_target:
+            matched_target = self.match_role(target_role)
+            if not matched_target.title:
                 print(f"[WARN] Could not match target role '{target_role}' to any database role")
                 # Return empty if target can't be matched
                 return []
-            else:
-                print(f"[INFO] Matched target role: '{target_role}' -> '{matched_target}'")
-                target_role = matched_target
         
+        return self.find_paths_between(
+            matched_current.title or current_role,
+            matched_target.title if matched_target else None,
+            max_hops=max_hops
+        )
+    
+    def find_paths_between(self, current_role: str, target_role: Optional[str] = None,
+                           max_hops: int = 4) -> List[CareerPath]:
+        """Paths between roles already resolved to graph titles"""
         with self.driver.session() as session:
             if target_role:
                 # Find paths to specific target
@@ -114,6 +244,7 @@ class CareerGraphDB:
                     WITH path, relationships(path) as rels, nodes(path) as roles
                     RETURN 
                         [r in roles | r.title] as role_titles,
+                        [r in roles | r.id] as role_ids,
                         [r in roles | r.avg_salary] as role_salaries,
                         reduce(months = 0, rel in rels | months + rel.avg_months) as total_months,
                         reduce(diff = 0, rel in rels | diff + rel.difficulty) / size(rels) as avg_difficulty,
@@ -131,6 +262,7 @@ class CareerGraphDB:
                     WHERE size(roles) >= 2
                     RETURN DISTINCT
                         [r in roles | r.title] as role_titles,
+                        [r in roles | r.id] as role_ids,
                         [r in roles | r.avg_salary] as role_salaries,
                         reduce(months = 0, rel in rels | months + rel.avg_months) as total_months,
                         reduce(diff = 0, rel in rels | diff + rel.difficulty) / size(rels) as avg_difficulty,
@@ -167,6 +299,8 @@ class CareerGraphDB:
                         'step': i + 1,
                         'from_role': from_role,
                         'to_role': to_role,
+                        'from_role_id': record['role_ids'][i],
+                        'to_role_id': record['role_ids'][i + 1],
                         'duration_months': trans_info['avg_months'],
                         'difficulty': trans_info['difficulty'],
                         'success_rate': trans_info['success_rate'],
@@ -187,44 +321,82 @@ class CareerGraphDB:
             
             return paths
     
+    def get_all_transitions(self) -> List[Dict]:
+        """List every TRANSITIONS_TO edge with the skills required by its destination role"""
+        with self.driver.session() as session:
+            result = session.run("""
+                MATCH (from:Role)-[t:TRANSITIONS_TO]->(to:Role)
+                OPTIONAL MATCH (to)-[req:REQUIRES_SKILL]->(s:Skill)
+                WHERE req.importance IN ['high', 'critical']
+                WITH from, to, t, s, req
+                ORDER BY req.proficiency DESC
+                RETURN from.title as from_role, to.title as to_role,
+                       from.id as from_role_id, to.id as to_role_id,
+                       t.avg_months as avg_months, t.difficulty as difficulty,
+                       collect(s.name) as required_skills
+                ORDER BY from_role, to_role
+            """)
+            return [dict(record) for record in result]
+
     def _get_all_roles(self) -> List[str]:
         """Get all role titles from database"""
         with self.driver.session() as session:
             result = session.run("MATCH (r:Role) RETURN r.title as title")
             return [record['title'] for record in result]
     
-    def _match_role_with_ai(self, user_role: str) -> Optional[str]:
+    def match_role_locally(self, user_role: str, available_roles: Optional[List[str]] = None) -> RoleMatch:
+        """Exact or normalized title match, without calling the LLM"""
+        if available_roles is None:
+            available_roles = self._get_all_roles()
+        
+        # First try exact match (case-insensitive) - O(n) but fast
+        user_role_lower = user_role.lower().strip()
+        for role in available_roles:
+            if role.lower() == user_role_lower:
+                print(f"[DEBUG] Exact match found: '{user_role}' -> '{role}'")
+                return RoleMatch(user_role, role, 'exact')
+        
+        # Try partial matches with common patterns
+        user_role_normalized = user_role_lower.replace('-', ' ').replace('_', ' ')
+        for role in available_roles:
+            role_normalized = role.lower().replace('-', ' ').replace('_', ' ')
+            if user_role_normalized == role_normalized:
+                print(f"[DEBUG] Normalized match found: '{user_role}' -> '{role}'")
+                return RoleMatch(user_role, role, 'normalized')
+        
+        return RoleMatch(user_role, None, 'none')
+    
+    def match_role_with_llm(self, user_role: str, available_roles: Optional[List[str]] = None) -> RoleMatch:
+        """LLM match for titles that have no exact or normalized match"""
+        if available_roles is None:
+            available_roles = self._get_all_roles()
+        title = self._match_role_with_ai(user_role, available_roles)
+        return RoleMatch(user_role, title, 'llm' if title else 'none')
+    
+    def match_role(self, user_role: str) -> RoleMatch:
+        """Resolve a user-supplied title to a graph role, falling back to the LLM"""
+        available_roles = self._get_all_roles()
+        if not available_roles:
+            print(f"[DEBUG] No roles found in database")
+            return RoleMatch(user_role, None, 'none')
+        
+        match = self.match_role_locally(user_role, available_roles)
+        if match.title:
+            return match
+        match = self.match_role_with_llm(user_role, available_roles)
+        if match.title:
+            print(f"[INFO] Matched role: '{user_role}' -> '{match.title}'")
+        return match
+    
+    def _match_role_with_ai(self, user_role: str, available_roles: List[str]) -> Optional[str]:
         """Use Gemini to find the best matching role from database - optimized for 10,000+ roles"""
         try:
-            if not self.google_api_key:
-                print(f"[DEBUG] No GOOGLE_API_KEY found, skipping AI matching")
+            if self.llm is None:
+                print(f"[DEBUG] No LLM gateway configured, skipping AI matching")
                 return None
             
-            available_roles = self._get_all_roles()
-            if not available_roles:
-                print(f"[DEBUG] No roles found in database")
-                return None
-            
-            # First try exact match (case-insensitive) - O(n) but fast
-            user_role_lower = user_role.lower().strip()
-            for role in available_roles:
-                if role.lower() == user_role_lower:
-                    print(f"[DEBUG] Exact match found: '{user_role}' -> '{role}'")
-                    return role
-            
-            # Try partial matches with common patterns
-            user_role_normalized = user_role_lower.replace('-', ' ').replace('_', ' ')
-            for role in available_roles:
-                role_normalized = role.lower().replace('-', ' ').replace('_', ' ')
-                if user_role_normalized == role_normalized:
-                    print(f"[DEBUG] Normalized match found: '{user_role}' -> '{role}'")
-                    return role
-            
             print(f"[DEBUG] AI matching '{user_role}' against {len(available_roles)} database roles")
             
-            genai.configure(api_key=self.google_api_key)
-            model = genai.GenerativeModel("gemini-2.0-flash")
-            
             # For large databases (>500 roles), use intelligent filtering
             if len(available_roles) > 500:
                 # Stage 1: Smart pre-filtering using keyword extraction
@@ -233,42 +405,30 @@ class CareerGraphDB:
                 
                 if len(filtered_roles) == 0:
                     # Fallback to chunked search if filtering fails
-                    return self._chunked_ai_search(user_role, available_roles, model)
+                    return self._chunked_ai_search(user_role, available_roles)
                 elif len(filtered_roles) == 1:
                     return filtered_roles[0]
                 
-                roles_to_match = filtered_roles[:100]  # Limit to top 100 for Gemini
+                roles_to_match = filtered_roles
             else:
-                roles_to_match = available_roles
+                # Most relevant roles first so the budget cut drops the unlikely ones
+                ranked = self._intelligent_filter_roles(user_role, available_roles)
+                ranked_set = set(ranked)
+                roles_to_match = ranked + [role for role in available_roles if role not in ranked_set]
             
-            # Stage 2: Gemini matching on filtered set
-            prompt = f"""You are a career matching expert. Match the user's job title to the closest role from this list:
-
-CANDIDATE ROLES ({len(roles_to_match)} total):
-{chr(10).join(f'{i+1}. {role}' for i, role in enumerate(roles_to_match[:100]))}
-
-USER INPUT: "{user_role}"
-
-MATCHING RULES:
-- Match job title variations (SWE=Software Engineer, Dev=Developer, Eng=Engineer)
-- Match seniority levels (Intern, Junior, Mid-Senior, Senior, Lead, Staff, Principal, Manager+)
-- Match specializations (Frontend, Backend, Full Stack, Mobile, Data, ML, DevOps, Cloud, Security)
-- Handle abbreviations (PM=Product Manager, QA=Quality Assurance, BA=Business Analyst)
-- Default vague inputs to mid-level (e.g., "devops" → "DevOps Engineer")
-- Student roles map to appropriate entry positions
-
-OUTPUT FORMAT: Return ONLY the exact role name from the numbered list above. If no match exists, return "NONE"
-
-Examples:
-"SWE intern" → "Software Developer Intern"
-"senior backend dev" → "Senior Backend Developer"
-"data analyst" → "Data Analyst"
-"ML" → "Machine Learning Engineer"
-
-Match:"""
+            # Stage 2: Gemini matching on as many candidates as the prompt budget allows
+            query = f'\nUSER INPUT: "{user_role}"\n\nMatch:'
+            roles_to_match = prompt_budgets['match_role'].fit_items(
+                MATCH_ROLE_INSTRUCTIONS, roles_to_match[:100], render=lambda i, role: f"{i+1}. {role}\n",
+                overhead=f"CANDIDATE ROLES ({len(roles_to_match)} total):\n" + query
+            )
+            prompt = (
+                f"CANDIDATE ROLES ({len(roles_to_match)} total):\n"
+                + "".join(f"{i+1}. {role}\n" for i, role in enumerate(roles_to_match))
+                + query
+            )
             
-            response = model.generate_content(prompt)
-            matched_role = response.text.strip()
+            matched_role = self._generate_text(prompt, prefix=MATCH_ROLE_INSTRUCTIONS)
             
             # Clean up response
             matched_role = matched_role.replace('"', '').replace("'", '').replace('`', '').strip()
@@ -300,6 +460,10 @@ Match:"""
             traceback.print_exc()
             return None
     
+    def _generate_text(self, prompt: str, prefix: str = "") -> str:
+        """Run a role-matching prompt through the shared LLM gateway"""
+        return self.llm.generate_sync(prompt, site="match_role", prefix=prefix)
+    
     def _intelligent_filter_roles(self, user_input: str, all_roles: List[str]) -> List[str]:
         """Pre-filter roles using keyword matching for large datasets"""
         user_input_lower = user_input.lower()
@@ -356,7 +520,7 @@ Match:"""
         # Return top 50 candidates (or all if less than 50 matched)
         return [role for _, role in scored_roles[:50]] if scored_roles else []
     
-    def _chunked_ai_search(self, user_role: str, all_roles: List[str], model) -> Optional[str]:
+    def _chunked_ai_search(self, user_role: str, all_roles: List[str]) -> Optional[str]:
         """Search through roles in chunks for very large databases (10,000+)"""
         print(f"[DEBUG] Starting chunked search for {len(all_roles)} roles")
         
@@ -373,8 +537,7 @@ Match:"""
 Match (exact name only):"""
             
             try:
-                response = model.generate_content(prompt)
-                match = response.text.strip().replace('"', '').replace("'", '').strip()
+                match = self._generate_text(prompt).replace('"', '').replace("'", '').strip()
                 
                 # Clean numbering
                 if '. ' in match and match.split('. ')[0].isdigit():
@@ -396,8 +559,7 @@ Match (exact name only):"""
 Best match (exact name):"""
             
             try:
-                response = model.generate_content(final_prompt)
-                final_match = response.text.strip().replace('"', '').replace("'", '').strip()
+                final_match = self._generate_text(final_prompt).replace('"', '').replace("'", '').strip()
                 
                 if '. ' in final_match and final_match.split('. ')[0].isdigit():
                     final_match = '. '.join(final_match.split('. ')[1:])
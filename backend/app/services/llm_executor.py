@@ -0,0 +1,185 @@
+"""
+Shared execution layer for blocking LLM calls: bounded concurrency,
+token-bucket rate limiting and jittered exponential backoff
+"""
+
+import asyncio
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+from google.api_core import exceptions as google_exceptions
+
+from app.config import settings
+from app.services.metrics import LatencyRecorder
+
+# Provider throttling (429), overload (503) and deadline errors are worth retrying
+RETRYABLE_ERRORS = (
+    google_exceptions.ResourceExhausted,
+    google_exceptions.TooManyRequests,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+    TimeoutError,
+)
+
+class TokenBucket:
+    """Thread-safe token bucket refilled continuously at ``rate_per_minute``"""
+
+    def __init__(self, rate_per_minute: float, burst: int):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def reserve(self) -> float:
+        """Take a token if one is available (0.0), else return the seconds until one will be"""
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate if self.rate > 0 else 1.0
+
+    def acquire(self) -> float:
+        """Block until a token is available; return the time spent waiting"""
+        started = time.monotonic()
+        while True:
+            shortfall = self.reserve()
+            if not shortfall:
+                return time.monotonic() - started
+            time.sleep(shortfall)
+
+    async def acquire_async(self) -> float:
+        """``acquire`` that waits on the event loop instead of blocking a thread"""
+        started = time.monotonic()
+        while True:
+            shortfall = self.reserve()
+            if not shortfall:
+                return time.monotonic() - started
+            await asyncio.sleep(shortfall)
+
+class LLMExecutor:
+    """Runs blocking provider calls on a dedicated thread pool.
+
+    The pool size is the process-wide concurrency limit: callers beyond it
+    queue instead of flooding the default executor. Each call takes a token
+    from the bucket before hitting the provider and is retried with full-jitter
+    exponential backoff on throttling and timeouts. Token waits and backoff
+    happen in the caller, before a pool slot is taken, so a run of 429s
+    doesn't leave every worker sleeping while other calls queue behind it.
+    """
+
+    def __init__(self, max_concurrency: int, rate_per_minute: float, burst: int,
+                 max_retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0):
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.bucket = TokenBucket(rate_per_minute, burst)
+        self._pool = ThreadPoolExecutor(max_workers=max_concurrency, thread_name_prefix="llm")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._counters = {'calls': 0, 'retries': 0, 'failures': 0}
+        self.queue_wait = LatencyRecorder()
+        self.rate_limit_wait = LatencyRecorder()
+        self.call_latency = LatencyRecorder()
+
+    def _backoff(self, attempt: int) -> float:
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Backoff before the next attempt, or None when ``error`` is final"""
+        if not isinstance(error, RETRYABLE_ERRORS) or attempt >= self.max_retries:
+            with self._lock:
+                self._counters['failures'] += 1
+            return None
+        delay = self._backoff(attempt)
+        with self._lock:
+            self._counters['retries'] += 1
+        print(f"[WARN] LLM call failed ({type(error).__name__}), retry {attempt + 1}/{self.max_retries} in {delay:.1f}s")
+        return delay
+
+    def _execute(self, submitted: float, fn: Callable, args, kwargs) -> Any:
+        """One provider attempt on a pool worker"""
+        with self._lock:
+            self._queued -= 1
+            self._running += 1
+        self.queue_wait.observe(time.monotonic() - submitted)
+        try:
+            started = time.monotonic()
+            result = fn(*args, **kwargs)
+            self.call_latency.observe(time.monotonic() - started)
+            return result
+        finally:
+            with self._lock:
+                self._running -= 1
+
+    def _submit(self, fn: Callable, args, kwargs):
+        with self._lock:
+            self._queued += 1
+        return self._pool.submit(self._execute, time.monotonic(), fn, args, kwargs)
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Await a blocking call through the limiter"""
+        with self._lock:
+            self._counters['calls'] += 1
+        attempt = 0
+        while True:
+            self.rate_limit_wait.observe(await self.bucket.acquire_async())
+            try:
+                return await asyncio.wrap_future(self._submit(fn, args, kwargs))
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    def run_sync(self, fn: Callable, *args, **kwargs) -> Any:
+        """Blocking variant for call sites that already run in a worker thread"""
+        with self._lock:
+            self._counters['calls'] += 1
+        attempt = 0
+        while True:
+            self.rate_limit_wait.observe(self.bucket.acquire())
+            try:
+                return self._submit(fn, args, kwargs).result()
+            except Exception as e:
+                delay = self._retry_delay(e, attempt)
+                if delay is None:
+                    raise
+            attempt += 1
+            time.sleep(delay)
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            state = {
+                'max_concurrency': self.max_concurrency,
+                'queue_depth': self._queued,
+                'in_flight': self._running,
+                **self._counters
+            }
+        return {
+            **state,
+            'queue_wait_seconds': self.queue_wait.snapshot(),
+            'rate_limit_wait_seconds': self.rate_limit_wait.snapshot(),
+            'call_latency_seconds': self.call_latency.snapshot()
+        }
+
+llm_executor = LLMExecutor(
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    rate_per_minute=settings.LLM_RATE_LIMIT_PER_MINUTE,
+    burst=settings.LLM_RATE_LIMIT_BURST,
+    max_retries=settings.LLM_MAX_RETRIES,
+    base_delay=settings.LLM_RETRY_BASE_DELAY,
+    max_delay=settings.LLM_RETRY_MAX_DELAY
+)
@@ -0,0 +1,410 @@
+"""
+Single entry point for every LLM call in the process
+"""
+
+import asyncio
+import datetime
+import threading
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, List, Optional, Set
+
+from app.config import settings
+from app.services.llm_executor import LLMExecutor, llm_executor
+from app.services.metrics import LatencyRecorder
+from app.services.single_flight import SingleFlight, llm_flight, make_key
+
+@dataclass
+class LLMResult:
+    text: str
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+
+class StreamInterrupted(RuntimeError):
+    """The provider failed after part of a streamed answer was delivered (not retried)"""
+
+class TokenUsage:
+    """LLM calls made on behalf of one request.
+
+    Calls coalesced onto another request's identical prompt are charged to
+    that request only, so the totals are what this request actually cost.
+    """
+
+    def __init__(self):
+        self.calls = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+        self.sites: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def add(self, site: str, result: LLMResult):
+        with self._lock:
+            self.calls += 1
+            self.prompt_tokens += result.prompt_tokens
+            self.output_tokens += result.output_tokens
+            self.cached_tokens += result.cached_tokens
+            self.sites[site] = self.sites.get(site, 0) + result.prompt_tokens + result.output_tokens
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.output_tokens
+
+    def header(self) -> str:
+        """Value for the ``X-LLM-Usage`` response header"""
+        return (f"calls={self.calls}, prompt={self.prompt_tokens}, output={self.output_tokens}, "
+                f"cached={self.cached_tokens}")
+
+    def to_dict(self) -> Dict:
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'prompt_tokens': self.prompt_tokens,
+                'output_tokens': self.output_tokens,
+                'cached_tokens': self.cached_tokens,
+                'sites': dict(self.sites)
+            }
+
+_request_usage: ContextVar[Optional[TokenUsage]] = ContextVar('llm_request_usage', default=None)
+
+def track_request_usage() -> TokenUsage:
+    """Start attributing LLM calls made from the current context to a fresh TokenUsage"""
+    usage = TokenUsage()
+    _request_usage.set(usage)
+    return usage
+
+class GeminiBackend:
+    """Owns the one long-lived Gemini client for the process.
+
+    A static prompt prefix long enough for Gemini context caching is uploaded
+    once and reused until its TTL runs out; shorter prefixes are sent first in
+    the prompt so implicit prefix caching can still apply. At the default
+    ``LLM_CONTEXT_CACHE_MIN_TOKENS`` no current prefix qualifies (the longest,
+    the cross-industry instructions, is about 1.1k tokens), so everything relies
+    on implicit caching until the threshold is lowered for a model that accepts
+    shorter cached contents.
+    """
+
+    name = "gemini"
+
+    def __init__(self, api_key: str, model_name: str, timeout: float,
+                 cache_min_tokens: int = 4096, cache_ttl: int = 3600):
+        import google.generativeai as genai
+
+        genai.configure(api_key=api_key)
+        self.genai = genai
+        self.model_name = model_name
+        self.model = genai.GenerativeModel(model_name)
+        self.timeout = timeout
+        self.cache_min_tokens = cache_min_tokens
+        self.cache_ttl = cache_ttl
+        # prefix -> (model bound to the cached prefix, expiry); None if caching it failed
+        self._cached_models: Dict[str, Optional[tuple]] = {}
+        # Prefixes whose cached content is being created
+        self._creating: Set[str] = set()
+        self._lock = threading.Lock()
+
+    def _cached_model(self, prefix: str):
+        if len(prefix) // 4 < self.cache_min_tokens:
+            return None
+        with self._lock:
+            entry = self._cached_models.get(prefix, ())
+            if entry is None:
+                return None
+            if entry and entry[1] > time.time():
+                return entry[0]
+            if prefix in self._creating:
+                # Sent inline while another call creates the cache, instead of waiting for it
+                return None
+            self._creating.add(prefix)
+
+        # Created outside the lock, so a slow upload never holds up other calls
+        try:
+            from google.generativeai import caching
+
+            cached = caching.CachedContent.create(
+                model=self.model_name,
+                contents=[prefix],
+                ttl=datetime.timedelta(seconds=self.cache_ttl)
+            )
+            model = self.genai.GenerativeModel.from_cached_content(cached_content=cached)
+            # Refresh a minute early so a call never lands on an expired cache
+            entry = (model, time.time() + self.cache_ttl - 60)
+        except Exception as e:
+            print(f"[WARN] Context caching unavailable for {self.model_name}, sending prefix inline: {e}")
+            model, entry = None, None
+        with self._lock:
+            self._cached_models[prefix] = entry
+            self._creating.discard(prefix)
+        return model
+
+    def _model_and_prompt(self, prompt: str, prefix: str):
+        model = self._cached_model(prefix) if prefix else None
+        if model is not None:
+            return model, prompt
+        return self.model, prefix + prompt
+
+    @staticmethod
+    def _result(text: str, response) -> LLMResult:
+        usage = getattr(response, 'usage_metadata', None)
+        return LLMResult(
+            text=text,
+            prompt_tokens=getattr(usage, 'prompt_token_count', 0) or 0,
+            output_tokens=getattr(usage, 'candidates_token_count', 0) or 0,
+            cached_tokens=getattr(usage, 'cached_content_token_count', 0) or 0
+        )
+
+    def generate(self, prompt: str, site: str, prefix: str = "") -> LLMResult:
+        model, text = self._model_and_prompt(prompt, prefix)
+        response = model.generate_content(text, request_options={'timeout': self.timeout})
+        return self._result(response.text, response)
+
+    def stream(self, prompt: str, site: str, on_chunk: Callable[[str], bool], prefix: str = "") -> LLMResult:
+        """Pass text to ``on_chunk`` as it is generated; stop early when it returns False"""
+        model, text = self._model_and_prompt(prompt, prefix)
+        response = model.generate_content(text, stream=True, request_options={'timeout': self.timeout})
+        parts = []
+        for chunk in response:
+            parts.append(chunk.text)
+            if not on_chunk(chunk.text):
+                break
+        return self._result("".join(parts), response)
+
+class _SiteStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.prompt_chars = 0
+        self.response_chars = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+        self.latency = LatencyRecorder()
+
+    def snapshot(self) -> Dict:
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'prompt_chars': self.prompt_chars,
+            'response_chars': self.response_chars,
+            'prompt_tokens': self.prompt_tokens,
+            'output_tokens': self.output_tokens,
+            'cached_tokens': self.cached_tokens,
+            'latency_seconds': self.latency.snapshot()
+        }
+
+class _SharedStream:
+    """One streamed generation and the buffer its subscribers read from.
+
+    Lives on the event loop: chunks are appended by the backend thread via
+    ``call_soon_threadsafe``, and readers wait on ``changed`` for more.
+    """
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.finished = False
+        self.subscribers = 0
+        self.call: Optional[asyncio.Future] = None
+        # Set when the last subscriber leaves; tells the backend to stop generating
+        self.stopped = threading.Event()
+        self.changed = asyncio.Event()
+
+    def _notify(self):
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def append(self, chunk: str):
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self):
+        self.finished = True
+        self._notify()
+
+class LLMGateway:
+    """Runs prompts through single-flight coalescing and the shared executor.
+
+    ``site`` names the call site (``enrich_step``, ``match_role``, ...) and is
+    used for coalescing keys, per-site metrics and by the fake backend to pick
+    a canned response. ``prefix`` is the static part of the prompt and is sent
+    ahead of ``prompt``; backends may cache it.
+    """
+
+    def __init__(self, backend, executor: LLMExecutor, flight: SingleFlight):
+        self.backend = backend
+        self.executor = executor
+        self.flight = flight
+        self._stats: Dict[str, _SiteStats] = {}
+        self._streams: Dict[str, _SharedStream] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def model_id(self) -> str:
+        """Backend and model answering prompts; part of keys for cached LLM output"""
+        model_name = getattr(self.backend, 'model_name', None)
+        return f"{self.backend.name}/{model_name}" if model_name else self.backend.name
+
+    def _site_stats(self, site: str) -> _SiteStats:
+        with self._lock:
+            return self._stats.setdefault(site, _SiteStats())
+
+    def _record(self, site: str, prompt: str, prefix: str, result: LLMResult,
+                started: float, usage: Optional[TokenUsage]) -> str:
+        stats = self._site_stats(site)
+        stats.latency.observe(time.perf_counter() - started)
+        text = result.text.strip()
+        with self._lock:
+            stats.calls += 1
+            stats.prompt_chars += len(prefix) + len(prompt)
+            stats.response_chars += len(text)
+            stats.prompt_tokens += result.prompt_tokens
+            stats.output_tokens += result.output_tokens
+            stats.cached_tokens += result.cached_tokens
+        if usage is not None:
+            usage.add(site, result)
+        return text
+
+    def _record_error(self, site: str):
+        stats = self._site_stats(site)
+        with self._lock:
+            stats.calls += 1
+            stats.errors += 1
+
+    def _call(self, prompt: str, site: str, prefix: str, usage: Optional[TokenUsage]) -> str:
+        started = time.perf_counter()
+        try:
+            result = self.backend.generate(prompt, site, prefix=prefix)
+        except Exception:
+            self._record_error(site)
+            raise
+        return self._record(site, prompt, prefix, result, started, usage)
+
+    def _stream_call(self, prompt: str, site: str, prefix: str, usage: Optional[TokenUsage],
+                     on_chunk: Callable[[str], bool]) -> str:
+        started = time.perf_counter()
+        delivered = False
+
+        def forward(chunk: str) -> bool:
+            nonlocal delivered
+            delivered = True
+            return on_chunk(chunk)
+
+        try:
+            if hasattr(self.backend, 'stream'):
+                result = self.backend.stream(prompt, site, forward, prefix=prefix)
+            else:
+                result = self.backend.generate(prompt, site, prefix=prefix)
+                forward(result.text)
+        except Exception as e:
+            self._record_error(site)
+            if delivered:
+                # Retrying would replay text the caller already consumed
+                raise StreamInterrupted(f"{site} stream failed after partial output: {e}") from e
+            raise
+        return self._record(site, prompt, prefix, result, started, usage)
+
+    async def generate(self, prompt: str, site: str, prefix: str = "") -> str:
+        """Response text for ``prefix + prompt``, sharing the call with identical in-flight prompts"""
+        usage = _request_usage.get()
+        return await self.flight.do(
+            make_key(site, prefix, prompt),
+            lambda: self.executor.run(self._call, prompt, site, prefix, usage),
+            site=site
+        )
+
+    def generate_sync(self, prompt: str, site: str, prefix: str = "") -> str:
+        """Blocking variant for call sites that already run in a worker thread"""
+        usage = _request_usage.get()
+        return self.flight.do_sync(
+            make_key(site, prefix, prompt),
+            lambda: self.executor.run_sync(self._call, prompt, site, prefix, usage),
+            site=site
+        )
+
+    def _start_stream(self, key: str, prompt: str, site: str, prefix: str) -> _SharedStream:
+        loop = asyncio.get_running_loop()
+        shared = _SharedStream()
+
+        def on_chunk(chunk: str) -> bool:
+            if shared.stopped.is_set():
+                return False
+            loop.call_soon_threadsafe(shared.append, chunk)
+            return True
+
+        def finished(call: asyncio.Future):
+            if self._streams.get(key) is shared:
+                del self._streams[key]
+            # Mark the exception as retrieved even if every subscriber left
+            if not call.cancelled():
+                call.exception()
+            shared.finish()
+
+        shared.call = asyncio.ensure_future(
+            self.executor.run(self._stream_call, prompt, site, prefix, _request_usage.get(), on_chunk)
+        )
+        shared.call.add_done_callback(finished)
+        return shared
+
+    async def stream(self, prompt: str, site: str, prefix: str = "") -> AsyncIterator[str]:
+        """Yield the response text as the backend generates it.
+
+        Identical in-flight streams are coalesced: a later caller replays the
+        text generated so far and then follows the same generation. A caller
+        that stops iterating (or is cancelled) only detaches; the generation is
+        stopped when its last subscriber leaves. A provider error after some
+        text has arrived ends the stream with ``StreamInterrupted``.
+        """
+        key = make_key(site, prefix, prompt)
+        shared = self._streams.get(key)
+        self.flight.record(site, coalesced=shared is not None)
+        if shared is None:
+            shared = self._start_stream(key, prompt, site, prefix)
+            self._streams[key] = shared
+
+        shared.subscribers += 1
+        try:
+            position = 0
+            while True:
+                while position < len(shared.chunks):
+                    position += 1
+                    yield shared.chunks[position - 1]
+                if shared.finished:
+                    break
+                await shared.changed.wait()
+            shared.call.result()
+        finally:
+            shared.subscribers -= 1
+            if shared.subscribers == 0 and not shared.call.done():
+                shared.stopped.set()
+                shared.call.cancel()
+                if self._streams.get(key) is shared:
+                    del self._streams[key]
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            sites = dict(self._stats)
+        return {
+            'backend': self.backend.name,
+            'sites': {site: stats.snapshot() for site, stats in sites.items()}
+        }
+
+def create_backend(backend: Optional[str] = None):
+    """Backend selected by ``LLM_BACKEND``: ``gemini`` (default) or ``fake`` for offline load tests"""
+    backend = backend or settings.LLM_BACKEND
+    if backend == "fake":
+        from app.services.fake_llm import FakeBackend
+
+        return FakeBackend.from_settings()
+    if backend == "gemini":
+        return GeminiBackend(
+            api_key=settings.GOOGLE_API_KEY,
+            model_name=settings.GEMINI_MODEL,
+            timeout=settings.LLM_TIMEOUT_SECONDS,
+            cache_min_tokens=settings.LLM_CONTEXT_CACHE_MIN_TOKENS,
+            cache_ttl=settings.LLM_CONTEXT_CACHE_TTL_SECONDS
+        )
+    raise ValueError(f"Unknown LLM_BACKEND '{backend}'")
+
+llm_gateway = LLMGateway(create_backend(), llm_executor, llm_flight)
@@ -0,0 +1,70 @@
+"""
+In-process latency recorders exported on /metrics
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Dict, Iterable, List
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not samples:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(samples))
+    return samples[min(len(samples), max(rank, 1)) - 1]
+
+def summarize(samples: Iterable[float]) -> Dict:
+    """Count, mean and tail percentiles for a set of samples"""
+    ordered = sorted(samples)
+    count = len(ordered)
+    return {
+        'count': count,
+        'avg': round(sum(ordered) / count, 4) if count else 0.0,
+        'p50': round(percentile(ordered, 50), 4),
+        'p95': round(percentile(ordered, 95), 4),
+        'p99': round(percentile(ordered, 99), 4),
+        'max': round(ordered[-1], 4) if count else 0.0
+    }
+
+class LatencyRecorder:
+    """Keeps the most recent samples so percentiles track current behaviour"""
+
+    def __init__(self, max_samples: int = 2048):
+        self._samples = deque(maxlen=max_samples)
+        self._total = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        with self._lock:
+            self._samples.append(value)
+            self._total += 1
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            samples = list(self._samples)
+            total = self._total
+        return {**summarize(samples), 'total': total}
+
+class StageTimer:
+    """Wall-clock timings of the named stages of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+
+    @contextmanager
+    def stage(self, name: str):
+        stage_started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stages[name] = self.stages.get(name, 0.0) + time.perf_counter() - stage_started
+
+    def server_timing(self) -> str:
+        """Value for the ``Server-Timing`` response header (durations in ms)"""
+        total = time.perf_counter() - self.started
+        entries = [f"{name};dur={seconds * 1000:.1f}" for name, seconds in self.stages.items()]
+        return ", ".join(entries + [f"total;dur={total * 1000:.1f}"])
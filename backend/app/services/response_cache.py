@@ -0,0 +1,125 @@
+"""
+Full-response cache for /api/v1/career-paths
+
+Requests that differ only in how roles are spelled (case, separators,
+spacing) or in skill order, case and duplicates share one entry. Keys also
+carry the graph, embeddings and prompts cache versions
+(app/services/cache_versions.py), the scoring weights version and the LLM
+model, so a change to any of them starts from a cold cache.
+
+Results with neither paths nor a recommendation (typically a role that
+matches nothing) are kept for ``negative_ttl`` only: a client retrying a typo
+does not rerun role matching each time, and a role added to the graph is
+found soon. Results built while something called ``skip_response_cache``
+(a truncated or failed LLM fallback) are served but never stored. Projected
+or paginated views of a response (``variant``) are stored under their own
+keys.
+"""
+
+import json
+import time
+from contextvars import ContextVar
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from app.models.career import CareerPathRequest
+from app.services.cache import RedisCache
+from app.services.cache_versions import CacheVersions
+from app.services.metrics import LatencyRecorder
+from app.services.single_flight import make_key
+from app.utils.canonical import canonical_role, canonical_skills
+
+OUTCOMES = ('hit', 'negative_hit', 'miss', 'bypass')
+
+_skip_reasons: ContextVar[Optional[List[str]]] = ContextVar('response_cache_skip_reasons', default=None)
+
+def skip_response_cache(reason: str):
+    """Keep the response being built in the current context out of the cache"""
+    reasons = _skip_reasons.get()
+    if reasons is not None:
+        reasons.append(reason)
+
+def canonical_request(request: CareerPathRequest) -> Dict[str, Any]:
+    return {
+        'current_role': canonical_role(request.current_role),
+        'target_role': canonical_role(request.target_role) if request.target_role else None,
+        'user_skills': canonical_skills(request.user_skills),
+        'personalize': request.personalize
+    }
+
+def request_digest(request: CareerPathRequest) -> str:
+    return make_key(json.dumps(canonical_request(request), sort_keys=True))
+
+def cache_directives(cache_control: Optional[str]) -> set:
+    """``Cache-Control: no-cache`` skips the lookup; ``no-store`` also skips storing the result"""
+    return {directive.strip().lower() for directive in (cache_control or "").split(",") if directive.strip()}
+
+class ResponseCache:
+    """Looks up and stores career path responses; Redis errors are treated as misses"""
+
+    def __init__(self, cache: RedisCache, versions: CacheVersions, ttl: int, negative_ttl: int, version: str):
+        self.cache = cache
+        self.versions = versions
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        # Scoring weights and model; bumped namespaces are handled by ``versions``
+        self.version = version
+        self.counts = {outcome: 0 for outcome in OUTCOMES}
+        self.counts['not_stored'] = 0
+        self.seconds = {outcome: LatencyRecorder() for outcome in OUTCOMES}
+
+    async def key(self, request: CareerPathRequest, variant: Optional[Dict] = None) -> str:
+        namespace = await self.versions.tag('graph', 'embeddings', 'prompts')
+        digest = request_digest(request)
+        if variant:
+            # Projected or paginated responses are stored apart from the full one
+            digest = make_key(json.dumps([digest, variant], sort_keys=True))
+        return f"career_paths:{namespace}:{self.version}:{digest}"
+
+    async def get_or_build(self, request: CareerPathRequest, build: Callable[[], Awaitable[Dict]],
+                           cache_control: Optional[str] = None, variant: Optional[Dict] = None) -> Tuple[Dict, str]:
+        """``(response, outcome)`` where outcome is one of ``OUTCOMES``"""
+        started = time.perf_counter()
+        directives = cache_directives(cache_control)
+        bypass = bool(directives & {'no-cache', 'no-store'})
+        key = await self.key(request, variant)
+
+        if not bypass:
+            try:
+                cached = await self.cache.get(key)
+            except Exception as e:
+                print(f"[WARN] Response cache read failed: {e}")
+                cached = None
+            if cached is not None:
+                outcome = 'hit' if self._positive(cached) else 'negative_hit'
+                return cached, self._observe(outcome, started)
+
+        reasons: List[str] = []
+        _skip_reasons.set(reasons)
+        result = await build()
+        if reasons:
+            self.counts['not_stored'] += 1
+            print(f"[DEBUG] Career paths response not cached: {', '.join(reasons)}")
+        elif 'no-store' not in directives:
+            try:
+                await self.cache.set(key, result, expire=self.ttl if self._positive(result) else self.negative_ttl)
+            except Exception as e:
+                print(f"[WARN] Response cache write failed: {e}")
+        return result, self._observe('bypass' if bypass else 'miss', started)
+
+    @staticmethod
+    def _positive(result: Dict) -> bool:
+        return bool(result.get('paths') or result.get('recommended_path') or result.get('total_paths'))
+
+    def _observe(self, outcome: str, started: float) -> str:
+        self.counts[outcome] += 1
+        self.seconds[outcome].observe(time.perf_counter() - started)
+        return outcome
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = self.counts['hit'] + self.counts['negative_hit'] + self.counts['miss']
+        return {
+            **self.counts,
+            'hit_rate': round((self.counts['hit'] + self.counts['negative_hit']) / lookups, 4) if lookups else 0.0,
+            # Cached and computed responses have very different latencies, so they are reported apart
+            'seconds': {outcome: recorder.snapshot() for outcome, recorder in self.seconds.items()}
+        }
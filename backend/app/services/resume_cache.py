@@ -0,0 +1,144 @@
+"""
+Content-addressed cache for parsed resumes
+
+Parses are keyed by what was uploaded, never by the filename: first by a hash
+of the file bytes, then by a hash of the normalized extracted text, so the
+same resume exported twice (different PDF metadata, same text) still hits.
+Both keys carry the parser's cache version, so a prompt or model change
+starts from a cold cache instead of serving stale parses; with ``versions``
+they also change when the prompts cache namespace is bumped.
+"""
+
+import hashlib
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from app.core.prompt_budget import compact
+from app.services.cache import RedisCache
+from app.services.cache_versions import CacheVersions
+from app.services.extraction import SpooledUpload
+from app.services.metrics import StageTimer
+from app.services.single_flight import SingleFlight
+
+OUTCOMES = ('bytes_hit', 'text_hit', 'coalesced', 'miss')
+
+def text_hash(text: str) -> str:
+    """Hash of the text the parse prompt would see (whitespace differences do not matter)"""
+    return hashlib.sha256(compact(text).encode("utf-8")).hexdigest()
+
+class ResumeParseCache:
+    """Looks up, shares and stores resume parses.
+
+    Concurrent uploads of the same bytes (or of different files with the same
+    text) wait for one parse. Redis errors are treated as misses; with no
+    ``cache`` (e.g. offline bulk runs) every lookup is a miss.
+    """
+
+    def __init__(self, cache: Optional[RedisCache], parser, extract: Callable[[SpooledUpload], Awaitable[str]], ttl: int,
+                 versions: Optional[CacheVersions] = None):
+        self.cache = cache
+        self.versions = versions
+        self.parser = parser
+        self.extract = extract
+        self.ttl = ttl
+        self.flight = SingleFlight()
+        self.counts = {outcome: 0 for outcome in OUTCOMES}
+
+    def key(self, tier: str, digest: str, namespace: str = "") -> str:
+        return f"resume:{namespace}:{self.parser.cache_version}:{tier}:{digest}"
+
+    async def _namespace(self) -> str:
+        if self.cache is None or self.versions is None:
+            return ""
+        return await self.versions.tag('prompts')
+
+    async def _get(self, key: str) -> Optional[Dict]:
+        if self.cache is None:
+            return None
+        try:
+            return await self.cache.get(key)
+        except Exception as e:
+            print(f"[WARN] Resume cache read failed: {e}")
+            return None
+
+    async def _set(self, *keys: str, value: Dict):
+        if self.cache is None:
+            return
+        try:
+            await self.cache.set_many(dict.fromkeys(keys, value), expire=self.ttl)
+        except Exception as e:
+            print(f"[WARN] Resume cache write failed: {e}")
+
+    async def get_or_parse(self, upload: SpooledUpload,
+                           timer: Optional[StageTimer] = None) -> Tuple[Dict, str]:
+        """``(parsed resume, outcome)`` where outcome is one of ``OUTCOMES``"""
+        timer = timer or StageTimer()
+        with timer.stage("cache"):
+            namespace = await self._namespace()
+            bytes_key = self.key('bytes', upload.digest, namespace)
+            cached = await self._get(bytes_key)
+        if cached is not None:
+            return self._count(cached, 'bytes_hit')
+
+        led = False
+
+        def parse_file():
+            nonlocal led
+            led = True
+            # The flight outlives a cancelled leader and serves coalesced
+            # uploads, so it holds its own reference to the spooled file
+            return self._parse_owned(bytes_key, namespace, upload.retain(), timer)
+
+        parsed, outcome = await self.flight.do(bytes_key, parse_file, site="resume_bytes")
+        return self._count(parsed, outcome if led else 'coalesced')
+
+    async def _parse_owned(self, bytes_key: str, namespace: str, upload: SpooledUpload,
+                           timer: StageTimer) -> Tuple[Dict, str]:
+        try:
+            return await self._parse_file(bytes_key, namespace, upload, timer)
+        finally:
+            upload.cleanup()
+
+    async def _parse_file(self, bytes_key: str, namespace: str, upload: SpooledUpload,
+                          timer: StageTimer) -> Tuple[Dict, str]:
+        with timer.stage("extract"):
+            text = await self.extract(upload)
+
+        text_key = self.key('text', text_hash(text), namespace)
+        with timer.stage("cache"):
+            cached = await self._get(text_key)
+        if cached is not None:
+            await self._set(bytes_key, value=cached)
+            return cached, 'text_hit'
+
+        led = False
+
+        async def parse_text():
+            nonlocal led
+            led = True
+            with timer.stage("llm_parse"):
+                parsed = (await self.parser.parse_resume(text)).dict()
+            with timer.stage("cache"):
+                # Both keys in one round trip
+                await self._set(text_key, bytes_key, value=parsed)
+            return parsed
+
+        parsed = await self.flight.do(text_key, parse_text, site="resume_text")
+        if not led:
+            # The leader parsed a different upload with the same text
+            await self._set(bytes_key, value=parsed)
+        return parsed, 'miss' if led else 'coalesced'
+
+    def _count(self, parsed: Dict, outcome: str) -> Tuple[Dict, str]:
+        self.counts[outcome] += 1
+        return parsed, outcome
+
+    def snapshot(self) -> Dict[str, Any]:
+        lookups = sum(self.counts.values())
+        saved = lookups - self.counts['miss']
+        return {
+            **self.counts,
+            'lookups': lookups,
+            'hit_rate': round((self.counts['bytes_hit'] + self.counts['text_hit']) / lookups, 4) if lookups else 0.0,
+            # Cache hits plus uploads that shared another request's parse
+            'llm_calls_saved_rate': round(saved / lookups, 4) if lookups else 0.0
+        }
@@ -0,0 +1,104 @@
+"""
+Single-flight coalescing for concurrent identical calls
+"""
+
+import asyncio
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+def make_key(*parts: Any) -> str:
+    """Build a stable key from the parts that make two calls identical"""
+    digest = hashlib.sha256("\x1f".join(str(p) for p in parts).encode("utf-8"))
+    return digest.hexdigest()
+
+class _SyncCall:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+class SingleFlight:
+    """Share one in-flight call between concurrent callers with the same key.
+
+    Async callers share an ``asyncio.Task``; sync callers (running in worker
+    threads) share a ``threading.Event``. Results are never cached: once the
+    call finishes, the next caller with the same key starts a fresh one.
+    """
+
+    def __init__(self):
+        self._tasks: Dict[str, asyncio.Task] = {}
+        self._sync_calls: Dict[str, _SyncCall] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Dict[str, int]] = {}
+
+    def record(self, site: str, coalesced: bool):
+        """Count one call at ``site``, e.g. for callers that coalesce on their own"""
+        with self._lock:
+            stats = self._stats.setdefault(site, {'calls': 0, 'executed': 0, 'coalesced': 0})
+            stats['calls'] += 1
+            stats['coalesced' if coalesced else 'executed'] += 1
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], site: str = "default") -> Any:
+        """Run ``fn`` once for all concurrent awaiters of ``key``"""
+        task = self._tasks.get(key)
+        if task is not None and not task.done():
+            self.record(site, coalesced=True)
+            return await asyncio.shield(task)
+
+        self.record(site, coalesced=False)
+        task = asyncio.ensure_future(fn())
+        self._tasks[key] = task
+
+        def _cleanup(t: asyncio.Task):
+            if self._tasks.get(key) is t:
+                del self._tasks[key]
+            # Mark the exception as retrieved even if every awaiter was cancelled
+            if not t.cancelled():
+                t.exception()
+
+        task.add_done_callback(_cleanup)
+        # Shield so one cancelled caller does not cancel the call for the others
+        return await asyncio.shield(task)
+
+    def do_sync(self, key: str, fn: Callable[[], Any], site: str = "default") -> Any:
+        """Thread-safe variant of ``do`` for blocking call sites"""
+        with self._lock:
+            call = self._sync_calls.get(key)
+            leader = call is None
+            if leader:
+                call = _SyncCall()
+                self._sync_calls[key] = call
+        self.record(site, coalesced=not leader)
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._sync_calls[key]
+            call.done.set()
+        return call.result
+
+    def snapshot(self) -> Dict:
+        """Coalescing counters per call site"""
+        with self._lock:
+            sites = {site: dict(stats) for site, stats in self._stats.items()}
+            in_flight = len(self._sync_calls)
+        in_flight += sum(1 for t in self._tasks.values() if not t.done())
+        return {
+            'in_flight': in_flight,
+            'coalesced_total': sum(s['coalesced'] for s in sites.values()),
+            'sites': sites
+        }
+
+# Shared by every Gemini call site in the process
+llm_flight = SingleFlight()
@@ -4,9 +4,12 @@ Vector database for semantic skill matching using Pinecone
 
 import pinecone
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict
+from typing import List, Dict, Optional
 import numpy as np
 
+# Part of the embeddings cache namespace, so changing it invalidates results computed with the old model
+EMBEDDING_MODEL = 'all-MiniLM-L6-v2'
+
 class SkillVectorDB:
     def __init__(self, pinecone_api_key: str, index_name: str = "career-skills"):
         # Initialize Pinecone
@@ -27,7 +30,7 @@ class SkillVectorDB:
         self.index = pinecone.Index(index_name)
         
         # Load sentence transformer model
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+        self.model = SentenceTransformer(EMBEDDING_MODEL)
     
     def add_skills(self, skills: List[Dict]):
         """Add skills to vector database
@@ -77,9 +80,17 @@ class SkillVectorDB:
         
         return similar_skills
     
+    def encode_skills(self, skills: List[str]) -> np.ndarray:
+        """Embeddings for a user's skills, computed once per request"""
+        return self.model.encode(skills)
+    
     def match_user_skills_to_role(self, user_skills: List[str], 
-                                   role_required_skills: List[str]) -> Dict:
-        """Match user skills against role requirements"""
+                                   role_required_skills: List[str],
+                                   user_embeddings: Optional[np.ndarray] = None) -> Dict:
+        """Match user skills against role requirements
+        
+        ``user_embeddings`` are the precomputed ``encode_skills(user_skills)``.
+        """
         
         if not role_required_skills:
             return {
@@ -95,12 +106,14 @@ class SkillVectorDB:
                 'missing_skills': role_required_skills
             }
 
+        if user_embeddings is None:
+            user_embeddings = self.encode_skills(user_skills)
+        
         matched_skills = []
         missing_skills = []
         
         for required_skill in role_required_skills:
             # Find if user has similar skill
-            user_embeddings = self.model.encode(user_skills)
             required_embedding = self.model.encode(required_skill)
             
             # Calculate cosine similarities
@@ -0,0 +1,20 @@
+"""
+Canonical forms of user input, used to build cache keys
+"""
+
+import hashlib
+import re
+from typing import Iterable, List
+
+def canonical_role(role: str) -> str:
+    """'  Senior_Backend-Dev ' -> 'senior backend dev'"""
+    return re.sub(r"\s+", " ", role.lower().replace('-', ' ').replace('_', ' ')).strip()
+
+def canonical_skills(skills: Iterable[str]) -> List[str]:
+    """Lowercased, deduplicated and sorted, so order and case do not matter"""
+    return sorted({re.sub(r"\s+", " ", skill.lower()).strip() for skill in skills if skill and skill.strip()})
+
+def skill_bucket(skills: Iterable[str], limit: int = 10) -> str:
+    """Short hash of the skills a prompt actually sees (the first ``limit`` the user listed)"""
+    bucket = canonical_skills(list(skills)[:limit])
+    return hashlib.sha256("|".join(bucket).encode("utf-8")).hexdigest()[:16]
@@ -0,0 +1,198 @@
+"""
+Incremental JSON parsing for streamed LLM output
+
+Model answers arrive as text chunks, usually wrapped in a ```json fence and
+sometimes cut short or containing a stray character. ``JSONStreamParser``
+reports array elements and object members as soon as they are complete, and
+``recover_json`` salvages everything up to the first defect instead of
+dropping the whole answer.
+"""
+
+import json
+from typing import Any, List, Optional, Sequence, Tuple
+
+Path = Tuple[Any, ...]
+
+class _Frame:
+    __slots__ = ('kind', 'key', 'index', 'state', 'start', 'in_array')
+
+    def __init__(self, kind: str, in_array: bool):
+        self.kind = kind  # '{' or '['
+        self.in_array = in_array
+        self.key: Optional[str] = None
+        self.index = 0
+        self.state = 'key' if kind == '{' else 'value'
+        self.start = 0
+
+    @property
+    def child(self):
+        return self.key if self.kind == '{' else self.index
+
+_CLOSERS = {'{': '}', '[': ']'}
+
+class JSONStreamParser:
+    """Feed text chunks; get back ``(path, value)`` for each completed value matching ``paths``.
+
+    A path is a tuple of object keys and ``'*'`` wildcards, e.g.
+    ``('transition_steps', '*')`` for every step of a plan or ``('*',)`` for every
+    member of the top-level object. Text before the first ``{``/``[`` (code
+    fences, prose) and after the top-level value is ignored.
+    """
+
+    def __init__(self, paths: Sequence[Path] = ()):
+        self.paths = [tuple(p) for p in paths]
+        self.text = ""
+        self.done = False
+        self._pos = 0
+        self._root: Optional[int] = None
+        self._frames: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._scalar = False
+        # Open containers that are themselves array elements; cutting inside one would
+        # leave a half-filled record, so salvage only cuts where there are none
+        self._open_elements = 0
+        # (cut position, open containers) where closing the containers yields valid JSON
+        self._safe_cuts: List[Tuple[int, str]] = []
+
+    def _matches(self, path: Path) -> bool:
+        return any(len(p) == len(path) and all(a == '*' or a == b for a, b in zip(p, path))
+                   for p in self.paths)
+
+    def _open_kinds(self) -> str:
+        return "".join(frame.kind for frame in self._frames)
+
+    def _begin_value(self, i: int):
+        if self._frames:
+            self._frames[-1].start = i
+            self._frames[-1].state = 'inside'
+        else:
+            self._root = i
+
+    def _complete_value(self, end: int, found: List[Tuple[Path, Any]]):
+        if not self._frames:
+            self.done = True
+            return
+        frame = self._frames[-1]
+        frame.state = 'after'
+        if not self._open_elements:
+            self._safe_cuts.append((end, self._open_kinds()))
+        path = tuple(f.child for f in self._frames)
+        if self._matches(path):
+            try:
+                found.append((path, json.loads(self.text[frame.start:end])))
+            except ValueError:
+                pass
+
+    def feed(self, chunk: str) -> List[Tuple[Path, Any]]:
+        found: List[Tuple[Path, Any]] = []
+        self.text += chunk
+        text = self.text
+        i = self._pos
+        while i < len(text) and not self.done:
+            c = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == '\\':
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+                    frame = self._frames[-1] if self._frames else None
+                    if frame is not None and frame.state == 'key':
+                        try:
+                            frame.key = json.loads(text[self._string_start:i + 1])
+                        except ValueError:
+                            frame.key = text[self._string_start + 1:i]
+                        frame.state = 'colon'
+                    else:
+                        self._complete_value(i + 1, found)
+                i += 1
+                continue
+
+            if self._root is None and c not in '{[':
+                i += 1
+                continue
+
+            if self._scalar:
+                if c in ',]}' or c.isspace():
+                    self._scalar = False
+                    self._complete_value(i, found)
+                    if self.done:
+                        break
+                else:
+                    i += 1
+                    continue
+
+            if c == '"':
+                self._in_string = True
+                self._string_start = i
+                if not self._frames or self._frames[-1].state != 'key':
+                    self._begin_value(i)
+            elif c in '{[':
+                self._begin_value(i)
+                in_array = bool(self._frames) and self._frames[-1].kind == '['
+                self._frames.append(_Frame(c, in_array))
+                if in_array:
+                    self._open_elements += 1
+                elif not self._open_elements:
+                    self._safe_cuts.append((i + 1, self._open_kinds()))
+            elif c in '}]':
+                if self._frames and self._frames.pop().in_array:
+                    self._open_elements -= 1
+                self._complete_value(i + 1, found)
+            elif c == ':':
+                if self._frames:
+                    self._frames[-1].state = 'value'
+            elif c == ',':
+                if self._frames:
+                    frame = self._frames[-1]
+                    if frame.kind == '[':
+                        frame.index += 1
+                        frame.state = 'value'
+                    else:
+                        frame.state = 'key'
+            elif not c.isspace():
+                self._begin_value(i)
+                self._scalar = True
+            i += 1
+        self._pos = i
+        return found
+
+    def result(self) -> Tuple[Optional[Any], bool]:
+        """``(value, complete)`` for everything fed so far; see ``recover_json``"""
+        if self._root is None:
+            return None, False
+        if self.done:
+            try:
+                return json.loads(self.text[self._root:self._pos]), True
+            except ValueError:
+                pass
+        return self._salvage(), False
+
+    def _salvage(self) -> Optional[Any]:
+        """Longest valid prefix closed off. Cuts are only valid up to the first defect,
+        so binary search for the last one that parses."""
+        candidates = self._safe_cuts
+        best = None
+        lo, hi = 0, len(candidates) - 1
+        while lo <= hi:
+            mid = (lo + hi) // 2
+            cut, kinds = candidates[mid]
+            body = self.text[self._root:cut].rstrip().rstrip(',')
+            try:
+                best = json.loads(body + "".join(_CLOSERS[k] for k in reversed(kinds)))
+                lo = mid + 1
+            except ValueError:
+                hi = mid - 1
+        return best
+
+def recover_json(text: str) -> Tuple[Optional[Any], bool]:
+    """Parse an LLM answer, salvaging the valid prefix of truncated or damaged JSON.
+
+    Returns ``(value, complete)``; ``value`` is None when nothing usable was found.
+    """
+    parser = JSONStreamParser()
+    parser.feed(text)
+    return parser.result()
@@ -1,22 +1,119 @@
+"""
+Resume text extraction
+
+The format is sniffed from the file's leading bytes rather than trusted from
+the filename. PDF pages are extracted with PyPDF2 and joined once; pages that
+yield no text (scanned or oddly encoded) are retried with pdfplumber. Résumés
+rarely need more than a few pages, so extraction stops after ``max_pages``
+pages or ``max_chars`` characters.
+"""
+
 import PyPDF2
 import docx
 import io
+from typing import Dict, List, Optional
+
+SNIFF_BYTES = 1024
 
-def extract_text(file_bytes: bytes, filename: str) -> str:
-    """Extract text from PDF or DOCX"""
-    if filename.endswith('.pdf'):
-        return _extract_from_pdf(file_bytes)
-    elif filename.endswith('.docx'):
-        return _extract_from_docx(file_bytes)
+def sniff_format(head: bytes, filename: str = "") -> str:
+    """'pdf', 'docx' or 'text' from the first bytes of the file, falling back to the extension"""
+    # Some generators put junk before the header; readers accept it within the first 1 KB
+    if b"%PDF-" in head[:SNIFF_BYTES]:
+        return 'pdf'
+    if head.startswith(b"PK\x03\x04"):
+        return 'docx'
+    name = filename.lower()
+    if name.endswith('.pdf'):
+        return 'pdf'
+    if name.endswith('.docx'):
+        return 'docx'
+    return 'text'
+
+def needs_worker(head: bytes, filename: str = "") -> bool:
+    """PDF and DOCX parsing is CPU-bound; plain text is just decoded"""
+    return sniff_format(head, filename) != 'text'
+
+def extract_text(file_bytes: bytes, filename: str = "", max_pages: Optional[int] = None,
+                 max_chars: Optional[int] = None) -> str:
+    """Extract text from PDF, DOCX or plain text"""
+    kind = sniff_format(file_bytes[:SNIFF_BYTES], filename)
+    if kind == 'pdf':
+        return join_pages(extract_pdf_pages(file_bytes, max_pages, max_chars), max_chars)
+    elif kind == 'docx':
+        text = _extract_from_docx(file_bytes)
     else:
-        return file_bytes.decode('utf-8')
-
-def _extract_from_pdf(file_bytes: bytes) -> str:
-    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
-    text = ""
-    for page in pdf_reader.pages:
-        text += page.extract_text()
-    return text
+        text = file_bytes.decode('utf-8')
+    return text[:max_chars] if max_chars else text
+
+def extract_pdf_pages(file_bytes: bytes, max_pages: Optional[int] = None, max_chars: Optional[int] = None,
+                      part: int = 0, parts: int = 1) -> Dict[int, str]:
+    """Page number -> text for pages ``part``, ``part + parts``, ... of the first ``max_pages``.
+
+    Splitting by stride lets ``parts`` workers share a document; each stops
+    once its own pages reach ``max_chars``.
+    """
+    reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
+    total = page_limit(reader, max_pages)
+    pages: Dict[int, str] = {}
+    empty: List[int] = []
+    collected = 0
+    for number in range(part, total, parts):
+        try:
+            text = reader.pages[number].extract_text() or ""
+        except Exception as e:
+            print(f"[WARN] PyPDF2 failed on page {number + 1}: {e}")
+            text = ""
+        if not text.strip():
+            empty.append(number)
+        pages[number] = text
+        collected += len(text)
+        if max_chars and collected >= max_chars:
+            break
+    if empty:
+        _fill_with_pdfplumber(file_bytes, pages, empty)
+    return pages
+
+def page_limit(reader: PyPDF2.PdfReader, max_pages: Optional[int] = None) -> int:
+    return len(reader.pages) if max_pages is None else min(max_pages, len(reader.pages))
+
+def count_pdf_pages(file_bytes: bytes, max_pages: Optional[int] = None) -> int:
+    return page_limit(PyPDF2.PdfReader(io.BytesIO(file_bytes)), max_pages)
+
+def first_gap(pages: Dict[int, str], page_count: int, max_chars: Optional[int] = None) -> Optional[int]:
+    """First page ``join_pages`` would still need but ``pages`` lacks, if any"""
+    collected = 0
+    for number in range(page_count):
+        if max_chars and collected >= max_chars:
+            return None
+        if number not in pages:
+            return number
+        collected += len(pages[number]) + 1
+    return None
+
+def join_pages(pages: Dict[int, str], max_chars: Optional[int] = None) -> str:
+    """Leading run of pages joined once, cut at ``max_chars``"""
+    texts: List[str] = []
+    collected = 0
+    number = 0
+    while number in pages and not (max_chars and collected >= max_chars):
+        texts.append(pages[number])
+        collected += len(pages[number]) + 1
+        number += 1
+    text = "\n".join(texts)
+    return text[:max_chars] if max_chars else text
+
+def _fill_with_pdfplumber(file_bytes: bytes, pages: Dict[int, str], empty: List[int]):
+    """Second opinion for the pages PyPDF2 returned nothing for"""
+    try:
+        import pdfplumber
+    except ImportError:
+        return
+    try:
+        with pdfplumber.open(io.BytesIO(file_bytes)) as pdf:
+            for number in empty:
+                pages[number] = pdf.pages[number].extract_text() or ""
+    except Exception as e:
+        print(f"[WARN] pdfplumber fallback failed: {e}")
 
 def _extract_from_docx(file_bytes: bytes) -> str:
     doc = docx.Document(io.BytesIO(file_bytes))
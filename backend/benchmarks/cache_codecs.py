@@ -0,0 +1,113 @@
+"""
+Stored size and encode/decode time of cache codecs on career-path responses
+
+Collects responses from /api/v1/career-paths (the app wired to stand-ins, with
+personalized enrichment so transitions carry resources) and runs each through
+every available codec/compression combination of app/services/codecs.py.
+
+    python benchmarks/cache_codecs.py --repeat 50
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+# Add backend directory to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services import codecs
+from app.services.codecs import ValueSerializer
+from app.services.metrics import summarize
+from benchmarks.standins import CROSS_LINKS, TRACKS, TRACK_SKILLS, create_app
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+CROSS_INDUSTRY_TARGETS = ['Chef', 'Airline Pilot', 'Marine Biologist', 'Architect']
+
+async def collect_responses(limit: int) -> List[Dict]:
+    requests = []
+    for track, ladder in TRACKS.items():
+        for i in range(len(ladder)):
+            for j in range(i + 1, len(ladder)):
+                requests.append((ladder[i], ladder[j], TRACK_SKILLS[track]))
+        requests += [(ladder[0], target, TRACK_SKILLS[track][:2]) for target in CROSS_INDUSTRY_TARGETS]
+    requests += [(current, target, ['Python', 'SQL']) for current, target in CROSS_LINKS]
+
+    responses = []
+    transport = httpx.ASGITransport(app=create_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        for current_role, target_role, skills in requests[:limit]:
+            response = await client.post("/api/v1/career-paths", json={
+                'current_role': current_role, 'target_role': target_role, 'user_skills': skills, 'personalize': True
+            })
+            if response.status_code == 200:
+                responses.append(response.json())
+    return responses
+
+def available_serializers() -> List[ValueSerializer]:
+    serializers = []
+    for codec, make_codec in codecs.CODECS.items():
+        for compression in [None] + list(codecs.COMPRESSIONS):
+            try:
+                make_codec()
+                if compression:
+                    codecs.COMPRESSIONS[compression]()
+            except ImportError:
+                continue
+            serializers.append(ValueSerializer(codec, compression, compress_min_bytes=1024))
+    return serializers
+
+def measure(serializer: ValueSerializer, values: List[Dict], repeat: int) -> Dict:
+    encode, decode, stored = [], [], []
+    for value in values:
+        blob = serializer.dumps(value)
+        stored.append(len(blob))
+        for _ in range(repeat):
+            started = time.perf_counter()
+            serializer.dumps(value)
+            encode.append((time.perf_counter() - started) * 1e6)
+            started = time.perf_counter()
+            serializer.loads(blob)
+            decode.append((time.perf_counter() - started) * 1e6)
+    return {
+        'stored_bytes': summarize(stored),
+        'stored_bytes_total': sum(stored),
+        'encode_microseconds': summarize(encode),
+        'decode_microseconds': summarize(decode)
+    }
+
+def main(args) -> Dict:
+    values = asyncio.run(collect_responses(args.limit))
+    json_bytes = [len(json.dumps(value).encode("utf-8")) for value in values]
+    print(f"{len(values)} career-path responses, json.dumps size p50={summarize(json_bytes)['p50']:.0f}B "
+          f"max={max(json_bytes)}B total={sum(json_bytes)}B")
+
+    results = {}
+    for serializer in available_serializers():
+        result = measure(serializer, values, args.repeat)
+        result['size_vs_json'] = round(result['stored_bytes_total'] / sum(json_bytes), 4)
+        results[serializer.name] = result
+        print(f"  {serializer.name:<16} stored={result['stored_bytes_total']:>9}B ({result['size_vs_json']:.2f}x)  "
+              f"encode p50={result['encode_microseconds']['p50']:7.1f}us  "
+              f"decode p50={result['decode_microseconds']['p50']:7.1f}us")
+    return {'responses': len(values), 'json_bytes_total': sum(json_bytes), 'serializers': results}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare cache codecs on career-path responses")
+    parser.add_argument("--limit", type=int, default=200, help="Career-path responses to collect")
+    parser.add_argument("--repeat", type=int, default=20, help="Encode/decode passes per response")
+    parser.add_argument("--output", help="Where to write the JSON report (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    report = main(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"cache-codecs-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
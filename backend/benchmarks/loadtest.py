@@ -0,0 +1,195 @@
+"""
+End-to-end load test for the resume and career-path endpoints
+
+Runs in-process against the app wired to local stand-ins (see standins.py) or,
+with --url, against a running server. Reports per-scenario and per-stage
+latency percentiles at each concurrency level and writes them to JSON.
+
+    python benchmarks/loadtest.py --concurrency 1,8,32 --requests 200
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+# Add backend directory to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.metrics import summarize
+from benchmarks.standins import CROSS_LINKS, TRACKS, TRACK_SKILLS, create_app, sample_resume
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+# Targets outside the graph, served by the cross-industry fallback
+CROSS_INDUSTRY_TARGETS = ['Chef', 'Airline Pilot', 'Marine Biologist', 'Architect']
+
+def parse_server_timing(header: str) -> Dict[str, float]:
+    """'llm_parse;dur=12.3, total;dur=15.0' -> {'llm_parse': 0.0123, 'total': 0.015}"""
+    stages = {}
+    for part in header.split(','):
+        name, _, params = part.strip().partition(';')
+        if params.startswith('dur='):
+            stages[name] = float(params[4:]) / 1000
+    return stages
+
+class Workload:
+    """Seeded request generator; the same seed replays the same request mix"""
+
+    def __init__(self, seed: int, parse_weight: float, cross_industry_ratio: float, distinct_resumes: int):
+        self.random = random.Random(seed)
+        self.parse_weight = parse_weight
+        self.cross_industry_ratio = cross_industry_ratio
+        self.distinct_resumes = distinct_resumes
+        self.pairs = [
+            (ladder[i], ladder[j]) for ladder in TRACKS.values()
+            for i in range(len(ladder)) for j in range(i + 1, len(ladder))
+        ] + CROSS_LINKS
+
+    def next(self) -> Dict:
+        if self.random.random() < self.parse_weight:
+            index = self.random.randrange(self.distinct_resumes)
+            return {
+                'scenario': 'resume_parse',
+                'method': 'POST',
+                'path': '/api/v1/resume/parse',
+                'files': {'file': (f"resume_{index}.txt", sample_resume(index).encode(), 'text/plain')}
+            }
+
+        track = self.random.choice(list(TRACKS))
+        skills = TRACK_SKILLS[track][:self.random.randint(1, len(TRACK_SKILLS[track]))]
+        if self.random.random() < self.cross_industry_ratio:
+            scenario = 'career_paths_cross_industry'
+            current_role = self.random.choice(TRACKS[track])
+            target_role = self.random.choice(CROSS_INDUSTRY_TARGETS)
+        else:
+            scenario = 'career_paths'
+            current_role, target_role = self.random.choice(self.pairs)
+        return {
+            'scenario': scenario,
+            'method': 'POST',
+            'path': '/api/v1/career-paths',
+            'json': {'current_role': current_role, 'target_role': target_role, 'user_skills': skills}
+        }
+
+async def run_level(client: httpx.AsyncClient, workload: Workload, concurrency: int,
+                    total_requests: int, duration: Optional[float]) -> Dict:
+    """Closed loop: ``concurrency`` workers issue requests back to back"""
+    samples: Dict[str, Dict[str, List[float]]] = {}
+    errors: Dict[str, int] = {}
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+
+    async def worker():
+        nonlocal issued
+        while (deadline is None and issued < total_requests) or (deadline and time.perf_counter() < deadline):
+            issued += 1
+            spec = workload.next()
+            scenario = spec.pop('scenario')
+            started = time.perf_counter()
+            try:
+                response = await client.request(spec.pop('method'), spec.pop('path'), **spec)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                response, ok = None, False
+            latency = time.perf_counter() - started
+            # Responses served from the response cache are reported apart from computed ones
+            if ok and response.headers.get('x-response-cache', '').endswith('hit'):
+                scenario += ':cached'
+            stats = samples.setdefault(scenario, {'latency': []})
+            stats['latency'].append(latency)
+
+            if not ok:
+                errors[scenario] = errors.get(scenario, 0) + 1
+                continue
+            for stage, seconds in parse_server_timing(response.headers.get('server-timing', '')).items():
+                stats.setdefault(stage, []).append(seconds)
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    completed = sum(len(stats['latency']) for stats in samples.values())
+    return {
+        'concurrency': concurrency,
+        'requests': completed,
+        'elapsed_seconds': round(elapsed, 3),
+        'throughput_rps': round(completed / elapsed, 2) if elapsed else 0.0,
+        'errors': errors,
+        'scenarios': {
+            scenario: {
+                'latency_seconds': summarize(stats.pop('latency')),
+                'stages_seconds': {stage: summarize(values) for stage, values in sorted(stats.items())}
+            }
+            for scenario, stats in sorted(samples.items())
+        }
+    }
+
+def print_level(result: Dict):
+    print(f"\nconcurrency={result['concurrency']}  requests={result['requests']}  "
+          f"throughput={result['throughput_rps']} req/s  errors={sum(result['errors'].values())}")
+    for scenario, stats in result['scenarios'].items():
+        latency = stats['latency_seconds']
+        print(f"  {scenario:<30} n={latency['count']:<5} p50={latency['p50'] * 1000:8.1f}ms "
+              f"p95={latency['p95'] * 1000:8.1f}ms p99={latency['p99'] * 1000:8.1f}ms")
+        for stage, summary in stats['stages_seconds'].items():
+            print(f"    {stage:<28} p50={summary['p50'] * 1000:8.1f}ms p95={summary['p95'] * 1000:8.1f}ms")
+
+async def main(args) -> Dict:
+    if args.url:
+        transport = None
+        base_url = args.url
+    else:
+        app = create_app(llm_latency_ms=args.llm_latency_ms, redis_url=args.redis_url)
+        transport = httpx.ASGITransport(app=app)
+        base_url = 'http://loadtest'
+
+    report = {
+        'target': args.url or 'in-process stand-ins',
+        'llm_latency_ms': None if args.url else args.llm_latency_ms,
+        'seed': args.seed,
+        'levels': []
+    }
+    async with httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout) as client:
+        for concurrency in args.concurrency:
+            workload = Workload(args.seed, args.parse_weight, args.cross_industry_ratio, args.distinct_resumes)
+            result = await run_level(client, workload, concurrency, args.requests, args.duration)
+            print_level(result)
+            report['levels'].append(result)
+        try:
+            report['metrics'] = (await client.get('/metrics')).json()
+        except (httpx.HTTPError, ValueError):
+            report['metrics'] = None
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the resume and career-path endpoints")
+    parser.add_argument("--url", help="Base URL of a running server (default: in-process app with stand-ins)")
+    parser.add_argument("--concurrency", type=lambda s: [int(c) for c in s.split(',')], default=[1, 8, 32],
+                        help="Comma-separated concurrency levels")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per concurrency level")
+    parser.add_argument("--duration", type=float, help="Seconds per level (overrides --requests)")
+    parser.add_argument("--parse-weight", type=float, default=0.3, help="Fraction of resume uploads")
+    parser.add_argument("--cross-industry-ratio", type=float, default=0.2,
+                        help="Fraction of career-path requests that leave the graph")
+    parser.add_argument("--distinct-resumes", type=int, default=50, help="Size of the resume pool (repeats hit the cache)")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="Fake LLM latency (in-process only)")
+    parser.add_argument("--redis-url", help="Use a real local Redis instead of fakeredis (in-process only)")
+    parser.add_argument("--timeout", type=float, default=120.0, help="Per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Where to write the JSON report (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+
+    output = args.output or os.path.join(RESULTS_DIR, f"loadtest-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
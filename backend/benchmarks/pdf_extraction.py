@@ -0,0 +1,179 @@
+"""
+Benchmark resume text extraction over a corpus of PDFs
+
+Compares the old extractor (one PyPDF2 pass over every page, concatenating
+with +=) with the current engine, sequentially and with its pages split
+across the extraction process pool. Point --corpus at a directory of
+real-world PDFs; without one a synthetic corpus is generated so the script
+still runs, but its numbers say little about real documents.
+
+    python benchmarks/pdf_extraction.py --corpus ~/resumes --workers 1,2,4
+"""
+
+import argparse
+import asyncio
+import glob
+import io
+import json
+import os
+import random
+import sys
+import time
+from typing import Dict, List, Tuple
+
+import PyPDF2
+
+# Add backend directory to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.services.extraction import DocumentExtractor, SpooledUpload
+from app.services.metrics import summarize
+from app.utils.pdf_parser import extract_text
+
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+WORDS = ("python kubernetes led team of engineers shipped platform reduced latency by percent "
+         "managed stakeholders designed architecture mentored developers built pipelines").split()
+
+def synthetic_pdf(pages: List[str]) -> bytes:
+    """Minimal PDF with one Helvetica text block per page"""
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None,
+               "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for text in pages:
+        lines = [line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)') for line in text.split('\n')]
+        stream = "BT /F1 10 Tf 12 TL 40 760 Td " + " ".join(f"({line}) Tj T*" for line in lines) + " ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    for offset in offsets:
+        out.write(f"{offset:010d} 00000 n \n".encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    return out.getvalue()
+
+def synthetic_corpus(count: int, seed: int = 0) -> List[Tuple[str, bytes]]:
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        pages = [
+            "\n".join(" ".join(rng.choice(WORDS) for _ in range(12)) for _ in range(50))
+            for _ in range(rng.choice([1, 2, 2, 3, 5, 12, 40]))
+        ]
+        corpus.append((f"synthetic_{i}.pdf", synthetic_pdf(pages)))
+    return corpus
+
+def load_corpus(directory: str) -> List[Tuple[str, bytes]]:
+    corpus = []
+    for path in sorted(glob.glob(os.path.join(directory, '**', '*'), recursive=True)):
+        if path.lower().endswith('.pdf'):
+            with open(path, 'rb') as f:
+                corpus.append((os.path.relpath(path, directory), f.read()))
+    return corpus
+
+def legacy_extract(file_bytes: bytes) -> str:
+    """Extraction as it was before the engine: every page, one string grown with +="""
+    pdf_reader = PyPDF2.PdfReader(io.BytesIO(file_bytes))
+    text = ""
+    for page in pdf_reader.pages:
+        text += page.extract_text()
+    return text
+
+def time_sync(corpus, extract) -> Dict:
+    durations, chars, failures = [], 0, 0
+    for _, data in corpus:
+        started = time.perf_counter()
+        try:
+            chars += len(extract(data))
+        except Exception:
+            failures += 1
+        durations.append(time.perf_counter() - started)
+    return {'seconds': summarize(durations), 'total_seconds': round(sum(durations), 3),
+            'chars': chars, 'failures': failures}
+
+async def time_extractor(corpus, extractor: DocumentExtractor) -> Dict:
+    durations, chars, failures = [], 0, 0
+    # Warm the pool so worker start-up is not charged to the first document
+    await extractor.extract(SpooledUpload.from_bytes(synthetic_pdf(["warm up"]), "warm.pdf"))
+    for name, data in corpus:
+        started = time.perf_counter()
+        try:
+            chars += len(await extractor.extract(SpooledUpload.from_bytes(data, name)))
+        except Exception:
+            failures += 1
+        durations.append(time.perf_counter() - started)
+    return {'seconds': summarize(durations), 'total_seconds': round(sum(durations), 3),
+            'chars': chars, 'failures': failures}
+
+def print_row(name: str, result: Dict, baseline: float):
+    seconds = result['seconds']
+    speedup = baseline / result['total_seconds'] if result['total_seconds'] else 0.0
+    print(f"  {name:<28} total={result['total_seconds']:8.3f}s p50={seconds['p50'] * 1000:8.1f}ms "
+          f"p95={seconds['p95'] * 1000:8.1f}ms chars={result['chars']:<9} failures={result['failures']:<3} "
+          f"x{speedup:.2f}")
+
+def main(args) -> Dict:
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+        if not corpus:
+            sys.exit(f"No PDFs found under {args.corpus}")
+    else:
+        print("No --corpus given, using a synthetic corpus (numbers are only indicative)")
+        corpus = synthetic_corpus(args.synthetic_count, args.seed)
+    total_bytes = sum(len(data) for _, data in corpus)
+    print(f"{len(corpus)} PDFs, {total_bytes / 1024 / 1024:.1f} MB, "
+          f"limits: {args.max_pages} pages / {args.max_chars} chars")
+
+    report = {'corpus': args.corpus or 'synthetic', 'documents': len(corpus), 'bytes': total_bytes,
+              'max_pages': args.max_pages, 'max_chars': args.max_chars, 'results': {}}
+    results = report['results']
+    results['legacy'] = time_sync(corpus, legacy_extract)
+    results['engine_no_limits'] = time_sync(corpus, lambda data: extract_text(data))
+    results['engine'] = time_sync(corpus, lambda data: extract_text(data, max_pages=args.max_pages,
+                                                                     max_chars=args.max_chars))
+    for workers in args.workers:
+        extractor = DocumentExtractor(max_workers=workers, max_pending=workers, timeout=args.timeout,
+                                      max_pages=args.max_pages, max_chars=args.max_chars,
+                                      parallel_min_bytes=args.parallel_min_bytes)
+        try:
+            results[f'pool_{workers}_workers'] = asyncio.run(time_extractor(corpus, extractor))
+        finally:
+            extractor.shutdown()
+
+    baseline = results['legacy']['total_seconds']
+    for name, result in results.items():
+        print_row(name, result, baseline)
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark resume PDF text extraction")
+    parser.add_argument("--corpus", help="Directory of PDFs (searched recursively)")
+    parser.add_argument("--synthetic-count", type=int, default=40, help="Synthetic PDFs when no corpus is given")
+    parser.add_argument("--workers", type=lambda s: [int(w) for w in s.split(',')], default=[1, 2, 4],
+                        help="Comma-separated process pool sizes")
+    parser.add_argument("--max-pages", type=int, default=settings.EXTRACT_MAX_PAGES)
+    parser.add_argument("--max-chars", type=int, default=settings.EXTRACT_MAX_CHARS)
+    parser.add_argument("--parallel-min-bytes", type=int, default=settings.EXTRACT_PARALLEL_MIN_BYTES)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Where to write the JSON report (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    report = main(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"pdf-extraction-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
@@ -0,0 +1,144 @@
+"""
+Precision, recall and throughput of the local skill extractor
+
+Scores ml/models/skill_extractor.py against a labeled resume set (JSONL with
+'id', 'text' and 'skills' given as vocabulary names). The labels of the
+bundled set in benchmarks/data were derived from the extractor's own
+vocabulary, so its scores are a regression check, not a measure of accuracy;
+pass --labeled with an independently labeled set for that. --against-llm also
+scores the extractor against the skills the LLM parser (RESUME_SKILLS_MODE=llm)
+returns for the same resumes, mapped onto the vocabulary.
+
+    python benchmarks/skill_extraction.py --repeat 200
+    python benchmarks/skill_extraction.py --labeled cohort-labels.jsonl --against-llm
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+# Add backend directory to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.metrics import summarize
+from ml.models.skill_extractor import SkillExtractor
+
+LABELED_PATH = os.path.join(os.path.dirname(__file__), 'data', 'labeled_resumes.jsonl')
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+def load_labeled(path: str) -> List[Dict]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+def score(documents: List[Dict], extractor: SkillExtractor) -> Dict:
+    """Micro-averaged precision/recall over skill names, plus per-document misses"""
+    true_positives = false_positives = false_negatives = 0
+    errors = {}
+    for document in documents:
+        expected = set(document['skills'])
+        found = {skill.name for skill in extractor.extract(document['text'])}
+        true_positives += len(found & expected)
+        false_positives += len(found - expected)
+        false_negatives += len(expected - found)
+        if found != expected:
+            errors[document['id']] = {'missed': sorted(expected - found), 'spurious': sorted(found - expected)}
+    precision = true_positives / (true_positives + false_positives) if true_positives + false_positives else 0.0
+    recall = true_positives / (true_positives + false_negatives) if true_positives + false_negatives else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return {
+        'precision': round(precision, 4),
+        'recall': round(recall, 4),
+        'f1': round(f1, 4),
+        'true_positives': true_positives,
+        'false_positives': false_positives,
+        'false_negatives': false_negatives,
+        'errors': errors
+    }
+
+def llm_labeled(documents: List[Dict], extractor: SkillExtractor) -> List[Dict]:
+    """``documents`` relabeled with the LLM parser's skills, mapped onto the extractor's vocabulary"""
+    from app.core.ai_parser import AIResumeParser
+    from app.services.llm_gateway import llm_gateway
+
+    parser = AIResumeParser(llm=llm_gateway, skill_extractor=None)
+
+    async def parse_all():
+        return await asyncio.gather(*[parser.parse_resume(document['text']) for document in documents])
+
+    relabeled = []
+    for document, parsed in zip(documents, asyncio.run(parse_all())):
+        # Free-text skill names from the LLM, normalized through the same vocabulary
+        names = "\n".join(skill.name for skill in parsed.skills)
+        relabeled.append({**document, 'skills': sorted({skill.name for skill in extractor.extract(names)})})
+    return relabeled
+
+def throughput(documents: List[Dict], extractor: SkillExtractor, repeat: int) -> Dict:
+    durations = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for document in documents:
+            call_started = time.perf_counter()
+            extractor.extract(document['text'])
+            durations.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+    return {
+        'documents': len(durations),
+        'docs_per_second': round(len(durations) / elapsed, 1) if elapsed else 0.0,
+        'seconds': summarize(durations)
+    }
+
+def main(args) -> Dict:
+    documents = load_labeled(args.labeled)
+    started = time.perf_counter()
+    extractor = SkillExtractor()
+    load_seconds = time.perf_counter() - started
+
+    # The bundled labels come from the extractor's vocabulary, so scoring against them is circular
+    labels = "vocabulary-derived" if os.path.abspath(args.labeled) == os.path.abspath(LABELED_PATH) else "independent"
+    report = {
+        'labeled': args.labeled,
+        'labels': labels,
+        'vocabulary_version': extractor.version,
+        'load_seconds': round(load_seconds, 3),
+        'quality': score(documents, extractor),
+        'throughput': throughput(documents, extractor, args.repeat)
+    }
+    if args.against_llm:
+        report['llm_agreement'] = score(llm_labeled(documents, extractor), extractor)
+
+    quality, speed = report['quality'], report['throughput']
+    print(f"{len(documents)} labeled resumes ({labels} labels), vocabulary {extractor.version}, "
+          f"loaded in {load_seconds:.2f}s")
+    print(f"precision={quality['precision']:.3f} recall={quality['recall']:.3f} f1={quality['f1']:.3f}")
+    if labels == "vocabulary-derived":
+        print("  (regression check only: these labels say nothing about accuracy on real resumes)")
+    if args.against_llm:
+        agreement = report['llm_agreement']
+        print(f"against LLM skills: precision={agreement['precision']:.3f} recall={agreement['recall']:.3f} "
+              f"f1={agreement['f1']:.3f}")
+    print(f"throughput={speed['docs_per_second']} docs/s  p50={speed['seconds']['p50'] * 1000:.2f}ms "
+          f"p95={speed['seconds']['p95'] * 1000:.2f}ms")
+    for document_id, error in quality['errors'].items():
+        print(f"  {document_id}: missed={error['missed']} spurious={error['spurious']}")
+    return report
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Score the local skill extractor on labeled resumes")
+    parser.add_argument("--labeled", default=LABELED_PATH, help="JSONL of {'id', 'text', 'skills'}")
+    parser.add_argument("--against-llm", action="store_true",
+                        help="Also score against the LLM parser's skills (calls LLM_BACKEND once per resume)")
+    parser.add_argument("--repeat", type=int, default=50, help="Passes over the set for throughput")
+    parser.add_argument("--output", help="Where to write the JSON report (default: benchmarks/results/)")
+    args = parser.parse_args()
+
+    report = main(args)
+
+    output = args.output or os.path.join(RESULTS_DIR, f"skill-extraction-{time.strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nReport written to {output}")
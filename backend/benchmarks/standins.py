@@ -0,0 +1,272 @@
+"""
+Local stand-ins for every external dependency of the API (Neo4j, Pinecone,
+Redis, Gemini), so the app can be exercised offline
+"""
+
+import os
+import sys
+from collections import deque
+from typing import Dict, List, Optional
+
+# Add backend directory to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.services.graph_db import CareerGraphDB, CareerPath, generated_role_id
+
+# Career ladders; consecutive roles are connected and salaries grow along each ladder
+TRACKS = {
+    'Software': ['Software Developer Intern', 'Junior Software Engineer', 'Software Engineer',
+                 'Senior Software Engineer', 'Staff Engineer', 'Engineering Manager'],
+    'Data': ['Data Analyst Intern', 'Junior Data Analyst', 'Data Analyst', 'Data Scientist',
+             'Senior Data Scientist', 'Head of Data'],
+    'DevOps': ['Junior DevOps Engineer', 'DevOps Engineer', 'Senior DevOps Engineer',
+               'Site Reliability Engineer', 'Platform Lead'],
+    'QA': ['QA Tester Intern', 'Junior QA Engineer', 'QA Engineer', 'SDET', 'QA Lead'],
+    'Design': ['UI/UX Design Intern', 'UI/UX Designer', 'Product Designer', 'Design Lead'],
+}
+
+# Lateral moves between ladders
+CROSS_LINKS = [
+    ('Software Engineer', 'Data Scientist'),
+    ('Software Engineer', 'DevOps Engineer'),
+    ('Data Analyst', 'Software Engineer'),
+    ('QA Engineer', 'Software Engineer'),
+    ('Senior Software Engineer', 'Site Reliability Engineer'),
+    ('Product Designer', 'Engineering Manager'),
+]
+
+TRACK_SKILLS = {
+    'Software': ['Python', 'System Design', 'Git', 'SQL', 'Testing', 'Leadership'],
+    'Data': ['SQL', 'Python', 'Statistics', 'Machine Learning', 'Data Visualization', 'Leadership'],
+    'DevOps': ['Linux', 'Docker', 'Kubernetes', 'Terraform', 'Monitoring'],
+    'QA': ['Test Automation', 'Selenium', 'Programming', 'Test Strategy', 'Leadership'],
+    'Design': ['Figma', 'UX Design', 'User Research', 'Leadership'],
+}
+
+def build_catalog() -> Dict:
+    """Roles with salaries/skills and TRANSITIONS_TO edges for the in-memory graph"""
+    roles: Dict[str, Dict] = {}
+    transitions: Dict[str, Dict[str, Dict]] = {}
+    for track, ladder in TRACKS.items():
+        skills = TRACK_SKILLS[track]
+        for level, title in enumerate(ladder):
+            roles[title] = {
+                'id': title.lower().replace(' ', '-'),
+                'avg_salary': 30000 + level * 25000 + len(track) * 1000,
+                'skills': skills[:min(len(skills), 2 + level)]
+            }
+        for level, (from_role, to_role) in enumerate(zip(ladder, ladder[1:])):
+            transitions.setdefault(from_role, {})[to_role] = {
+                'avg_months': 12 + level * 6,
+                'difficulty': 3 + level,
+                'success_rate': round(0.8 - level * 0.08, 2)
+            }
+    for from_role, to_role in CROSS_LINKS:
+        transitions.setdefault(from_role, {})[to_role] = {'avg_months': 18, 'difficulty': 6, 'success_rate': 0.5}
+    return {'roles': roles, 'transitions': transitions}
+
+class InMemoryCareerGraph(CareerGraphDB):
+    """CareerGraphDB backed by dictionaries instead of Neo4j.
+
+    Role matching is inherited, so unmatched titles still go through the
+    (fake) LLM gateway exactly like production; only the path query is replaced.
+    """
+
+    def __init__(self, llm=None, catalog: Optional[Dict] = None, on_write=None):
+        catalog = catalog or build_catalog()
+        self.roles = catalog['roles']
+        self.transitions = catalog['transitions']
+        self.llm = llm
+        self.on_write = on_write
+        self.driver = None
+
+    def close(self):
+        pass
+
+    def _get_all_roles(self) -> List[str]:
+        return list(self.roles)
+
+    def _get_role_skills(self, role_title: str) -> List[str]:
+        return list(self.roles.get(role_title, {}).get('skills', []))
+
+    def get_all_transitions(self) -> List[Dict]:
+        return [
+            {'from_role': from_role, 'to_role': to_role, 'from_role_id': self.roles[from_role]['id'],
+             'to_role_id': self.roles[to_role]['id'], 'avg_months': edge['avg_months'],
+             'difficulty': edge['difficulty'], 'required_skills': self._get_role_skills(to_role)}
+            for from_role, edges in sorted(self.transitions.items())
+            for to_role, edge in sorted(edges.items())
+        ]
+
+    def add_generated_path(self, current_role: str, target_role: str, steps: List[Dict],
+                           provenance: str, difficulty: float, success_rate: float):
+        # Roles are keyed by title here, so unlike Neo4j a step title already in the
+        # graph shares that role; the returned ids are still those of this plan
+        titles = [current_role] + [step.get('title', f"Step {i + 1}") for i, step in enumerate(steps)]
+        if titles[-1].lower() != target_role.lower():
+            titles.append(target_role)
+        role_ids = []
+        for i, (title, step) in enumerate(zip(titles, [{}] + steps + [{}])):
+            role_id = generated_role_id(current_role, target_role, i)
+            role = self.roles.setdefault(title, {'id': role_id, 'avg_salary': int(step.get('estimated_salary', 0)),
+                                                 'skills': step.get('skills_to_acquire', [])})
+            # Endpoints keep the id of an existing role, like the title MERGE in Neo4j
+            role_ids.append(role['id'] if i in (0, len(titles) - 1) else role_id)
+        for i, (from_role, to_role) in enumerate(zip(titles, titles[1:])):
+            step = steps[i] if i < len(steps) else {}
+            self.transitions.setdefault(from_role, {})[to_role] = {
+                'avg_months': step.get('duration_months', 12), 'difficulty': difficulty, 'success_rate': success_rate
+            }
+        self._written()
+        return role_ids
+
+    def _walk(self, current: str, max_hops: int) -> List[List[str]]:
+        """Every simple path of 1..max_hops edges starting at ``current``"""
+        found = []
+        queue = deque([[current]])
+        while queue:
+            path = queue.popleft()
+            if len(path) > 1:
+                found.append(path)
+            if len(path) - 1 == max_hops:
+                continue
+            for next_role in self.transitions.get(path[-1], {}):
+                if next_role not in path:
+                    queue.append(path + [next_role])
+        return found
+
+    def _to_career_path(self, titles: List[str]) -> CareerPath:
+        edges = [self.transitions[a][b] for a, b in zip(titles, titles[1:])]
+        salaries = [self.roles[t]['avg_salary'] for t in titles]
+        transitions = [
+            {
+                'step': i + 1,
+                'from_role': titles[i],
+                'to_role': titles[i + 1],
+                'from_role_id': self.roles[titles[i]]['id'],
+                'to_role_id': self.roles[titles[i + 1]]['id'],
+                'duration_months': edge['avg_months'],
+                'difficulty': edge['difficulty'],
+                'success_rate': edge['success_rate'],
+                'salary_from': salaries[i],
+                'salary_to': salaries[i + 1],
+                'salary_increase': salaries[i + 1] - salaries[i],
+                'required_skills': self._get_role_skills(titles[i + 1])
+            }
+            for i, edge in enumerate(edges)
+        ]
+        return CareerPath(
+            roles=titles,
+            total_months=sum(edge['avg_months'] for edge in edges),
+            avg_difficulty=sum(edge['difficulty'] for edge in edges) / len(edges),
+            salary_growth=salaries[-1] - salaries[0],
+            required_skills=self._get_role_skills(titles[-1]),
+            transitions=transitions
+        )
+
+    def find_paths_between(self, current_role: str, target_role: Optional[str] = None,
+                           max_hops: int = 4) -> List[CareerPath]:
+        candidates = [self._to_career_path(p) for p in self._walk(current_role, max_hops)]
+        if target_role:
+            # allShortestPaths semantics: only the shortest paths to the target
+            to_target = [p for p in candidates if p.roles[-1] == target_role]
+            shortest = min((len(p.roles) for p in to_target), default=0)
+            paths = [p for p in to_target if len(p.roles) == shortest]
+            paths.sort(key=lambda p: (p.total_months, p.avg_difficulty))
+            return paths[:10]
+        candidates.sort(key=lambda p: (-p.salary_growth, p.total_months))
+        return candidates[:20]
+
+class KeywordSkillVectorDB:
+    """SkillVectorDB stand-in that matches skills by normalized text instead of embeddings"""
+
+    def __init__(self, catalog: Optional[Dict] = None):
+        catalog = catalog or build_catalog()
+        self.skills = sorted({skill for role in catalog['roles'].values() for skill in role['skills']})
+
+    def encode_skills(self, skills: List[str]):
+        return [skill.lower().strip() for skill in skills]
+
+    def find_similar_skills(self, skill_name: str, top_k: int = 5) -> List[Dict]:
+        words = set(skill_name.lower().split())
+        scored = [(len(words & set(s.lower().split())) / max(len(words), 1), s) for s in self.skills]
+        scored.sort(key=lambda x: (-x[0], x[1]))
+        return [
+            {'skill': skill, 'category': 'general', 'similarity_score': score, 'demand_score': 50}
+            for score, skill in scored[:top_k]
+        ]
+
+    def match_user_skills_to_role(self, user_skills: List[str], role_required_skills: List[str],
+                                  user_embeddings=None) -> Dict:
+        if not role_required_skills:
+            return {'match_percentage': 0.0, 'matched_skills': [], 'missing_skills': []}
+        owned = {skill.lower().strip(): skill for skill in user_skills or []}
+        matched = [owned[s.lower()] for s in role_required_skills if s.lower() in owned]
+        missing = [s for s in role_required_skills if s.lower() not in owned]
+        return {
+            'match_percentage': len(matched) / len(role_required_skills) * 100,
+            'matched_skills': matched,
+            'matched_skills_details': [{'required': s, 'user_has': s, 'match_score': 1.0} for s in matched],
+            'missing_skills': missing
+        }
+
+def sample_resume(index: int) -> str:
+    """Deterministic plain-text résumé for upload scenarios"""
+    track = list(TRACKS)[index % len(TRACKS)]
+    ladder = TRACKS[track]
+    role = ladder[index % len(ladder)]
+    skills = ", ".join(TRACK_SKILLS[track])
+    return f"""Candidate {index}
+candidate{index}@example.com
+
+SUMMARY
+{role} with {index % 12 + 1} years of experience in {track.lower()} teams.
+
+EXPERIENCE
+{role}, Example Corp {index}
+- Delivered projects using {skills}
+
+SKILLS
+{skills}
+
+EDUCATION
+B.Sc. Computer Science
+"""
+
+def create_app(llm_latency_ms: float = 0.0, redis_url: Optional[str] = None):
+    """Import the FastAPI app wired to local stand-ins.
+
+    The graph and vector classes are swapped before the dependency providers
+    (app/api/deps.py) build the services, the shared LLM gateway gets a
+    FakeBackend, and Redis is replaced by fakeredis unless ``redis_url`` points
+    at a local server.
+    """
+    import app.services.graph_db as graph_db_module
+    import app.services.vector_db as vector_db_module
+    from app.api import deps
+    from app.services.fake_llm import FakeBackend
+    from app.services.llm_gateway import llm_gateway
+
+    graph_db_module.CareerGraphDB = lambda uri, user, password, llm=None, on_write=None: InMemoryCareerGraph(
+        llm=llm, on_write=on_write
+    )
+    vector_db_module.SkillVectorDB = lambda pinecone_api_key, **kwargs: KeywordSkillVectorDB()
+    llm_gateway.backend = FakeBackend(latency_ms=llm_latency_ms)
+
+    # Every run starts cold: no precomputed enrichment, empty cache
+    deps.override(deps.get_enrichment_store, None)
+    cache, versions = deps.get_cache(), deps.get_cache_versions()
+    if redis_url:
+        import redis
+        import redis.asyncio
+        cache.redis = redis.asyncio.from_url(redis_url)
+        versions.sync_redis = redis.Redis.from_url(redis_url)
+    else:
+        import fakeredis
+        import fakeredis.aioredis
+        server = fakeredis.FakeServer()
+        cache.redis = fakeredis.aioredis.FakeRedis(server=server)
+        versions.sync_redis = fakeredis.FakeRedis(server=server)
+
+    import app.main as main
+    return main.app
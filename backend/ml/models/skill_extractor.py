@@ -1,2 +1,159 @@
+"""
+Local skill extraction for resumes
+
+Skill names and their aliases from ml/data/skill_vocabulary.json are compiled
+into spaCy PhraseMatchers over a blank English tokenizer (no model download,
+no GPU), so a resume is scanned in a few milliseconds. Proficiency and years
+are estimated from the words around each mention ("5 years of Python",
+"expert in SQL", "familiar with Docker").
+"""
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from app.models.skill import ExtractedSkill
+
+VOCABULARY_PATH = os.path.join(os.path.dirname(__file__), '..', 'data', 'skill_vocabulary.json')
+
+# Terms this short ("C", "ML", "JS") are only matched with the vocabulary's casing
+CASE_SENSITIVE_MAX_LEN = 3
+CONTEXT_CHARS = 80
+
+YEARS_PATTERN = re.compile(r"(\d{1,2}(?:\.\d)?)\s*\+?\s*(?:years?|yrs?)\b", re.IGNORECASE)
+STRONG_PATTERN = re.compile(
+    r"\b(expert|expertise|advanced|extensive|deep|strong|proficient|mastery|architected|led)\b", re.IGNORECASE
+)
+BASIC_PATTERN = re.compile(
+    r"\b(familiar|familiarity|basic|beginner|exposure|coursework|introductory)\b", re.IGNORECASE
+)
+# Clause boundaries within a line, so "expert in X; familiar with Y" rates X and Y separately
+CLAUSE_BOUNDARY = re.compile(r"[;•|]|\.\s")
+
+@dataclass
+class _SkillHits:
+    name: str
+    category: str
+    first: int
+    mentions: int = 0
+    years: float = 0.0
+    strong: bool = False
+    basic: bool = False
+    contexts: List[str] = field(default_factory=list)
+
 class SkillExtractor:
-    pass
+    """Finds vocabulary skills in resume text without calling the LLM"""
+
+    def __init__(self, vocabulary_path: str = VOCABULARY_PATH):
+        import spacy
+        from spacy.matcher import PhraseMatcher
+
+        with open(vocabulary_path, 'rb') as f:
+            raw = f.read()
+        vocabulary = json.loads(raw)
+        # Part of the resume cache key, so vocabulary edits invalidate cached parses
+        self.version = f"{vocabulary.get('version', 1)}-{hashlib.sha256(raw).hexdigest()[:8]}"
+        self.nlp = spacy.blank("en")
+        self._lower = PhraseMatcher(self.nlp.vocab, attr="LOWER")
+        self._exact = PhraseMatcher(self.nlp.vocab, attr="ORTH")
+        self.categories: Dict[str, str] = {}
+
+        for entry in vocabulary['skills']:
+            name = entry['name']
+            self.categories[name] = entry.get('category', 'technical')
+            exact, lower = [], []
+            for term in [name] + entry.get('aliases', []):
+                if entry.get('case_sensitive') or len(term) <= CASE_SENSITIVE_MAX_LEN:
+                    exact.append(self.nlp.make_doc(term))
+                else:
+                    lower.append(self.nlp.make_doc(term))
+            if exact:
+                self._exact.add(name, exact)
+            if lower:
+                self._lower.add(name, lower)
+
+    def extract(self, text: str) -> List[ExtractedSkill]:
+        """Skills in order of first mention"""
+        from spacy.tokens import Span
+        from spacy.util import filter_spans
+
+        doc = self.nlp.make_doc(text)
+        spans = [Span(doc, start, end, label=match_id)
+                 for match_id, start, end in self._lower(doc) + self._exact(doc)]
+        hits: Dict[str, _SkillHits] = {}
+        # Longest match wins: "React Native" is not also "React"
+        for span in filter_spans(spans):
+            if not self._plausible(doc, span):
+                continue
+            name = span.label_
+            skill = hits.get(name)
+            if skill is None:
+                skill = hits[name] = _SkillHits(name, self.categories[name], span.start_char)
+            skill.mentions += 1
+            skill.contexts.append(self._context(text, span.start_char, span.end_char))
+
+        skills = []
+        for skill in sorted(hits.values(), key=lambda s: s.first):
+            for context in skill.contexts:
+                years = [float(y) for y in YEARS_PATTERN.findall(context)]
+                if years:
+                    skill.years = max(skill.years, max(years))
+                skill.strong = skill.strong or bool(STRONG_PATTERN.search(context))
+                skill.basic = skill.basic or bool(BASIC_PATTERN.search(context))
+            skills.append(ExtractedSkill(
+                name=skill.name,
+                category=skill.category,
+                proficiency=self._proficiency(skill),
+                years_experience=skill.years
+            ))
+        return skills
+
+    @staticmethod
+    def _plausible(doc, span) -> bool:
+        """Reject one-letter matches that are clearly not a language ("C-level", "Plan C")"""
+        if len(span.text) > 1:
+            return True
+        before = doc[span.start - 1].text if span.start > 0 else ""
+        after = doc[span.end].text if span.end < len(doc) else ""
+        return after not in ("-", "'", "’") and before.lower() not in ("plan", "grade", "type", "vitamin")
+
+    @staticmethod
+    def _context(text: str, start: int, end: int) -> str:
+        """The mention's clause, clipped to CONTEXT_CHARS either side"""
+        left = max(text.rfind("\n", 0, start) + 1, start - CONTEXT_CHARS)
+        right = text.find("\n", end)
+        right = min(len(text) if right == -1 else right, end + CONTEXT_CHARS)
+        for boundary in CLAUSE_BOUNDARY.finditer(text, left, start):
+            left = boundary.end()
+        boundary = CLAUSE_BOUNDARY.search(text, end, right)
+        return text[left:boundary.start() if boundary else right]
+
+    @staticmethod
+    def _proficiency(skill: _SkillHits) -> int:
+        """1-5 from stated years, strength words and how often the skill comes up"""
+        level = 2
+        if skill.mentions >= 3:
+            level += 1
+        if skill.years >= 6:
+            level = max(level, 5)
+        elif skill.years >= 3:
+            level = max(level, 4)
+        elif skill.years >= 1:
+            level = max(level, 3)
+        if skill.strong:
+            level += 1
+        if skill.basic:
+            level = min(level, 2)
+        return max(1, min(level, 5))
+
+_extractor: Optional[SkillExtractor] = None
+
+def get_skill_extractor() -> SkillExtractor:
+    """Process-wide extractor; compiling the matchers takes a moment, so it is built once"""
+    global _extractor
+    if _extractor is None:
+        _extractor = SkillExtractor()
+    return _extractor
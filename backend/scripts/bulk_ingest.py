@@ -0,0 +1,89 @@
+"""
+Parse a directory or archive of resumes into a JSONL file
+
+    python scripts/bulk_ingest.py ~/cohort-2024.zip --output data/bulk/cohort-2024.jsonl
+
+Records are appended as each resume finishes; running the same command again
+after a crash skips the resumes already in the output file.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+from dotenv import load_dotenv
+
+# Add backend directory to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.core.ai_parser import AIResumeParser, load_skill_extractor
+from app.core.bulk_ingest import BulkIngestJob
+from app.services.cache import RedisCache
+from app.services.cache_versions import CacheVersions
+from app.services.codecs import load_serializer
+from app.services.extraction import DocumentExtractor
+from app.services.llm_gateway import llm_gateway
+from app.services.resume_cache import ResumeParseCache
+
+load_dotenv()
+
+async def bulk_ingest(args):
+    extractor = DocumentExtractor(
+        max_workers=args.extract_workers,
+        max_pending=max(args.extract_workers, 1) * 2,
+        timeout=settings.EXTRACT_TIMEOUT_SECONDS,
+        max_pages=settings.EXTRACT_MAX_PAGES,
+        max_chars=settings.EXTRACT_MAX_CHARS,
+        parallel_min_bytes=settings.EXTRACT_PARALLEL_MIN_BYTES
+    )
+    # Sharing the API's Redis cache means resumes the API has seen cost nothing here
+    serializer = load_serializer(settings.CACHE_CODEC, settings.CACHE_COMPRESSION, settings.CACHE_COMPRESS_MIN_BYTES)
+    cache = RedisCache(
+        redis_url=args.redis_url,
+        serializer=serializer,
+        max_connections=settings.REDIS_MAX_CONNECTIONS,
+        socket_timeout=settings.REDIS_SOCKET_TIMEOUT,
+        connect_timeout=settings.REDIS_CONNECT_TIMEOUT
+    ) if args.redis_url else None
+    # Same prompts version tag as the API (app/api/deps.py), so both build the same keys
+    versions = CacheVersions(cache, redis_url=args.redis_url) if cache is not None else None
+    parser = AIResumeParser(llm=llm_gateway, skill_extractor=load_skill_extractor())
+    resume_cache = ResumeParseCache(cache, parser, extract=extractor.extract, ttl=settings.RESUME_CACHE_TTL,
+                                    versions=versions)
+    job = BulkIngestJob(
+        source=args.source,
+        output=args.output,
+        resume_cache=resume_cache,
+        concurrency=args.concurrency,
+        max_bytes=settings.MAX_UPLOAD_BYTES
+    )
+
+    task = job.start()
+    try:
+        while not task.done():
+            await asyncio.wait([task], timeout=args.progress_interval)
+            print(f"[INFO] {job.progress()}")
+        await task
+    finally:
+        extractor.shutdown()
+
+    snapshot = job.snapshot()
+    print(json.dumps(snapshot, indent=2))
+    if snapshot['status'] != "completed":
+        sys.exit(1)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse a directory, zip or tar of resumes into JSONL")
+    parser.add_argument("source", help="Directory, .zip or .tar(.gz) of PDF/DOCX/TXT resumes")
+    parser.add_argument("--output", required=True, help="JSONL file to append records to (also the resume point)")
+    parser.add_argument("--concurrency", type=int, default=settings.BULK_INGEST_CONCURRENCY,
+                        help="Resumes in flight at once (LLM calls are further limited by LLM_MAX_CONCURRENCY)")
+    parser.add_argument("--extract-workers", type=int, default=settings.EXTRACT_MAX_WORKERS,
+                        help="Text extraction processes (0 = extract in a thread)")
+    parser.add_argument("--redis-url", help="Reuse the API's resume parse cache at this Redis URL")
+    parser.add_argument("--progress-interval", type=float, default=5.0, help="Seconds between progress lines")
+    args = parser.parse_args()
+
+    asyncio.run(bulk_ingest(args))
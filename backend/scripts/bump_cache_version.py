@@ -0,0 +1,32 @@
+"""
+Invalidate cached results that depend on the graph, the skill embeddings or
+the prompts by bumping that cache namespace's version (see
+app/services/cache_versions.py). Old entries are no longer read and expire by
+TTL; nothing is scanned or flushed.
+
+    python scripts/bump_cache_version.py prompts
+"""
+
+import argparse
+import os
+import sys
+
+import redis
+from dotenv import load_dotenv
+
+# Add backend directory to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.services.cache_versions import NAMESPACES, bump_version_blocking
+
+load_dotenv()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bump a cache namespace version")
+    parser.add_argument("namespace", choices=NAMESPACES)
+    parser.add_argument("--redis-url", default=settings.REDIS_URL)
+    args = parser.parse_args()
+
+    version = bump_version_blocking(redis.Redis.from_url(args.redis_url), args.namespace)
+    print(f"{args.namespace} cache version is now {version}")
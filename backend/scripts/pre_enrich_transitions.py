@@ -0,0 +1,85 @@
+import argparse
+import asyncio
+import os
+import sys
+import time
+from dotenv import load_dotenv
+
+# Add backend directory to path so we can import app modules
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from app.config import settings
+from app.core.enrichment import ENRICHMENT_PROMPT_VERSION, enrich_step_with_gemini, has_enrichment, store_key
+from app.services.enrichment_store import EnrichmentStore
+from app.services.graph_db import CareerGraphDB
+from app.services.llm_gateway import llm_gateway
+
+load_dotenv()
+
+async def pre_enrich_transitions(concurrency: int, force: bool = False):
+    """Enrich every TRANSITIONS_TO edge and store the result for the current prompt/model version.
+
+    Each result is committed as soon as it arrives, so an interrupted run picks
+    up where it stopped when started again.
+    """
+    graph_db = CareerGraphDB(
+        uri=settings.NEO4J_URI,
+        user=settings.NEO4J_USER,
+        password=settings.NEO4J_PASSWORD
+    )
+    store = EnrichmentStore(
+        path=settings.ENRICHMENT_STORE_PATH,
+        prompt_version=ENRICHMENT_PROMPT_VERSION,
+        model=settings.GEMINI_MODEL
+    )
+
+    try:
+        transitions = graph_db.get_all_transitions()
+        done = set() if force else set(store.completed_pairs())
+        pending = [t for t in transitions if store_key(t) not in done]
+        print(f"{len(transitions)} transitions in graph, {len(transitions) - len(pending)} already enriched "
+              f"(prompt {ENRICHMENT_PROMPT_VERSION}, model {settings.GEMINI_MODEL}), {len(pending)} to go")
+
+        semaphore = asyncio.Semaphore(concurrency)
+        stats = {'enriched': 0, 'failed': 0}
+        started = time.perf_counter()
+
+        async def enrich(transition):
+            async with semaphore:
+                try:
+                    # No user context: precomputed resources are shared by everyone
+                    data = await enrich_step_with_gemini(
+                        llm_gateway, transition, transition['from_role'], transition['to_role'], user_skills=[]
+                    )
+                except Exception as e:
+                    data = None
+                    print(f"[WARN] {transition['from_role']} -> {transition['to_role']} failed: {e}")
+
+                if data and has_enrichment(data):
+                    store.put(*store_key(transition), data)
+                    stats['enriched'] += 1
+                else:
+                    stats['failed'] += 1
+
+                finished = stats['enriched'] + stats['failed']
+                if finished % 10 == 0 or finished == len(pending):
+                    print(f"  {finished}/{len(pending)} done ({stats['failed']} failed, "
+                          f"{time.perf_counter() - started:.0f}s elapsed)")
+
+        await asyncio.gather(*[enrich(t) for t in pending])
+
+        print(f"Enriched {stats['enriched']} transitions, {stats['failed']} failed. "
+              "Re-run to retry failures.")
+        return stats
+    finally:
+        graph_db.close()
+        store.close()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Precompute learning resources for every career transition")
+    parser.add_argument("--concurrency", type=int, default=4, help="Maximum concurrent Gemini calls")
+    parser.add_argument("--force", action="store_true", help="Re-enrich transitions that are already stored")
+    args = parser.parse_args()
+
+    result = asyncio.run(pre_enrich_transitions(args.concurrency, args.force))
+    sys.exit(1 if result['failed'] else 0)
@@ -1,10 +1,12 @@
 import os
 import sys
+import redis
 from dotenv import load_dotenv
 
 # Add backend directory to path so we can import app modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from app.services.cache_versions import bump_version_blocking
 from app.services.graph_db import CareerGraphDB
 
 load_dotenv()
@@ -534,6 +536,13 @@ def seed_careers():
             
     finally:
         graph_db.close()
+        # One bump for the whole run (instead of an on_write hook per write) drops cached results
+        # computed from the old graph
+        try:
+            version = bump_version_blocking(redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379")), 'graph')
+            print(f"Graph cache version is now {version}.")
+        except Exception as e:
+            print(f"Warning: could not bump the graph cache version: {e}")
         print("Seeding complete.")
 
 if __name__ == "__main__":
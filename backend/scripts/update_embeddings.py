@@ -1,10 +1,12 @@
 import os
 import sys
+import redis
 from dotenv import load_dotenv
 
 # Add backend directory to path so we can import app modules
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from app.services.cache_versions import bump_version_blocking
 from app.services.vector_db import SkillVectorDB
 
 load_dotenv()
@@ -32,6 +34,11 @@ def update_embeddings():
     
     print(f"Adding {len(skills)} skills to vector database...")
     vector_db.add_skills(skills)
+    try:
+        version = bump_version_blocking(redis.Redis.from_url(os.getenv("REDIS_URL", "redis://localhost:6379")), 'embeddings')
+        print(f"Embeddings cache version is now {version}.")
+    except Exception as e:
+        print(f"Warning: could not bump the embeddings cache version: {e}")
     print("Embeddings updated.")
 
 if __name__ == "__main__":
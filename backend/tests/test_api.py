@@ -1,2 +1,252 @@
-def test_api():
-    pass
+import asyncio
+import io
+import json
+import zipfile
+
+import pytest
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("pinecone")
+pytest.importorskip("fakeredis")
+
+import httpx
+
+from benchmarks.standins import create_app, sample_resume
+
+def _post(path, **kwargs):
+    async def run():
+        transport = httpx.ASGITransport(app=create_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post(path, **kwargs)
+    return asyncio.run(run())
+
+def test_career_paths_with_standins():
+    response = _post("/api/v1/career-paths", json={
+        'current_role': "Junior Software Engineer",
+        'target_role': "Senior Software Engineer",
+        'user_skills': ["Python", "Git"]
+    })
+
+    assert response.status_code == 200
+    assert response.json()['recommended_path']['roles'][-1] == "Senior Software Engineer"
+    assert "graph_search;dur=" in response.headers['server-timing']
+
+def test_resume_parse_with_standins():
+    response = _post("/api/v1/resume/parse", files={'file': ("resume.txt", sample_resume(0).encode(), "text/plain")})
+
+    assert response.status_code == 200
+    assert "llm_parse;dur=" in response.headers['server-timing']
+
+def test_unknown_target_gets_cross_industry_plan_and_critical_path():
+    async def run():
+        # The LLM delay makes resolve_target (LLM match) finish after resolve_current (exact match)
+        transport = httpx.ASGITransport(app=create_app(llm_latency_ms=20))
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/v1/career-paths", json={
+                'current_role': "Software Engineer",
+                'target_role': "Airline Pilot",
+                'user_skills': ["Python"]
+            })
+
+    response = asyncio.run(run())
+
+    assert response.status_code == 200
+    assert response.json()['paths'][0]['is_cross_industry']
+    assert "cross_industry_plan;dur=" in response.headers['server-timing']
+    # Whether the speculative plan finishes before or after the graph search,
+    # the response waits for both, so it is always the last link
+    stages = [stage.split("(")[0] for stage in response.headers['x-critical-path'].split(" > ")]
+    assert stages == ["resolve_target", "graph_search", "cross_industry"]
+
+def test_career_paths_job_is_accepted_then_polled():
+    async def run():
+        transport = httpx.ASGITransport(app=create_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            body = {'current_role': "Junior Software Engineer", 'target_role': "Senior Software Engineer",
+                    'user_skills': ["Python"]}
+            submitted = await client.post("/api/v1/jobs/career-paths", json=body, headers={'Idempotency-Key': "k"})
+            repeated = await client.post("/api/v1/jobs/career-paths", json=body, headers={'Idempotency-Key': "k"})
+            for _ in range(200):
+                result = await client.get(submitted.json()['result_url'])
+                if result.status_code != 202:
+                    break
+                await asyncio.sleep(0.01)
+            return submitted, repeated, result
+
+    submitted, repeated, result = asyncio.run(run())
+
+    assert submitted.status_code == 202
+    assert repeated.json()['id'] == submitted.json()['id']
+    assert result.status_code == 200
+    assert result.json()['recommended_path']['roles'][-1] == "Senior Software Engineer"
+
+def test_identical_career_path_requests_are_served_from_the_response_cache():
+    async def run():
+        transport = httpx.ASGITransport(app=create_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            before = (await client.get("/metrics")).json()['career_paths_response_cache']
+            first = await client.post("/api/v1/career-paths", json={
+                'current_role': "Junior Software Engineer", 'target_role': "Senior Software Engineer",
+                'user_skills': ["Python", "Git"]
+            })
+            same = await client.post("/api/v1/career-paths", json={
+                'current_role': "junior  software-engineer", 'target_role': "Senior Software Engineer",
+                'user_skills': ["git", "Python", "python"]
+            })
+            bypassed = await client.post("/api/v1/career-paths", headers={'Cache-Control': "no-cache"}, json={
+                'current_role': "Junior Software Engineer", 'target_role': "Senior Software Engineer",
+                'user_skills': ["Python", "Git"]
+            })
+            after = (await client.get("/metrics")).json()['career_paths_response_cache']
+            return first, same, bypassed, {outcome: after[outcome] - before[outcome] for outcome in before['seconds']}
+
+    first, same, bypassed, counted = asyncio.run(run())
+
+    assert first.headers['x-response-cache'] == "miss"
+    assert same.headers['x-response-cache'] == "hit"
+    assert same.json() == first.json()
+    assert bypassed.headers['x-response-cache'] == "bypass"
+    assert counted == {'hit': 1, 'negative_hit': 0, 'miss': 1, 'bypass': 1}
+
+def test_career_paths_are_paged_projected_and_compressed():
+    body = {'current_role': "Software Developer Intern", 'user_skills': ["Python"], 'personalize': True}
+
+    async def run():
+        transport = httpx.ASGITransport(app=create_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = await client.post("/api/v1/career-paths?limit=2", json=body, headers={'Accept-Encoding': "gzip"})
+            second = await client.post("/api/v1/career-paths", params={'cursor': first.json()['next_cursor']},
+                                       json=body)
+            summary = await client.post("/api/v1/career-paths?fields=recommended_path&expand=", json=body)
+            return first, second, summary
+
+    first, second, summary = asyncio.run(run())
+
+    assert first.headers['content-encoding'] == "gzip"
+    assert len(first.json()['paths']) == 2 and first.json()['total_paths'] > 4
+    assert first.json()['paths'][0]['transitions'][0]['learning_resources']
+    assert [path['roles'] for path in second.json()['paths']] != [path['roles'] for path in first.json()['paths']]
+    assert 'recommended_path' not in second.json()
+    # Summaries need no enrichment at all
+    assert summary.headers['x-llm-usage'].startswith("calls=0")
+    assert 'transitions' not in summary.json()['recommended_path']
+
+def _stream(body, accept):
+    async def run():
+        transport = httpx.ASGITransport(app=create_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.post("/api/v1/career-paths/stream", json=body, headers={'Accept': accept})
+    return asyncio.run(run())
+
+def _events(response):
+    """(event, data) pairs of an NDJSON or SSE career path stream"""
+    if response.headers['content-type'].startswith("text/event-stream"):
+        frames = [frame.split("\n") for frame in response.text.split("\n\n") if frame]
+        return [(event[len("event: "):], json.loads(data[len("data: "):])) for event, data in frames]
+    return [(line['event'], line['data']) for line in map(json.loads, response.text.splitlines())]
+
+@pytest.mark.parametrize("accept", ["application/x-ndjson", "text/event-stream"])
+def test_stream_sends_paths_then_enrichment_then_complete(accept):
+    response = _stream({'current_role': "Junior Software Engineer", 'target_role': "Senior Software Engineer",
+                        'user_skills': ["Python"], 'personalize': True}, accept)
+
+    assert response.headers['content-type'].startswith(accept)
+    events = _events(response)
+    names = [event for event, _ in events]
+    assert names[0] == "paths"
+    assert names[-1] == "complete"
+    assert set(names[1:-1]) == {"enrichment"}
+    complete = events[-1][1]
+    assert complete['recommended_path']['roles'][-1] == "Senior Software Engineer"
+    assert {'timing', 'llm_usage'} <= set(complete)
+
+@pytest.mark.parametrize("accept", ["application/x-ndjson", "text/event-stream"])
+def test_cross_industry_stream_sends_plan_steps_then_complete(accept):
+    from app.api.telemetry import stream_latency
+
+    before = stream_latency['total'].snapshot()['count']
+    response = _stream({'current_role': "Software Engineer", 'target_role': "Airline Pilot",
+                        'user_skills': ["Python"]}, accept)
+
+    events = _events(response)
+    names = [event for event, _ in events]
+    assert names[-1] == "complete"
+    assert names[:-1] and set(names[:-1]) == {"cross_industry_step"}
+    complete = events[-1][1]
+    assert complete['paths'][0]['is_cross_industry']
+    assert complete['timing']['total_ms'] >= complete['timing']['ttfb_ms']
+    assert 'llm_usage' in complete
+    assert stream_latency['total'].snapshot()['count'] == before + 1
+
+def test_bulk_ingest_is_submitted_polled_and_cleaned_up(tmp_path, monkeypatch):
+    from app.config import settings
+
+    monkeypatch.setattr(settings, 'BULK_INGEST_DIR', str(tmp_path))
+    archive = io.BytesIO()
+    with zipfile.ZipFile(archive, "w") as zf:
+        for i in range(3):
+            zf.writestr(f"resume-{i}.txt", sample_resume(i))
+
+    async def run():
+        transport = httpx.ASGITransport(app=create_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            files = {'file': ("cohort.zip", archive.getvalue(), "application/zip")}
+            rejected = await client.post("/api/v1/resume/bulk", params={'concurrency': 0}, files=files)
+            submitted = await client.post("/api/v1/resume/bulk", params={'concurrency': 2}, files=files)
+            job_url = f"/api/v1/resume/bulk/{submitted.json()['id']}"
+            for _ in range(200):
+                status = await client.get(job_url)
+                if status.json()['status'] not in ("pending", "running"):
+                    break
+                await asyncio.sleep(0.01)
+            results = await client.get(f"{job_url}/results")
+
+            monkeypatch.setattr(settings, 'BULK_INGEST_RETENTION_SECONDS', 0)
+            expired = await client.get(job_url)
+            return rejected, submitted, status, results, expired
+
+    rejected, submitted, status, results, expired = asyncio.run(run())
+
+    assert rejected.status_code == 422
+    assert submitted.status_code == 202
+    assert status.json()['status'] == "completed"
+    assert status.json()['parsed'] == 3
+    records = [json.loads(line) for line in results.text.splitlines()]
+    assert sorted(record['source'] for record in records) == ["resume-0.txt", "resume-1.txt", "resume-2.txt"]
+    assert {record['status'] for record in records} == {"ok"}
+    # Past retention the job is forgotten and its archive and results are deleted
+    assert expired.status_code == 404
+    assert list(tmp_path.iterdir()) == []
+
+def test_cross_industry_plan_is_written_back_only_under_exactly_matched_roles(monkeypatch):
+    from app.config import settings
+    from app.core.path_finder import PathFinder
+    from app.services.fake_llm import FakeBackend
+    from app.services.llm_gateway import llm_gateway
+
+    written = []
+
+    async def record(self, current_role, target_role, guidance):
+        written.append((current_role, target_role))
+
+    monkeypatch.setattr(settings, 'CROSS_INDUSTRY_WRITE_BACK', True)
+    monkeypatch.setattr(PathFinder, 'write_back_cross_industry_plan', record)
+
+    async def run():
+        transport = httpx.ASGITransport(app=create_app())
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            responses = []
+            for current_role, target_role, llm_matches in (("software engineer", "Airline Pilot", False),
+                                                           ("sw engineer guy", "Airline Pilot", False),
+                                                           ("Software Engineer", "Pilot in training", True)):
+                llm_gateway.backend = FakeBackend(responses=None if llm_matches else {'match_role': "NONE"})
+                responses.append(await client.post("/api/v1/career-paths", json={
+                    'current_role': current_role, 'target_role': target_role, 'user_skills': ["Python"]
+                }))
+            return responses
+
+    for response in asyncio.run(run()):
+        assert response.json()['paths'][0]['is_cross_industry']
+    # Only the exactly matched current role, under the graph's own title; unmatched
+    # current roles and targets the LLM mapped onto an existing role are not written back
+    assert written == [("Software Engineer", "Airline Pilot")]
@@ -0,0 +1,80 @@
+import asyncio
+import json
+import zipfile
+
+from app.core.bulk_ingest import BulkIngestJob, iter_documents
+from app.models.user import ParsedResume
+from app.services.extraction import SpooledUpload
+from app.services.resume_cache import ResumeParseCache
+
+class StubParser:
+    cache_version = "v1:test"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def parse_resume(self, text: str) -> ParsedResume:
+        self.calls += 1
+        if "broken" in text:
+            raise ValueError("unparseable")
+        return ParsedResume(full_name=text.split()[0], current_role="Engineer", years_total_experience=1,
+                            skills=[], experience=[], education=[], certifications=[], summary=text)
+
+async def _extract(upload: SpooledUpload) -> str:
+    return upload.read_bytes().decode()
+
+def _archive(tmp_path, names):
+    path = tmp_path / "cohort.zip"
+    with zipfile.ZipFile(path, "w") as archive:
+        for name in names:
+            archive.writestr(name, f"{name.split('.')[0]} resume")
+        archive.writestr("notes.md", "not a resume")
+    return str(path)
+
+def _job(source, output, parser, concurrency=3):
+    resume_cache = ResumeParseCache(None, parser, extract=_extract, ttl=60)
+    return BulkIngestJob(source, output, resume_cache, concurrency=concurrency)
+
+def _records(output):
+    with open(output) as f:
+        return [json.loads(line) for line in f]
+
+def test_iter_documents_reads_supported_files_from_archives(tmp_path):
+    source = _archive(tmp_path, ["ada.txt", "grace.txt", "linus.txt"])
+
+    documents = dict(iter_documents(source, max_bytes=1024))
+
+    assert sorted(documents) == ["ada.txt", "grace.txt", "linus.txt"]
+    assert documents["ada.txt"] == b"ada resume"
+
+def test_bulk_ingest_writes_a_record_per_resume(tmp_path):
+    source = _archive(tmp_path, ["ada.txt", "grace.txt", "broken.txt"])
+    output = str(tmp_path / "out.jsonl")
+    job = _job(source, output, StubParser())
+
+    asyncio.run(job.run())
+
+    records = {r['source']: r for r in _records(output)}
+    assert job.status == "completed"
+    assert records["ada.txt"]['resume']['full_name'] == "ada"
+    assert records["broken.txt"]['status'] == "error"
+    snapshot = job.snapshot()
+    assert snapshot['parsed'] == 2 and snapshot['failed'] == 1 and snapshot['remaining'] == 0
+    assert snapshot['stages']['llm_parse']['total'] == 3
+
+def test_rerun_after_crash_skips_parsed_resumes(tmp_path):
+    source = _archive(tmp_path, ["ada.txt", "grace.txt", "linus.txt"])
+    output = str(tmp_path / "out.jsonl")
+    asyncio.run(_job(source, output, StubParser()).run())
+    lines = open(output).read().splitlines()
+    # Crash after the first record, halfway through writing the second
+    with open(output, "w") as f:
+        f.write(lines[0] + "\n" + lines[1][:20])
+
+    parser = StubParser()
+    job = _job(source, output, parser)
+    asyncio.run(job.run())
+
+    assert parser.calls == 2
+    assert job.snapshot()['already_done'] == 1
+    assert sorted(r['source'] for r in _records(output)) == ["ada.txt", "grace.txt", "linus.txt"]
@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fakeredis")
+
+import fakeredis
+import fakeredis.aioredis
+
+from app.services.cache import RedisCache, track_request_round_trips
+
+def _cache(server=None, **kwargs):
+    cache = RedisCache(redis_url="redis://localhost:6379", **kwargs)
+    cache.redis = fakeredis.aioredis.FakeRedis(server=server or fakeredis.FakeServer())
+    return cache
+
+def test_hot_keys_are_served_from_the_local_tier():
+    cache = _cache(local_max_entries=2, local_ttl=30)
+
+    async def run():
+        await cache.set("a", {'n': 1})
+        values = [await cache.get("a") for _ in range(5)]
+        await cache.set("b", 2)
+        await cache.set("c", 3)
+        return values, await cache.get("a")
+
+    values, evicted = asyncio.run(run())
+
+    assert values == [{'n': 1}] * 5
+    assert evicted == {'n': 1}
+    snapshot = cache.snapshot()
+    assert snapshot['local_hits'] == 5 and snapshot['redis_hits'] == 1
+    assert snapshot['local_entries'] == 2 and snapshot['local_evictions'] == 2
+
+def test_writes_invalidate_other_workers_local_copies():
+    server = fakeredis.FakeServer()
+    first = _cache(server, local_max_entries=10, local_ttl=30)
+    second = _cache(server, local_max_entries=10, local_ttl=30)
+
+    async def run():
+        await first.set("plan", "v1")
+        assert await second.get("plan") == "v1"
+        await asyncio.sleep(0.05)
+        await first.set("plan", "v2")
+        for _ in range(50):
+            if second.counts['invalidations_received']:
+                break
+            await asyncio.sleep(0.01)
+        return await second.get("plan")
+
+    assert asyncio.run(run()) == "v2"
+    assert second.snapshot()['redis_hits'] == 2
+
+def test_stale_values_are_served_while_one_refresh_runs():
+    cache = _cache(local_max_entries=10, local_ttl=30)
+    refreshes = []
+
+    async def refresh():
+        refreshes.append(1)
+        await asyncio.sleep(0.02)
+        return "new"
+
+    async def run():
+        await cache.set("plan", "old", expire=60, fresh_for=0)
+        stale = [await cache.get_or_revalidate("plan", refresh, fresh_for=60, expire=60) for _ in range(3)]
+        await asyncio.sleep(0.05)
+        fresh = await cache.get_or_revalidate("plan", refresh, fresh_for=60, expire=60)
+        missing = await cache.get_or_revalidate("other", refresh, fresh_for=60, expire=60)
+        return stale, fresh, missing, await cache.get("plan")
+
+    stale, fresh, missing, plain = asyncio.run(run())
+
+    assert stale == [("old", 'stale')] * 3
+    assert fresh == ("new", 'fresh')
+    assert missing == (None, 'miss')
+    assert plain == "new"
+    assert len(refreshes) == 1
+
+def test_batched_operations_take_one_round_trip_each():
+    server = fakeredis.FakeServer()
+    cache = _cache(server, local_max_entries=100, local_ttl=30)
+    other = _cache(server, local_max_entries=100, local_ttl=30)
+    keys = [f"enrichment:{i}" for i in range(40)]
+
+    async def run():
+        trips = track_request_round_trips()
+        await cache.set_many({key: {'n': i} for i, key in enumerate(keys)}, expire=60)
+        written = trips.count
+        values = await other.get_many(keys + ["missing"])
+        read = trips.count - written
+        await asyncio.sleep(0.05)
+        await cache.delete_many(keys[:10])
+        for _ in range(50):
+            if other.counts['invalidations_received']:
+                break
+            await asyncio.sleep(0.01)
+        return written, read, values, await other.get_many(keys)
+
+    written, read, values, remaining = asyncio.run(run())
+
+    assert written == 1 and read == 1
+    assert values == {key: {'n': i} for i, key in enumerate(keys)}
+    # One message drops all ten deleted keys from the other worker's local tier
+    assert other.counts['invalidations_received'] == 10
+    assert sorted(remaining) == sorted(keys[10:])
@@ -0,0 +1,74 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fakeredis")
+
+import fakeredis
+import fakeredis.aioredis
+
+from app.services.cache import RedisCache, track_request_round_trips
+from app.services.cache_versions import CacheVersions
+from benchmarks.standins import InMemoryCareerGraph
+
+def _versions(server):
+    cache = RedisCache(redis_url="redis://localhost:6379", local_max_entries=100, local_ttl=30)
+    cache.redis = fakeredis.aioredis.FakeRedis(server=server)
+    versions = CacheVersions(cache)
+    versions.sync_redis = fakeredis.FakeRedis(server=server)
+    return versions
+
+def test_bumping_a_namespace_changes_only_the_keys_that_depend_on_it():
+    versions = _versions(fakeredis.FakeServer())
+    versions.register('embeddings', "minilm")
+
+    async def run():
+        before = await versions.tag('graph', 'embeddings'), await versions.tag('prompts')
+        await versions.tag('graph', 'embeddings')
+        trips = track_request_round_trips()
+        await versions.tag('graph', 'embeddings')
+        cached_read = trips.count
+        await versions.bump('graph')
+        return before, cached_read, (await versions.tag('graph', 'embeddings'), await versions.tag('prompts'))
+
+    before, cached_read, after = asyncio.run(run())
+
+    assert before == ("g0.e0-minilm", "p0")
+    # Counters are served by the local tier once they have been read
+    assert cached_read == 0
+    assert after == ("g1.e0-minilm", "p0")
+
+def test_graph_writes_invalidate_other_workers():
+    server = fakeredis.FakeServer()
+    api, other = _versions(server), _versions(server)
+    graph = InMemoryCareerGraph(on_write=lambda: api.bump_blocking('graph'))
+
+    async def run():
+        before = await other.tag('graph')
+        await asyncio.sleep(0.05)
+        await asyncio.to_thread(graph.add_generated_path, "Chef", "Data Analyst", [{'title': "Analyst"}],
+                                provenance="test", difficulty=5, success_rate=0.5)
+        for _ in range(50):
+            if other.cache.counts['invalidations_received']:
+                break
+            await asyncio.sleep(0.01)
+        return before, await other.tag('graph')
+
+    assert asyncio.run(run()) == ("g0", "g1")
+
+def test_last_known_versions_are_used_while_redis_is_down():
+    versions = _versions(fakeredis.FakeServer())
+
+    async def run():
+        await versions.bump('prompts')
+        await versions.tag('prompts')
+        versions.cache.local.clear()
+
+        async def down(*args, **kwargs):
+            raise ConnectionError("redis down")
+
+        versions.cache.redis.mget = versions.cache.redis.get = down
+        return await versions.tag('prompts')
+
+    assert asyncio.run(run()) == "p1"
+    assert versions.snapshot()['read_failures'] == 1
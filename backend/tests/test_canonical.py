@@ -0,0 +1,9 @@
+from app.utils.canonical import canonical_role, canonical_skills, skill_bucket
+
+def test_roles_normalize_case_separators_and_whitespace():
+    assert canonical_role("  Senior_Backend-Dev ") == "senior backend dev"
+
+def test_skill_bucket_ignores_order_case_and_duplicates():
+    assert canonical_skills(["SQL", "python", "Python "]) == ["python", "sql"]
+    assert skill_bucket(["Python", "SQL"]) == skill_bucket(["sql", "python", "PYTHON"])
+    assert skill_bucket(["Python"]) != skill_bucket(["Python", "SQL"])
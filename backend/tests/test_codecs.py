@@ -0,0 +1,78 @@
+import asyncio
+import json
+
+import pytest
+
+from app.services import codecs
+from app.services.codecs import FRAMED, ValueSerializer, load_serializer
+
+VALUE = {
+    'paths': [{'roles': ["Junior Engineer", "Senior Engineer"], 'score': 0.82, 'transitions': []}] * 40,
+    'recommended_path': None,
+    'skill_gaps': [{'match_percentage': 55, 'missing_skills': ["Kubernetes"]}]
+}
+
+def _available(factories):
+    names = []
+    for name, factory in factories.items():
+        try:
+            factory()
+        except ImportError:
+            continue
+        names.append(name)
+    return names
+
+@pytest.mark.parametrize("codec", _available(codecs.CODECS))
+@pytest.mark.parametrize("compression", [None] + _available(codecs.COMPRESSIONS))
+def test_values_round_trip(codec, compression):
+    serializer = ValueSerializer(codec, compression, compress_min_bytes=256)
+
+    stored = serializer.dumps(VALUE)
+
+    assert stored[0] & FRAMED
+    # Any serializer reads any format
+    assert ValueSerializer().loads(stored) == VALUE
+    if compression:
+        assert len(stored) < len(json.dumps(VALUE))
+
+def test_small_payloads_are_not_compressed():
+    serializer = ValueSerializer('json', 'zlib', compress_min_bytes=1024)
+
+    stored = serializer.dumps({'a': 1})
+
+    assert stored == bytes([FRAMED]) + b'{"a": 1}'
+
+def test_plain_json_written_before_framing_still_decodes():
+    serializer = ValueSerializer('json', 'zlib')
+
+    assert serializer.loads(b'{"a": [1, 2]}') == {'a': [1, 2]}
+    assert serializer.loads('"text"') == "text"
+
+def test_missing_libraries_fall_back(monkeypatch):
+    def missing():
+        raise ImportError("not installed")
+
+    monkeypatch.setitem(codecs.CODECS, 'msgpack', missing)
+    monkeypatch.setitem(codecs.COMPRESSIONS, 'lz4', missing)
+
+    serializer = load_serializer('msgpack', 'lz4', 1024)
+
+    assert serializer.name == "json+zlib"
+
+def test_cache_reads_entries_written_as_json_text():
+    pytest.importorskip("fakeredis")
+    import fakeredis.aioredis
+    from app.services.cache import RedisCache
+
+    cache = RedisCache("redis://localhost:6379", serializer=ValueSerializer('json', 'zlib', compress_min_bytes=16))
+    cache.redis = fakeredis.aioredis.FakeRedis()
+
+    async def run():
+        await cache.redis.set("old", json.dumps({'legacy': True}))
+        await cache.set("new", VALUE)
+        return await cache.get("old"), await cache.get("new")
+
+    old, new = asyncio.run(run())
+
+    assert old == {'legacy': True} and new == VALUE
+    assert cache.snapshot()['compression_ratio'] < 1
@@ -0,0 +1,53 @@
+import json
+import os
+import subprocess
+import sys
+
+from app.api import deps
+
+BACKEND = os.path.join(os.path.dirname(__file__), '..')
+
+SLIM_WORKER = """
+import asyncio, json, sys
+import httpx
+import app.main as main
+
+async def run():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return (await client.get("/health")).status_code, (await client.get("/metrics")).json()
+
+health, metrics = asyncio.run(run())
+print(json.dumps({
+    'health': health,
+    'metrics': sorted(metrics),
+    'routes': sorted(route.path for route in main.app.routes),
+    'loaded': [name for name in ('neo4j', 'google.generativeai', 'app.services.llm_gateway') if name in sys.modules]
+}))
+"""
+
+def test_slim_worker_never_loads_the_llm_or_the_graph_driver():
+    env = {**os.environ, 'API_ROUTERS': "skills"}
+    output = subprocess.run([sys.executable, "-c", SLIM_WORKER], cwd=BACKEND, env=env,
+                            capture_output=True, text=True, check=True).stdout
+    report = json.loads(output.strip().splitlines()[-1])
+
+    assert report['health'] == 200
+    assert "/api/v1/skills/similar/{skill_name}" in report['routes']
+    assert "/api/v1/career-paths" not in report['routes']
+    assert report['loaded'] == []
+    # Only telemetry: no service has been created
+    assert 'llm_gateway' not in report['metrics'] and 'cache' not in report['metrics']
+
+def test_shared_provider_creates_its_service_once():
+    calls = []
+
+    @deps.shared
+    def get_test_service():
+        calls.append(1)
+        return object()
+
+    assert deps.created(get_test_service) is None
+    assert get_test_service() is get_test_service()
+    assert deps.created(get_test_service) is get_test_service()
+    assert len(calls) == 1
@@ -0,0 +1,134 @@
+import asyncio
+import json
+
+import pytest
+
+from app.core.enrichment import enrich_transitions, pack_batches, parse_batch_response
+from app.services.llm_executor import LLMExecutor
+from app.services.llm_gateway import LLMGateway, LLMResult
+from app.services.single_flight import SingleFlight
+
+class StubBackend:
+    """Answers batch prompts for every id except ``drop`` and per-step prompts with one resource"""
+
+    name = "stub"
+
+    def __init__(self, drop=()):
+        self.prompts = []
+        self.drop = set(drop)
+
+    def generate(self, prompt, site, prefix=""):
+        self.prompts.append(prompt)
+        if "TRANSITIONS:" in prompt:
+            listed = json.loads(prompt.split("TRANSITIONS:\n")[1].split("\n\nReturn ONE")[0])
+            answer = {
+                t['id']: {'learning_resources': [{'title': f"{t['to_role']} course"}], 'certifications': [], 'practical_projects': []}
+                for t in listed if t['to_role'] not in self.drop
+            }
+            return LLMResult("```json\n" + json.dumps(answer) + "\n```")
+        return LLMResult(json.dumps({'learning_resources': [{'title': 'single'}]}))
+
+def _gateway(backend):
+    return LLMGateway(backend, LLMExecutor(max_concurrency=4, rate_per_minute=60000, burst=100), SingleFlight())
+
+def _step(from_role, to_role, skills=("Python",)):
+    return {'from_role': from_role, 'to_role': to_role, 'required_skills': list(skills)}
+
+def test_batched_mode_uses_one_call_for_unique_transitions():
+    backend = StubBackend()
+    steps = [_step("A", "B"), _step("B", "C"), _step("A", "B")]
+
+    results = asyncio.run(enrich_transitions(_gateway(backend), steps, ["SQL"], mode="batched"))
+
+    assert len(backend.prompts) == 1
+    assert results[0] == results[2]
+    assert results[1]['learning_resources'] == [{'title': 'C course'}]
+
+def test_unparsed_batch_items_fall_back_to_per_step_calls():
+    backend = StubBackend(drop={"C"})
+    steps = [_step("A", "B"), _step("B", "C")]
+
+    results = asyncio.run(enrich_transitions(_gateway(backend), steps, [], mode="batched"))
+
+    assert len(backend.prompts) == 2
+    assert results[1]['learning_resources'] == [{'title': 'single'}]
+    assert results[1]['certifications'] == []
+
+def test_pack_batches_respects_token_budget():
+    steps = [_step("A", str(i)) for i in range(5)]
+
+    batches = pack_batches(steps, token_budget=1500)
+
+    assert [len(b) for b in batches] == [2, 2, 1]
+
+def test_parse_batch_response_rejects_malformed_json():
+    assert parse_batch_response("not json", 2) == {}
+
+def test_precomputed_enrichment_skips_live_calls(tmp_path):
+    from app.services.enrichment_store import EnrichmentStore
+
+    store = EnrichmentStore(str(tmp_path / "enrichment.sqlite3"), prompt_version="v1", model="m")
+    store.put("A", "B", {'learning_resources': [{'title': 'stored'}]})
+    backend = StubBackend()
+
+    results = asyncio.run(enrich_transitions(_gateway(backend), [_step("A", "B"), _step("B", "C")], [], mode="per_step", store=store))
+
+    assert results[0]['learning_resources'] == [{'title': 'stored'}]
+    assert results[1]['learning_resources'] == [{'title': 'single'}]
+    assert len(backend.prompts) == 1
+
+def test_store_versions_are_isolated(tmp_path):
+    from app.services.enrichment_store import EnrichmentStore
+
+    path = str(tmp_path / "enrichment.sqlite3")
+    EnrichmentStore(path, prompt_version="v1", model="m").put("A", "B", {'certifications': []})
+
+    assert EnrichmentStore(path, prompt_version="v2", model="m").get("A", "B") is None
+    assert EnrichmentStore(path, prompt_version="v1", model="m").completed_pairs() == [("A", "B")]
+
+def test_live_enrichment_is_cached_per_skill_set():
+    pytest.importorskip("fakeredis")
+    import fakeredis.aioredis
+    from app.services.cache import RedisCache
+
+    cache = RedisCache("redis://localhost:6379")
+    cache.redis = fakeredis.aioredis.FakeRedis()
+    backend = StubBackend()
+    gateway = _gateway(backend)
+    steps = [_step("A", "B"), _step("B", "C")]
+
+    async def run():
+        first = await enrich_transitions(gateway, steps, ["SQL"], mode="per_step", cache=cache)
+        second = await enrich_transitions(gateway, steps, ["SQL"], mode="per_step", cache=cache)
+        calls = len(backend.prompts)
+        await enrich_transitions(gateway, steps, ["Go"], mode="per_step", cache=cache)
+        return first, second, calls
+
+    first, second, calls = asyncio.run(run())
+
+    assert first == second
+    assert calls == 2
+    assert len(backend.prompts) == 4
+
+def test_empty_live_enrichment_is_not_cached():
+    pytest.importorskip("fakeredis")
+    import fakeredis.aioredis
+    from app.services.cache import RedisCache
+
+    class GarbageBackend(StubBackend):
+        def generate(self, prompt, site, prefix=""):
+            self.prompts.append(prompt)
+            return LLMResult("Sorry, I can't help with that {")
+
+    cache = RedisCache("redis://localhost:6379")
+    cache.redis = fakeredis.aioredis.FakeRedis()
+    backend = GarbageBackend()
+    gateway = _gateway(backend)
+
+    async def run():
+        first = await enrich_transitions(gateway, [_step("A", "B")], ["SQL"], mode="per_step", cache=cache)
+        await enrich_transitions(gateway, [_step("A", "B")], ["SQL"], mode="per_step", cache=cache)
+        return first
+
+    assert asyncio.run(run())[0]['learning_resources'] == []
+    assert len(backend.prompts) == 2
@@ -0,0 +1,107 @@
+import asyncio
+import io
+import os
+import time
+
+import pytest
+from starlette.datastructures import UploadFile
+
+from app.services.extraction import (
+    DocumentExtractor, ExtractionTimeout, SpooledUpload, UploadTooLarge, spool_upload
+)
+from app.utils.pdf_parser import extract_text, sniff_format
+from benchmarks.pdf_extraction import synthetic_pdf
+
+def _slow_worker(*args):
+    time.sleep(5)
+    return ""
+
+def test_small_uploads_stay_in_memory_and_large_ones_spool_to_disk():
+    async def run(size):
+        return await spool_upload(UploadFile(io.BytesIO(b"x" * size), filename="a.pdf"),
+                                  max_bytes=1024 * 1024, spool_threshold=100 * 1024)
+
+    small = asyncio.run(run(10))
+    large = asyncio.run(run(300 * 1024))
+
+    assert small.data == b"x" * 10 and small.path is None
+    assert large.data is None and os.path.getsize(large.path) == 300 * 1024
+    assert large.digest == SpooledUpload.from_bytes(b"x" * 300 * 1024, "a.pdf").digest
+    large.cleanup()
+    assert large.path is None
+
+def test_upload_over_the_cap_is_rejected():
+    upload = UploadFile(io.BytesIO(b"x" * 2048), filename="a.pdf")
+
+    with pytest.raises(UploadTooLarge):
+        asyncio.run(spool_upload(upload, max_bytes=1024, spool_threshold=512))
+
+def test_pdf_is_extracted_in_a_worker_process():
+    extractor = DocumentExtractor(max_workers=1, max_pending=2, timeout=30, max_pages=2)
+    try:
+        pdf = synthetic_pdf([f"page {i}" for i in range(5)])
+        text = asyncio.run(extractor.extract(SpooledUpload.from_bytes(pdf, "resume.pdf")))
+    finally:
+        extractor.shutdown()
+
+    assert "page 1" in text and "page 2" not in text
+    assert extractor.stats['extracted'] == 1
+
+def test_timeout_kills_the_worker_without_blocking_the_loop():
+    extractor = DocumentExtractor(max_workers=1, max_pending=2, timeout=1.0, max_pages=2, worker=_slow_worker)
+
+    async def run():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        try:
+            with pytest.raises(ExtractionTimeout):
+                await extractor.extract(SpooledUpload.from_bytes(b"%PDF", "slow.pdf"))
+        finally:
+            task.cancel()
+        return ticks
+
+    started = time.perf_counter()
+    try:
+        ticks = asyncio.run(run())
+    finally:
+        extractor.shutdown()
+
+    assert time.perf_counter() - started < 4
+    assert ticks > 20
+    assert extractor.stats['timeouts'] == 1 and extractor.stats['pool_restarts'] == 1
+
+def test_format_is_sniffed_from_content():
+    pdf = synthetic_pdf(["Ada Lovelace"])
+
+    assert sniff_format(pdf[:1024], "RESUME.PDF") == 'pdf'
+    assert sniff_format(pdf[:1024], "resume") == 'pdf'
+    assert sniff_format(b"Ada Lovelace", "resume.pdf") == 'pdf'
+    assert sniff_format(b"Ada Lovelace", "resume.txt") == 'text'
+    assert "Ada Lovelace" in extract_text(pdf, "RESUME.PDF")
+
+def test_extraction_stops_at_page_and_character_limits():
+    pdf = synthetic_pdf([f"page {i} " + "x" * 100 for i in range(10)])
+
+    assert extract_text(pdf, max_pages=3).count("page ") == 3
+    assert len(extract_text(pdf, max_chars=250)) == 250
+    assert "page 3" not in extract_text(pdf, max_chars=250)
+
+def test_parallel_pages_match_sequential_extraction():
+    pages = [f"page {i} " + "word " * (5 if i % 3 else 80) for i in range(12)]
+    pdf = synthetic_pdf(pages)
+    extractor = DocumentExtractor(max_workers=3, max_pending=2, timeout=30, max_pages=10, max_chars=900,
+                                  parallel_min_bytes=1)
+    try:
+        text = asyncio.run(extractor.extract(SpooledUpload.from_bytes(pdf, "resume.pdf")))
+    finally:
+        extractor.shutdown()
+
+    assert extractor.stats['parallel'] == 1
+    assert text == extract_text(pdf, max_pages=10, max_chars=900)
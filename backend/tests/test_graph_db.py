@@ -0,0 +1,116 @@
+import asyncio
+
+from app.core.enrichment import iter_enrichments
+from app.core.path_finder import PathFinder
+from app.services.enrichment_store import EnrichmentStore
+from app.services.graph_db import GENERATED_ROLE_PREFIX, CareerGraphDB
+
+class FakeSession:
+    """Neo4j session that resolves role MERGEs against ``existing`` titles and records every query"""
+
+    def __init__(self, existing):
+        self.existing = existing
+        self.queries = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def run(self, query, **params):
+        self.queries.append((query, params))
+        if "MERGE (r:Role {title: $title})" in query:
+            return FakeResult({'id': self.existing.setdefault(params['title'], params['id'])})
+        return FakeResult({'id': params.get('id')})
+
+class FakeResult:
+    def __init__(self, record):
+        self.record = record
+
+    def single(self):
+        return self.record
+
+class FakeDriver:
+    def __init__(self, existing):
+        self.sessions = []
+        self.existing = existing
+
+    def session(self):
+        self.sessions.append(FakeSession(self.existing))
+        return self.sessions[-1]
+
+def _graph(existing=None):
+    graph = object.__new__(CareerGraphDB)
+    graph.driver = FakeDriver(dict(existing or {}))
+    graph.llm = None
+    graph.on_write = None
+    return graph
+
+def _plan(step_title, resource):
+    return {
+        'transition_steps': [{'title': step_title, 'duration_months': 6,
+                              'learning_resources': [{'title': resource}]}],
+        'difficulty_rating': 6,
+        'realistic_success_rate': 40
+    }
+
+def test_generated_plans_with_the_same_step_title_get_their_own_roles():
+    graph = _graph({'Nurse': 'nurse'})
+
+    first = graph.add_generated_path("Nurse", "Data Analyst", [{'title': "Bootcamp"}], "llm:test", 6, 0.4)
+    second = graph.add_generated_path("Teacher", "Data Analyst", [{'title': "Bootcamp"}], "llm:test", 6, 0.4)
+
+    # Existing endpoints keep their id, new ones are created once and shared by both plans
+    assert first[0] == "nurse"
+    assert first[-1] == second[-1]
+    assert first[-1].startswith(GENERATED_ROLE_PREFIX)
+    assert first[1] != second[1]
+    assert all(role_id.startswith(GENERATED_ROLE_PREFIX) for role_id in (first[1], second[1], second[0]))
+
+def test_last_step_named_after_the_target_is_the_target():
+    graph = _graph({'Data Analyst': 'data-analyst'})
+
+    role_ids = graph.add_generated_path("Nurse", "Data Analyst", [{'title': "Bootcamp"}, {'title': "data analyst"}],
+                                        "llm:test", 6, 0.4)
+
+    assert len(role_ids) == 3
+    assert role_ids[-1] == "data-analyst"
+
+def test_write_back_keeps_each_plans_resources(tmp_path):
+    store = EnrichmentStore(str(tmp_path / "enrichment.sqlite3"), prompt_version="v1", model="m")
+    graph = _graph()
+    finder = PathFinder(graph, skill_db=None, llm=None, cache=None, versions=None, enrichment_store=store)
+
+    asyncio.run(finder.write_back_cross_industry_plan("Nurse", "Data Analyst", _plan("Bootcamp", "SQL for nurses")))
+    asyncio.run(finder.write_back_cross_industry_plan("Teacher", "Data Analyst", _plan("Bootcamp", "SQL for teachers")))
+
+    nurse_ids = graph.add_generated_path("Nurse", "Data Analyst", [{'title': "Bootcamp"}], "llm:test", 6, 0.4)
+    teacher_ids = graph.add_generated_path("Teacher", "Data Analyst", [{'title': "Bootcamp"}], "llm:test", 6, 0.4)
+    # Graph transitions carry role ids, which is how the stored resources are found again
+    steps = [
+        {'from_role': title, 'to_role': "Bootcamp", 'from_role_id': ids[0], 'to_role_id': ids[1], 'required_skills': []}
+        for title, ids in (("Nurse", nurse_ids), ("Teacher", teacher_ids))
+    ]
+
+    async def collect():
+        return [data async for _, data in iter_enrichments(None, steps, [], store=store)]
+
+    nurse, teacher = asyncio.run(collect())
+    assert nurse['learning_resources'] == [{'title': "SQL for nurses"}]
+    assert teacher['learning_resources'] == [{'title': "SQL for teachers"}]
+    assert ("Bootcamp", "Data Analyst") not in store.completed_pairs()
+
+def test_generated_plan_is_one_write_in_one_session():
+    graph = _graph()
+    writes = []
+    graph.on_write = lambda: writes.append(1)
+    steps = [{'title': "Bootcamp", 'skills_to_acquire': ["SQL", "Power BI"]},
+             {'title': "Junior Analyst", 'skills_to_acquire': ["Excel"]}]
+
+    graph.add_generated_path("Nurse", "Data Analyst", steps, "llm:test", 6, 0.4)
+
+    assert writes == [1]
+    assert len(graph.driver.sessions) == 1
+    skill_queries = [params for query, params in graph.driver.sessions[0].queries if "REQUIRES_SKILL" in query]
+    assert [params['skill_name'] for params in skill_queries] == ["SQL", "Power BI", "Excel"]
@@ -0,0 +1,136 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fakeredis")
+
+import fakeredis.aioredis
+
+from app.core.jobs import IdempotencyConflict, JobQueueFull, JobRunner, JobStore
+from app.services.cache import RedisCache
+
+def _store(stale_after=30):
+    cache = RedisCache(redis_url="redis://localhost:6379")
+    cache.redis = fakeredis.aioredis.FakeRedis()
+    return JobStore(cache, ttl=60, stale_after=stale_after)
+
+async def _wait(store, job_id):
+    for _ in range(100):
+        record = await store.get(job_id)
+        if record['status'] in ('succeeded', 'failed'):
+            return record
+        await asyncio.sleep(0.01)
+    raise AssertionError("job did not finish")
+
+def test_runner_limits_concurrency_and_stores_results():
+    store = _store()
+    runner = JobRunner(store, concurrency=2, max_pending=10, heartbeat_seconds=1)
+    running, peak = [0], [0]
+
+    async def work(value):
+        running[0] += 1
+        peak[0] = max(peak[0], running[0])
+        await asyncio.sleep(0.02)
+        running[0] -= 1
+        return {'value': value}
+
+    async def run():
+        ids = []
+        for i in range(5):
+            runner.reserve()
+            record, created = await store.create('test', fingerprint=str(i))
+            runner.submit(record, lambda i=i: work(i))
+            ids.append(record['id'])
+        return [await _wait(store, job_id) for job_id in ids]
+
+    records = asyncio.run(run())
+
+    assert [r['result']['value'] for r in records] == [0, 1, 2, 3, 4]
+    assert peak[0] == 2
+    assert runner.snapshot()['succeeded'] == 5 and runner.pending == 0
+
+def test_failed_jobs_keep_the_error_status():
+    store = _store()
+    runner = JobRunner(store, concurrency=1, max_pending=1, heartbeat_seconds=1)
+
+    class Rejected(Exception):
+        status_code = 422
+        detail = "unreadable resume"
+
+    async def work():
+        raise Rejected()
+
+    async def run():
+        runner.reserve()
+        record, _ = await store.create('test', fingerprint="x")
+        with pytest.raises(JobQueueFull):
+            runner.reserve()
+        runner.submit(record, work)
+        return await _wait(store, record['id'])
+
+    record = asyncio.run(run())
+
+    assert record['error'] == {'status_code': 422, 'detail': "unreadable resume"}
+
+def test_idempotency_key_returns_the_same_job():
+    store = _store()
+
+    async def run():
+        first, created = await store.create('test', fingerprint="a", idempotency_key="k1")
+        again, created_again = await store.create('test', fingerprint="a", idempotency_key="k1")
+        with pytest.raises(IdempotencyConflict):
+            await store.create('test', fingerprint="b", idempotency_key="k1")
+        return first, created, again, created_again
+
+    first, created, again, created_again = asyncio.run(run())
+
+    assert created and not created_again
+    assert again['id'] == first['id']
+
+def test_duplicate_request_writes_nothing():
+    store = _store()
+
+    async def run():
+        first, _ = await store.create('test', fingerprint="a", idempotency_key="k1")
+        await store.create('test', fingerprint="a", idempotency_key="k1")
+        return first, sorted(key.decode() for key in await store.cache.redis.keys("job:*"))
+
+    first, keys = asyncio.run(run())
+
+    assert keys == [store.key(first['id']), store.alive_key(first['id'])]
+
+def test_duplicate_request_waits_for_the_claimed_job_to_be_written():
+    store = _store()
+
+    async def run():
+        claimer, _ = await store.create('test', fingerprint="a")
+        # Claimed, but the claimer has not written its job yet
+        await store.cache.add(store.idempotency_key('test', "k1"), claimer['id'])
+        await store.cache.delete_many([store.key(claimer['id'])])
+
+        async def write_late():
+            await asyncio.sleep(0.05)
+            await store.save(claimer)
+
+        writer = asyncio.ensure_future(write_late())
+        again, created = await store.create('test', fingerprint="a", idempotency_key="k1")
+        await writer
+        return claimer, again, created
+
+    claimer, again, created = asyncio.run(run())
+
+    assert not created
+    assert again['id'] == claimer['id']
+
+def test_jobs_without_a_live_worker_are_reported_lost():
+    store = _store(stale_after=1)
+
+    async def run():
+        record, _ = await store.create('test', fingerprint="x")
+        await store.cache.delete(store.alive_key(record['id']))
+        return await store.get(record['id'])
+
+    record = asyncio.run(run())
+
+    assert record['status'] == 'failed'
+    assert "lost" in record['error']['detail']
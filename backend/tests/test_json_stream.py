@@ -0,0 +1,48 @@
+import json
+
+from app.utils.json_stream import JSONStreamParser, recover_json
+
+PLAN = {
+    'is_feasible': True,
+    'transition_steps': [
+        {'step': 1, 'title': 'Foundations', 'skills_to_acquire': ['A', 'B "quoted" }']},
+        {'step': 2, 'title': 'Entry role', 'estimated_salary': 75000.5, 'remote': None}
+    ],
+    'challenges': ['x']
+}
+
+def test_stream_parser_reports_elements_as_they_complete():
+    text = "```json\n" + json.dumps(PLAN, indent=2) + "\n```"
+    parser = JSONStreamParser([('transition_steps', '*')])
+
+    seen = []
+    for i in range(0, len(text), 5):
+        for path, value in parser.feed(text[i:i + 5]):
+            seen.append((path, value, len(parser.text)))
+
+    assert [value for _, value, _ in seen] == PLAN['transition_steps']
+    assert [path for path, _, _ in seen] == [('transition_steps', 0), ('transition_steps', 1)]
+    # Each step is reported as soon as it closes, before the answer is complete
+    assert seen[0][2] < seen[1][2] < len(text)
+    assert parser.result() == (PLAN, True)
+
+def test_recover_json_keeps_complete_prefix_of_truncated_answer():
+    text = json.dumps(PLAN)
+    cut = text.index('"Entry role"') + 4
+
+    data, complete = recover_json("```json\n" + text[:cut])
+
+    assert not complete
+    assert data == {'is_feasible': True, 'transition_steps': [PLAN['transition_steps'][0]]}
+
+def test_recover_json_stops_at_a_malformed_character():
+    text = json.dumps(PLAN).replace('"challenges"', 'challenges')
+
+    data, complete = recover_json(text)
+
+    assert not complete
+    assert data['transition_steps'] == PLAN['transition_steps']
+    assert 'challenges' not in data
+
+def test_recover_json_without_json():
+    assert recover_json("Sorry, I can't help with that.") == (None, False)
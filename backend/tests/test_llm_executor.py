@@ -0,0 +1,94 @@
+import asyncio
+import threading
+import time
+
+from google.api_core import exceptions as google_exceptions
+
+from app.services.llm_executor import LLMExecutor, TokenBucket
+
+def test_token_bucket_allows_burst_then_throttles():
+    bucket = TokenBucket(rate_per_minute=600, burst=2)  # one token per 0.1s
+
+    assert bucket.acquire() < 0.01
+    assert bucket.acquire() < 0.01
+    assert bucket.acquire() > 0.05
+
+def test_concurrency_is_bounded_by_pool_size():
+    executor = LLMExecutor(max_concurrency=2, rate_per_minute=60000, burst=100)
+    lock = threading.Lock()
+    state = {'running': 0, 'peak': 0}
+
+    def call():
+        with lock:
+            state['running'] += 1
+            state['peak'] = max(state['peak'], state['running'])
+        time.sleep(0.02)
+        with lock:
+            state['running'] -= 1
+        return "ok"
+
+    async def run():
+        return await asyncio.gather(*[executor.run(call) for _ in range(6)])
+
+    assert asyncio.run(run()) == ["ok"] * 6
+    assert state['peak'] == 2
+    snapshot = executor.snapshot()
+    assert snapshot['calls'] == 6
+    assert snapshot['queue_depth'] == 0
+    assert snapshot['queue_wait_seconds']['count'] == 6
+
+def test_retries_rate_limit_errors_with_backoff():
+    executor = LLMExecutor(max_concurrency=1, rate_per_minute=60000, burst=100,
+                           max_retries=3, base_delay=0.001, max_delay=0.01)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise google_exceptions.ResourceExhausted("quota exceeded")
+        return "done"
+
+    assert executor.run_sync(flaky) == "done"
+    assert executor.snapshot()['retries'] == 2
+
+def test_non_retryable_errors_fail_fast():
+    executor = LLMExecutor(max_concurrency=1, rate_per_minute=60000, burst=100, base_delay=0.001)
+    attempts = []
+
+    def broken():
+        attempts.append(1)
+        raise ValueError("bad prompt")
+
+    try:
+        executor.run_sync(broken)
+    except ValueError:
+        pass
+    assert len(attempts) == 1
+    assert executor.snapshot()['failures'] == 1
+
+def test_backoff_does_not_hold_a_pool_worker():
+    executor = LLMExecutor(max_concurrency=1, rate_per_minute=60000, burst=100, max_retries=1)
+    executor._backoff = lambda attempt: 0.3
+    finished = []
+
+    def throttled():
+        if not finished:
+            finished.append("throttled attempt")
+            raise google_exceptions.ResourceExhausted("quota exceeded")
+        finished.append("throttled")
+        return "throttled"
+
+    def quick():
+        finished.append("quick")
+        return "quick"
+
+    async def run():
+        first = asyncio.ensure_future(executor.run(throttled))
+        await asyncio.sleep(0.05)
+        # The only worker is free while the first call backs off
+        assert executor.snapshot()['in_flight'] == 0
+        second = await asyncio.wait_for(executor.run(quick), timeout=0.2)
+        return await first, second
+
+    assert asyncio.run(run()) == ("throttled", "quick")
+    assert finished == ["throttled attempt", "quick", "throttled"]
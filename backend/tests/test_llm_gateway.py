@@ -0,0 +1,143 @@
+import asyncio
+import json
+import threading
+
+from app.models.user import ParsedResume
+from app.services.fake_llm import FakeBackend
+from app.services.llm_executor import LLMExecutor
+from app.services.llm_gateway import GeminiBackend, LLMGateway, LLMResult
+from app.services.single_flight import SingleFlight
+
+def _gateway(backend):
+    return LLMGateway(backend, LLMExecutor(max_concurrency=4, rate_per_minute=60000, burst=100), SingleFlight())
+
+def test_gateway_records_sizes_and_tokens_per_site():
+    gateway = _gateway(FakeBackend())
+
+    text = asyncio.run(gateway.generate("Resume text:\n\nJane Doe", site="parse_resume"))
+
+    ParsedResume(**json.loads(text))
+    stats = gateway.snapshot()['sites']['parse_resume']
+    assert stats['calls'] == 1
+    assert stats['prompt_chars'] == len("Resume text:\n\nJane Doe")
+    assert stats['response_chars'] == len(text)
+    assert stats['output_tokens'] > 0
+    assert stats['latency_seconds']['count'] == 1
+
+def test_fake_backend_matches_roles_and_batches_deterministically():
+    backend = FakeBackend()
+    prompt = 'CANDIDATE ROLES (2 total):\n1. Data Analyst\n2. Senior Backend Developer\n\nUSER INPUT: "senior backend dev"\n'
+
+    assert backend.generate(prompt, "match_role").text == "Senior Backend Developer"
+    batch = json.loads(backend.generate('[{"id": "t0"}, {"id": "t1"}]', "enrich_batch").text)
+    assert sorted(batch) == ["t0", "t1"]
+
+def test_canned_responses_override_defaults():
+    gateway = _gateway(FakeBackend(responses={'cross_industry': '{"is_feasible": false}'}))
+
+    assert asyncio.run(gateway.generate("plan", site="cross_industry")) == '{"is_feasible": false}'
+
+class GatedStreamBackend:
+    """Streams ``chunks``, holding everything after the first until ``release`` is set"""
+
+    name = "gated"
+
+    def __init__(self, chunks=("a", "b", "c")):
+        self.chunks = chunks
+        self.calls = 0
+        self.sent = 0
+        self.release = threading.Event()
+        self.done = threading.Event()
+
+    def stream(self, prompt, site, on_chunk, prefix=""):
+        self.calls += 1
+        try:
+            for i, chunk in enumerate(self.chunks):
+                if i == 1:
+                    self.release.wait(5)
+                if not on_chunk(chunk):
+                    break
+                self.sent += 1
+        finally:
+            self.done.set()
+        return LLMResult("".join(self.chunks[:self.sent]))
+
+def test_identical_streams_share_one_generation():
+    backend = GatedStreamBackend()
+    gateway = _gateway(backend)
+
+    async def read():
+        return "".join([chunk async for chunk in gateway.stream("plan", site="cross_industry")])
+
+    async def main():
+        leader = asyncio.ensure_future(read())
+        await asyncio.sleep(0.05)
+        # Joins after the first chunk and still gets the whole text
+        follower = asyncio.ensure_future(read())
+        await asyncio.sleep(0.05)
+        backend.release.set()
+        return await asyncio.gather(leader, follower)
+
+    assert asyncio.run(main()) == ["abc", "abc"]
+    assert backend.calls == 1
+    assert gateway.flight.snapshot()['sites']['cross_industry'] == {'calls': 2, 'executed': 1, 'coalesced': 1}
+
+def test_stream_generation_stops_only_when_its_last_subscriber_leaves():
+    backend = GatedStreamBackend()
+    gateway = _gateway(backend)
+
+    async def main():
+        leader = gateway.stream("plan", site="cross_industry")
+        follower = gateway.stream("plan", site="cross_industry")
+        assert await leader.__anext__() == "a"
+        assert await follower.__anext__() == "a"
+
+        await leader.aclose()
+        backend.release.set()
+        rest = [chunk async for chunk in follower]
+        assert rest == ["b", "c"]
+
+        lone = GatedStreamBackend()
+        gateway.backend = lone
+        stream = gateway.stream("plan", site="cross_industry")
+        assert await stream.__anext__() == "a"
+        await stream.aclose()
+        lone.release.set()
+        await asyncio.to_thread(lone.done.wait, 5)
+        return lone
+
+    lone = asyncio.run(main())
+    assert backend.sent == 3
+    assert lone.sent == 1
+
+def test_context_cache_is_created_without_holding_up_other_calls(monkeypatch):
+    import types
+
+    import google.generativeai as genai
+
+    slow_prefix, other_prefix = "a" * 400, "b" * 400
+    started, release = threading.Event(), threading.Event()
+
+    class CachedContent:
+        @staticmethod
+        def create(model, contents, ttl):
+            if contents == [slow_prefix]:
+                started.set()
+                release.wait(5)
+            return contents[0]
+
+    monkeypatch.setattr(genai, 'caching', types.SimpleNamespace(CachedContent=CachedContent), raising=False)
+    monkeypatch.setattr(genai.GenerativeModel, 'from_cached_content',
+                        classmethod(lambda cls, cached_content: f"model:{cached_content[0]}"), raising=False)
+    backend = GeminiBackend(api_key="test", model_name="gemini-test", timeout=5, cache_min_tokens=100)
+
+    creating = threading.Thread(target=backend._cached_model, args=(slow_prefix,))
+    creating.start()
+    started.wait(5)
+
+    # Same prefix goes inline, a different prefix is cached, both without waiting for the upload
+    assert backend._cached_model(slow_prefix) is None
+    assert backend._cached_model(other_prefix) == "model:b"
+    release.set()
+    creating.join(5)
+    assert backend._cached_model(slow_prefix) == "model:a"
@@ -0,0 +1,41 @@
+import asyncio
+import time
+
+from app.core.pipeline import Pipeline
+
+def test_independent_stages_overlap_and_critical_path_follows_slowest_dependency():
+    async def run():
+        pipeline = Pipeline()
+
+        async def wait(seconds, value):
+            await asyncio.sleep(seconds)
+            return value
+
+        pipeline.start("resolve_current", lambda: wait(0.05, "a"))
+        pipeline.start("resolve_target", lambda: wait(0.1, "b"))
+        started = time.perf_counter()
+        result = await pipeline.run("search", lambda a, b: wait(0.01, a + b), "resolve_current", "resolve_target")
+        return pipeline, result, time.perf_counter() - started
+
+    pipeline, result, elapsed = asyncio.run(run())
+
+    assert result == "ab"
+    assert elapsed < 0.15
+    assert [span.name for span in pipeline.critical_path()] == ["resolve_target", "search"]
+    assert pipeline.describe_critical_path().startswith("resolve_target(")
+    assert "resolve_current;dur=" in pipeline.server_timing()
+
+def test_aclose_cancels_unused_speculative_stage():
+    async def run():
+        pipeline = Pipeline()
+        speculative = pipeline.start("cross_industry", lambda: asyncio.sleep(10))
+        await pipeline.run("graph_search", lambda: asyncio.sleep(0))
+        await pipeline.aclose()
+        return pipeline, speculative
+
+    pipeline, speculative = asyncio.run(run())
+
+    assert speculative.cancelled()
+    assert pipeline.spans["cross_industry"].status == "cancelled"
+    assert [span.name for span in pipeline.critical_path()] == ["graph_search"]
+    assert "cross_industry" not in pipeline.server_timing()
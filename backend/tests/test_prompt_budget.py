@@ -0,0 +1,59 @@
+import asyncio
+
+from app.core.prompt_budget import PromptBudget, compact, estimate_tokens
+from app.services.fake_llm import FakeBackend
+from app.services.llm_executor import LLMExecutor
+from app.services.llm_gateway import LLMGateway, track_request_usage
+from app.services.single_flight import SingleFlight
+
+def test_compact_collapses_spaces_and_blank_lines_but_keeps_indentation():
+    text = "Header   line  \n\n\n\n  {\n    \"key\":    1\n  }\n\n"
+
+    assert compact(text) == "Header line\n\n  {\n    \"key\": 1\n  }"
+
+def test_fit_text_trims_only_over_budget_input():
+    budget = PromptBudget('parse_resume', max_tokens=60)
+    prefix = "Instructions\n"
+    resume = "\n".join(f"line {i} of the resume" for i in range(100))
+
+    assert budget.fit_text(prefix, "short resume") == "short resume"
+    trimmed = budget.fit_text(prefix, resume)
+
+    assert trimmed.startswith("line 0 of the resume\n")
+    assert trimmed.endswith("[...truncated]")
+    assert estimate_tokens(prefix) + estimate_tokens(trimmed) <= 60
+    assert budget.snapshot()['calls'] == 2
+    assert budget.snapshot()['trimmed'] == 1
+
+def test_fit_items_keeps_leading_items_that_fit():
+    budget = PromptBudget('match_role', max_tokens=40)
+    roles = [f"Role number {i}" for i in range(50)]
+
+    kept = budget.fit_items("x" * 40, roles, render=lambda i, role: f"{i+1}. {role}\n")
+
+    assert kept == roles[:len(kept)]
+    assert 0 < len(kept) < len(roles)
+    assert budget.snapshot()['trimmed_tokens'] > 0
+
+def test_request_usage_counts_prefix_and_is_not_charged_to_coalesced_callers():
+    gateway = LLMGateway(
+        FakeBackend(latency_ms=50),
+        LLMExecutor(max_concurrency=4, rate_per_minute=60000, burst=100),
+        SingleFlight()
+    )
+
+    async def request(prompt):
+        usage = track_request_usage()
+        await gateway.generate(prompt, site="parse_resume", prefix="Instructions " * 40)
+        return usage
+
+    async def run():
+        return await asyncio.gather(request("Resume A"), request("Resume A"), request("Resume B"))
+
+    first, coalesced, other = asyncio.run(run())
+
+    assert first.calls == 1 and other.calls == 1
+    assert coalesced.calls == 0
+    assert first.prompt_tokens > estimate_tokens("Instructions " * 40) - 1
+    assert "calls=1" in first.header()
+    assert gateway.snapshot()['sites']['parse_resume']['calls'] == 2
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("fakeredis")
+
+import fakeredis.aioredis
+
+from app.models.career import CareerPathRequest
+from app.services.cache import RedisCache
+from app.services.cache_versions import CacheVersions
+from app.services.response_cache import ResponseCache, skip_response_cache
+
+def _response_cache():
+    cache = RedisCache("redis://localhost:6379")
+    cache.redis = fakeredis.aioredis.FakeRedis()
+    return ResponseCache(cache, CacheVersions(cache), ttl=3600, negative_ttl=60, version="test")
+
+def test_unmatched_roles_are_cached_briefly():
+    response_cache = _response_cache()
+    request = CareerPathRequest(current_role="Xyzzy", target_role="Plugh", user_skills=[])
+    builds = []
+
+    async def build():
+        builds.append(1)
+        return {'paths': [], 'recommended_path': None, 'skill_gaps': []}
+
+    async def run():
+        first = await response_cache.get_or_build(request, build)
+        second = await response_cache.get_or_build(request, build)
+        return first[1], second[1], await response_cache.cache.redis.ttl(await response_cache.key(request))
+
+    first, second, ttl = asyncio.run(run())
+
+    assert (first, second) == ('miss', 'negative_hit')
+    assert 0 < ttl <= 60
+    assert len(builds) == 1
+
+def test_flagged_and_no_store_responses_are_not_stored():
+    response_cache = _response_cache()
+    request = CareerPathRequest(current_role="Chef", target_role="Airline Pilot", user_skills=["Cooking"])
+    result = {'paths': [{'roles': ["Chef", "Airline Pilot"]}], 'recommended_path': None, 'skill_gaps': []}
+
+    async def partial():
+        # Called from a pipeline stage in the app, so it must reach the caller through the context
+        await asyncio.create_task(asyncio.to_thread(skip_response_cache, "truncated plan"))
+        return result
+
+    async def complete():
+        return result
+
+    async def run():
+        outcomes = [
+            (await response_cache.get_or_build(request, partial))[1],
+            (await response_cache.get_or_build(request, complete, "no-store"))[1],
+            (await response_cache.get_or_build(request, complete))[1],
+            (await response_cache.get_or_build(request, complete))[1]
+        ]
+        return outcomes
+
+    assert asyncio.run(run()) == ['miss', 'bypass', 'miss', 'hit']
+    assert response_cache.snapshot()['not_stored'] == 1
@@ -0,0 +1,77 @@
+import base64
+import json
+
+import pytest
+
+from app.core.response_view import MAX_PAGE_SIZE, InvalidView, ResponseView
+from app.models.career import CareerPathRequest
+from app.services.response_cache import request_digest
+
+REQUEST = CareerPathRequest(current_role="Software Engineer", user_skills=["Python"])
+
+def _result(count):
+    paths = [
+        {'roles': ["A", f"B{i}"], 'score': count - i,
+         'transitions': [{'from_role': "A", 'to_role': f"B{i}", 'learning_resources': ["course"]}]}
+        for i in range(count)
+    ]
+    gaps = [{'roles': path['roles'], 'match_percentage': 50} for path in paths]
+    return {'paths': paths, 'recommended_path': paths[0], 'skill_gaps': gaps}
+
+def test_cursor_pages_cover_every_ranked_path_once():
+    result = _result(5)
+    seen, cursor, pages = [], None, 0
+    while True:
+        page = ResponseView.parse(REQUEST, limit=2, cursor=cursor).project(result, REQUEST)
+        seen += [path['roles'][-1] for path in page['paths']]
+        assert [gap['roles'] for gap in page['skill_gaps']] == [path['roles'] for path in page['paths']]
+        assert ('recommended_path' in page) == (pages == 0)
+        pages += 1
+        cursor = page['next_cursor']
+        if cursor is None:
+            break
+
+    assert seen == ["B0", "B1", "B2", "B3", "B4"]
+    assert pages == 3
+
+def test_cursor_from_another_request_is_rejected():
+    page = ResponseView.parse(REQUEST, limit=1).project(_result(3), REQUEST)
+    other = CareerPathRequest(current_role="Data Analyst", user_skills=["Python"])
+
+    with pytest.raises(InvalidView):
+        ResponseView.parse(other, cursor=page['next_cursor'])
+    with pytest.raises(InvalidView):
+        ResponseView.parse(REQUEST, cursor="not-a-cursor")
+
+def test_cursor_with_a_malformed_limit_is_rejected():
+    digest = request_digest(REQUEST)[:16]
+
+    for limit in ("x", 0, MAX_PAGE_SIZE + 1, True, 2.5):
+        position = json.dumps({'o': 1, 'l': limit, 'r': digest}).encode()
+        with pytest.raises(InvalidView):
+            ResponseView.parse(REQUEST, cursor=base64.urlsafe_b64encode(position).decode())
+
+def test_expand_and_fields_drop_unrequested_parts():
+    result = _result(3)
+
+    summary = ResponseView.parse(REQUEST, fields="recommended_path", expand="").project(result, REQUEST)
+    plain = ResponseView.parse(REQUEST, expand="transitions").project(result, REQUEST)
+
+    assert set(summary) == {'recommended_path', 'total_paths', 'next_cursor'}
+    assert 'transitions' not in summary['recommended_path']
+    assert 'learning_resources' not in plain['paths'][0]['transitions'][0]
+    # The source result is left as it was
+    assert result['paths'][0]['transitions'][0]['learning_resources'] == ["course"]
+    assert ResponseView.parse(REQUEST).project(result, REQUEST)['paths'] == result['paths']
+
+def test_only_returned_paths_are_enriched():
+    result = _result(5)
+    paths = result['paths']
+    cursor = ResponseView.parse(REQUEST, limit=2).project(result, REQUEST)['next_cursor']
+
+    second_page = ResponseView.parse(REQUEST, cursor=cursor)
+    first_page = ResponseView.parse(REQUEST, fields="recommended_path,skill_gaps", limit=2)
+
+    assert second_page.returned(paths) == paths[2:4]
+    assert first_page.returned(paths) == paths[:1]
+    assert not ResponseView.parse(REQUEST, expand="transitions").enrich
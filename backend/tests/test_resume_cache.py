@@ -0,0 +1,122 @@
+import asyncio
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.models.user import ParsedResume
+from app.services.cache import RedisCache
+from app.services.extraction import SpooledUpload
+from app.services.resume_cache import ResumeParseCache
+
+class StubParser:
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = 0
+        self.cache_version = "v1:test"
+
+    async def parse_resume(self, text: str) -> ParsedResume:
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        return ParsedResume(full_name=text.split()[0], current_role="Engineer", years_total_experience=1,
+                            skills=[], experience=[], education=[], certifications=[], summary=text)
+
+def _resume_cache(parser: StubParser) -> ResumeParseCache:
+    cache = RedisCache("redis://localhost:6379")
+    cache.redis = fakeredis.aioredis.FakeRedis()
+
+    async def extract(upload: SpooledUpload) -> str:
+        return upload.read_bytes().decode()
+
+    return ResumeParseCache(cache, parser, extract=extract, ttl=60)
+
+def _upload(data: bytes, filename: str) -> SpooledUpload:
+    return SpooledUpload.from_bytes(data, filename)
+
+def test_keyed_by_content_not_filename():
+    parser = StubParser()
+    resume_cache = _resume_cache(parser)
+
+    async def run():
+        first = await resume_cache.get_or_parse(_upload(b"Ada Lovelace", "resume.pdf"))
+        renamed = await resume_cache.get_or_parse(_upload(b"Ada Lovelace", "ada_final.pdf"))
+        other = await resume_cache.get_or_parse(_upload(b"Grace Hopper", "resume.pdf"))
+        return first, renamed, other
+
+    first, renamed, other = asyncio.run(run())
+
+    assert first[1] == 'miss' and renamed[1] == 'bytes_hit'
+    assert renamed[0] == first[0]
+    assert other[1] == 'miss' and other[0]['full_name'] == "Grace"
+    assert parser.calls == 2
+
+def test_same_text_in_different_bytes_hits_text_tier():
+    parser = StubParser()
+    resume_cache = _resume_cache(parser)
+
+    async def run():
+        await resume_cache.get_or_parse(_upload(b"Ada Lovelace\n\nEngineer", "a.txt"))
+        return await resume_cache.get_or_parse(_upload(b"Ada   Lovelace\n\n\nEngineer  ", "b.txt"))
+
+    assert asyncio.run(run())[1] == 'text_hit'
+    assert parser.calls == 1
+
+def test_concurrent_uploads_share_one_parse():
+    parser = StubParser(delay=0.05)
+    resume_cache = _resume_cache(parser)
+
+    async def run():
+        return await asyncio.gather(*[resume_cache.get_or_parse(_upload(b"Ada Lovelace", f"{i}.pdf")) for i in range(5)])
+
+    outcomes = sorted(outcome for _, outcome in asyncio.run(run()))
+
+    assert parser.calls == 1
+    assert outcomes == ['coalesced'] * 4 + ['miss']
+    snapshot = resume_cache.snapshot()
+    assert snapshot['lookups'] == 5 and snapshot['llm_calls_saved_rate'] == 0.8
+
+def test_version_change_misses():
+    parser = StubParser()
+    resume_cache = _resume_cache(parser)
+
+    async def run():
+        await resume_cache.get_or_parse(_upload(b"Ada Lovelace", "a.pdf"))
+        parser.cache_version = "v2:test"
+        return await resume_cache.get_or_parse(_upload(b"Ada Lovelace", "a.pdf"))
+
+    assert asyncio.run(run())[1] == 'miss'
+    assert parser.calls == 2
+
+def test_cancelled_leader_keeps_the_file_its_flight_reads(tmp_path):
+    parser = StubParser()
+    cache = RedisCache("redis://localhost:6379")
+    cache.redis = fakeredis.aioredis.FakeRedis()
+
+    async def extract(upload: SpooledUpload) -> str:
+        await asyncio.sleep(0.05)
+        return upload.read_bytes().decode()
+
+    resume_cache = ResumeParseCache(cache, parser, extract=extract, ttl=60)
+    data = b"Ada Lovelace"
+    spooled = tmp_path / "upload-1"
+    spooled.write_bytes(data)
+    on_disk = SpooledUpload("resume.pdf", len(data), _upload(data, "x").digest, data[:8], path=str(spooled))
+
+    async def request(upload):
+        try:
+            return await resume_cache.get_or_parse(upload)
+        finally:
+            upload.cleanup()
+
+    async def run():
+        leader = asyncio.ensure_future(request(on_disk))
+        await asyncio.sleep(0.01)
+        follower = asyncio.ensure_future(request(_upload(data, "copy.pdf")))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await follower
+
+    parsed, outcome = asyncio.run(run())
+
+    assert outcome == 'coalesced' and parsed['full_name'] == "Ada"
+    assert not spooled.exists()
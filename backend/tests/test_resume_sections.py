@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+from app.core.ai_parser import AIResumeParser
+from app.core.resume_sections import ResumePreprocessor, heading_section
+from app.services.fake_llm import PARSED_RESUME
+
+PAGE_HEADER = "Jane Doe | jane@example.com | +1 415 555 0134\n"
+
+RESUME = PAGE_HEADER + """Curriculum Vitae
+Summary
+Data engineer with 6 years of experience.
+
+Experience
+Acme Corp - Data Engineer (2020 - present)
+- Built Airflow pipelines loading 2TB/day into Snowflake.
+Tools: Airflow, dbt, Snowflake
+Page 1 of 2
+""" + PAGE_HEADER + """Beta Inc - Analyst (2017 - 2020)
+- SQL reporting in Tableau.
+Education
+B.Sc. Statistics, 2017
+Interests
+Chess, running, cooking
+References available upon request
+Page 2 of 2
+"""
+
+class RecordingLLM:
+    model_id = "recording"
+
+    def __init__(self):
+        self.prompts = []
+
+    async def generate(self, prompt: str, site: str, prefix: str = "") -> str:
+        self.prompts.append(prompt)
+        return json.dumps(PARSED_RESUME)
+
+def test_headings_are_recognized_with_and_without_content():
+    assert heading_section("WORK EXPERIENCE") == (True, 'experience', "")
+    assert heading_section("Skills: Python, SQL") == (True, 'skills', "Python, SQL")
+    assert heading_section("Hobbies and Interests")[1] is None
+    assert not heading_section("Built the experience platform")[0]
+
+def test_boilerplate_and_repeated_page_headers_are_dropped():
+    prepared = ResumePreprocessor().prepare(RESUME)
+
+    assert prepared.text.count("jane@example.com") == 1
+    assert "Page 1" not in prepared.text and "Curriculum Vitae" not in prepared.text
+    assert "Chess" not in prepared.text and "References" not in prepared.text
+    assert "Tools: Airflow, dbt, Snowflake" in prepared.text
+    assert "B.Sc. Statistics" in prepared.text
+    assert prepared.duplicate_lines == 1 and prepared.boilerplate_lines == 4
+    assert prepared.output_tokens < prepared.input_tokens
+
+def test_a_long_section_is_capped_without_starving_the_rest():
+    roles = "\n".join(f"- Shipped feature {i} for the payments platform team" for i in range(200))
+    text = f"Jane Doe\nExperience\n{roles}\nEducation\nB.Sc. Computer Science\nCertifications\nAWS Solutions Architect"
+    preprocessor = ResumePreprocessor(budgets={'experience': 100})
+
+    prepared = preprocessor.prepare(text)
+
+    assert "feature 0 " in prepared.text and "feature 199" not in prepared.text
+    assert "B.Sc. Computer Science" in prepared.text and "AWS Solutions Architect" in prepared.text
+    assert prepared.trimmed_tokens['experience'] > 0
+    assert preprocessor.snapshot()['trimmed_tokens']['experience'] == prepared.trimmed_tokens['experience']
+
+def test_text_without_headings_is_only_cleaned():
+    text = "Jane Doe\n\n\n\nPython developer    since 2015\nPage 1 of 1"
+
+    prepared = ResumePreprocessor().prepare(text)
+
+    assert prepared.text == "Jane Doe\n\nPython developer since 2015"
+
+def test_parser_prompts_with_the_preprocessed_text():
+    llm = RecordingLLM()
+    preprocessor = ResumePreprocessor()
+    parser = AIResumeParser(llm=llm, preprocessor=preprocessor)
+
+    parsed = asyncio.run(parser.parse_resume(RESUME))
+
+    assert parsed.full_name == "Jane Doe"
+    assert "Chess" not in llm.prompts[0] and "Acme Corp" in llm.prompts[0]
+    stats = preprocessor.snapshot()
+    assert stats['documents'] == 1 and 0 < stats['reduction'] < 1
@@ -0,0 +1,63 @@
+import asyncio
+import threading
+import time
+
+from app.services.single_flight import SingleFlight, make_key
+
+def test_concurrent_identical_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return "result"
+
+    async def run():
+        key = make_key("site", "prompt")
+        return await asyncio.gather(*[flight.do(key, work, site="site") for _ in range(5)])
+
+    results = asyncio.run(run())
+
+    assert results == ["result"] * 5
+    assert len(calls) == 1
+    stats = flight.snapshot()['sites']['site']
+    assert stats == {'calls': 5, 'executed': 1, 'coalesced': 4}
+
+def test_sequential_calls_are_not_cached():
+    flight = SingleFlight()
+    calls = []
+
+    def work():
+        calls.append(1)
+        return len(calls)
+
+    assert flight.do_sync("k", work) == 1
+    assert flight.do_sync("k", work) == 2
+
+def test_sync_followers_receive_leader_error():
+    flight = SingleFlight()
+    started = threading.Event()
+    errors = []
+
+    def work():
+        started.set()
+        time.sleep(0.05)
+        raise RuntimeError("quota")
+
+    def call():
+        try:
+            flight.do_sync("k", work, site="match_role")
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait()
+    follower = threading.Thread(target=call)
+    follower.start()
+    leader.join()
+    follower.join()
+
+    assert errors == ["quota", "quota"]
+    assert flight.snapshot()['sites']['match_role']['coalesced'] == 1
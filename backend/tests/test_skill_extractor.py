@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("spacy")
+
+from app.core.ai_parser import AIResumeParser, find_email, find_phone
+from app.services.fake_llm import FakeBackend
+from app.services.llm_executor import LLMExecutor
+from app.services.llm_gateway import LLMGateway
+from app.services.single_flight import SingleFlight
+from ml.models.skill_extractor import SkillExtractor
+
+RESUME = """Jane Doe
+jane.doe@example.com | +1 (415) 555-0134
+
+Senior Backend Engineer with 7 years of Python; expert in PostgreSQL.
+Built services in Node.js and React Native apps, familiar with Kubernetes.
+Reported to C-level stakeholders.
+"""
+
+@pytest.fixture(scope="module")
+def extractor():
+    return SkillExtractor()
+
+def _names(skills):
+    return [skill.name for skill in skills]
+
+def test_aliases_map_to_vocabulary_names(extractor):
+    names = _names(extractor.extract(RESUME))
+
+    assert "Python" in names and "SQL" in names and "Kubernetes" in names
+    assert "Node.js" in names
+    # One-letter languages need more than a capital C
+    assert "C" not in names
+
+def test_longest_match_wins(extractor):
+    names = _names(extractor.extract("Shipped three React Native apps"))
+
+    assert "React Native" in names
+    assert "React" not in names
+
+def test_proficiency_follows_context(extractor):
+    skills = {skill.name: skill for skill in extractor.extract(RESUME)}
+
+    assert skills["Python"].years_experience == 7
+    assert skills["Python"].proficiency == 5
+    assert skills["SQL"].proficiency >= 3
+    assert skills["Kubernetes"].proficiency <= 2
+
+def test_contact_details_are_found_locally():
+    assert find_email(RESUME) == "jane.doe@example.com"
+    assert find_phone(RESUME) == "+1 (415) 555-0134"
+    assert find_phone("No phone listed, born 1990") is None
+
+def test_parser_only_asks_the_llm_for_the_profile(extractor):
+    gateway = LLMGateway(FakeBackend(), LLMExecutor(max_concurrency=4, rate_per_minute=60000, burst=100),
+                         SingleFlight())
+    parser = AIResumeParser(llm=gateway, skill_extractor=extractor)
+
+    parsed = asyncio.run(parser.parse_resume(RESUME))
+
+    assert "Python" in _names(parsed.skills)
+    assert parsed.email == "jane.doe@example.com"
+    assert parsed.full_name == "Jane Doe"
+    assert '"skills"' not in parser.profile_instructions
+    assert parser.cache_version != AIResumeParser(llm=gateway).cache_version
@@ -0,0 +1,53 @@
+from app.services.fake_llm import FakeBackend
+from app.services.llm_executor import LLMExecutor
+from app.services.llm_gateway import LLMGateway
+from app.services.metrics import StageTimer
+from app.services.single_flight import SingleFlight
+from benchmarks.loadtest import parse_server_timing
+from benchmarks.standins import InMemoryCareerGraph, KeywordSkillVectorDB
+
+def _graph():
+    llm = LLMGateway(FakeBackend(), LLMExecutor(max_concurrency=2, rate_per_minute=60000, burst=100), SingleFlight())
+    return InMemoryCareerGraph(llm=llm)
+
+def test_in_memory_graph_returns_shortest_paths_to_target():
+    graph = _graph()
+
+    paths = graph.find_career_paths("Junior Software Engineer", "Data Scientist")
+
+    assert paths
+    assert {len(p.roles) for p in paths} == {len(paths[0].roles)}
+    assert paths[0].roles[0] == "Junior Software Engineer"
+    assert paths[0].roles[-1] == "Data Scientist"
+    assert paths[0].transitions[0]['from_role'] == "Junior Software Engineer"
+    assert paths[0].total_months == sum(t['duration_months'] for t in paths[0].transitions)
+
+def test_in_memory_graph_matches_fuzzy_titles_through_llm():
+    paths = _graph().find_career_paths("junior software dev", "Staff Engineer")
+
+    assert paths[0].roles[0] == "Junior Software Engineer"
+
+def test_in_memory_graph_without_llm_only_matches_exact_titles():
+    graph = InMemoryCareerGraph()
+
+    assert graph.find_career_paths("software engineer", "Staff Engineer")
+    assert graph.find_career_paths("Software Engineer", "staff eng") == []
+
+def test_keyword_vector_db_matches_case_insensitively():
+    match = KeywordSkillVectorDB().match_user_skills_to_role(["python", "Git"], ["Python", "SQL", "Git"])
+
+    assert match['matched_skills'] == ["python", "Git"]
+    assert match['missing_skills'] == ["SQL"]
+    assert round(match['match_percentage']) == 67
+
+def test_server_timing_round_trip():
+    timer = StageTimer()
+    with timer.stage("graph_search"):
+        pass
+    with timer.stage("graph_search"):
+        pass
+
+    stages = parse_server_timing(timer.server_timing())
+
+    assert list(stages) == ["graph_search", "total"]
+    assert stages['total'] >= stages['graph_search']